@@ -0,0 +1,52 @@
+"""Single-row and batch latency of the hourly model, sklearn wrapper vs. fast path.
+
+    python -m benchmarks.bench_fast_inference --features 12 --trees 200
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from collections.abc import Callable
+
+import numpy as np
+
+from market_sage_pro.models.lightgbm_hourly import HourlyLightGBM, HourlyModelConfig
+
+
+def _per_call_us(fn: Callable[[], object], calls: int) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return 1e6 * (time.perf_counter() - t0) / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--features", type=int, default=12)
+    parser.add_argument("--trees", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(10_000, args.features))
+    y = (X[:, 0] + 0.5 * rng.normal(size=len(X)) > 0).astype(int)
+    slow = HourlyLightGBM(HourlyModelConfig(n_estimators=args.trees))
+    fast = HourlyLightGBM(HourlyModelConfig(n_estimators=args.trees, fast_inference=True))
+    slow.fit(X, y)
+    fast.fit(X, y)
+    assert np.array_equal(slow.predict_proba(X), fast.predict_proba(X))
+
+    row = X[:1]
+    t_slow = _per_call_us(lambda: slow.predict_proba(row), args.calls)
+    t_fast = _per_call_us(lambda: fast.predict_proba(row), args.calls)
+    b_slow = _per_call_us(lambda: slow.predict_proba(X), 5) / 1000
+    b_fast = _per_call_us(lambda: fast.predict_proba(X), 5) / 1000
+
+    print(f"{args.trees} trees, {args.features} features")
+    print(f"single row  sklearn: {t_slow:9.1f} us   fast: {t_fast:9.1f} us   ({t_slow / t_fast:.0f}x)")
+    print(f"10k rows    sklearn: {b_slow:9.1f} ms   fast: {b_fast:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
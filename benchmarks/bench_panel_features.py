@@ -0,0 +1,72 @@
+"""Per-symbol feature loop vs. one panel call across all symbols.
+
+    python -m benchmarks.bench_panel_features --symbols 2000 --bars 500
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from market_sage_pro.data import features
+from market_sage_pro.data.panel import (
+    atr_panel,
+    ema_panel,
+    implied_vol_rank_panel,
+    macd_panel,
+    rolling_zscore_panel,
+    rsi_panel,
+    vwap_panel,
+)
+
+
+def _per_symbol(close: np.ndarray, high: np.ndarray, low: np.ndarray, volume: np.ndarray) -> None:
+    for j in range(close.shape[1]):
+        df = pd.DataFrame({"close": close[:, j], "high": high[:, j], "low": low[:, j], "volume": volume[:, j]})
+        features.ema(df["close"], 21)
+        features.rsi(df["close"])
+        features.macd(df["close"])
+        features.atr(df)
+        features.vwap(df)
+        features.rolling_zscore(df["close"])
+        features.implied_vol_rank(df["close"], 252)
+
+
+def _panel(close: np.ndarray, high: np.ndarray, low: np.ndarray, volume: np.ndarray) -> None:
+    ema_panel(close, 21)
+    rsi_panel(close)
+    macd_panel(close)
+    atr_panel(high, low, close)
+    vwap_panel(close, volume)
+    rolling_zscore_panel(close)
+    implied_vol_rank_panel(close, 252)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--bars", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (args.bars, args.symbols)), axis=0))
+    high, low = close * 1.005, close * 0.995
+    volume = rng.uniform(1e3, 1e5, close.shape)
+
+    t0 = time.perf_counter()
+    _per_symbol(close, high, low, volume)
+    t_loop = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    _panel(close, high, low, volume)
+    t_panel = time.perf_counter() - t0
+
+    print(f"{args.symbols} symbols x {args.bars} bars, 7 indicators")
+    print(f"per-symbol loop: {t_loop:8.3f}s")
+    print(f"panel:           {t_panel:8.3f}s")
+    print(f"speedup:         {t_loop / t_panel:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Wall time of the shared-capital portfolio backtest.
+
+    python -m benchmarks.bench_portfolio --symbols 1000 --years 5
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from market_sage_pro.backtest.engine import _prepare_df
+from market_sage_pro.backtest.portfolio import PortfolioConfig, backtest_portfolio
+from market_sage_pro.risk.manager import RiskConfig
+from market_sage_pro.signals.generator import SignalConfig
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=1000)
+    parser.add_argument("--years", type=int, default=5)
+    args = parser.parse_args()
+
+    n = 252 * args.years
+    rng = np.random.default_rng(0)
+    ts = pd.bdate_range("2019-01-01", periods=n)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, (n, args.symbols)), axis=0))
+
+    t0 = time.perf_counter()
+    frames = {
+        f"S{j:04d}": _prepare_df(pd.DataFrame({"ts": ts, "open": close[:, j], "high": close[:, j],
+                                               "low": close[:, j], "close": close[:, j], "volume": 0.0}))
+        for j in range(args.symbols)
+    }
+    t_prep = time.perf_counter() - t0
+
+    pf = PortfolioConfig(risk=RiskConfig(max_daily_loss_pct=-2.0, per_symbol_cap_pct=5.0))
+    t0 = time.perf_counter()
+    res = backtest_portfolio(frames, SignalConfig(kelly_fraction_cap=0.5), pf)
+    t_run = time.perf_counter() - t0
+
+    print(f"{args.symbols} symbols x {n} bars")
+    print(f"prepare features: {t_prep:6.2f} s")
+    print(f"portfolio run:    {t_run:6.2f} s   ({args.symbols * n / t_run:,.0f} symbol-bars/s)")
+    print(f"final equity {res.metrics['final_equity']:,.0f}, blocked bars {res.metrics['blocked_bars']}")
+
+
+if __name__ == "__main__":
+    main()
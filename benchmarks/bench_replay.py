@@ -0,0 +1,59 @@
+"""Replay throughput from DuckDB, bare and driving the streaming pipeline.
+
+    python -m benchmarks.bench_replay --symbols 100 --bars 5000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from market_sage_pro.data.store import DuckDBStore
+from market_sage_pro.streaming.pipeline import StreamConfig, StreamPipeline
+from market_sage_pro.streaming.replay import ReplayFeed, store_source
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--bars", type=int, default=5000)
+    parser.add_argument("--chunk", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    symbols = [f"S{i:04d}" for i in range(args.symbols)]
+    ts = pd.date_range("2024-01-02 14:30", periods=args.bars, freq="min")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = DuckDBStore(str(Path(tmp) / "bench.duckdb"))
+        data = {}
+        for sym in symbols:
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 1e-3, args.bars)))
+            data[sym] = pd.DataFrame(
+                {"ts": ts, "open": close, "high": close * 1.001, "low": close * 0.999, "close": close, "volume": 1.0}
+            )
+        store.upsert_bars(data)
+
+        feed = ReplayFeed(store_source(store, symbols, chunk=args.chunk))
+        t0 = time.perf_counter()
+        events = sum(len(b) for b in feed.events())
+        bare = time.perf_counter() - t0
+
+        feed = ReplayFeed(store_source(store, symbols, chunk=args.chunk))
+        pipe = StreamPipeline(StreamConfig(bar_seconds=60))
+        t0 = time.perf_counter()
+        stats = asyncio.run(pipe.run(feed))
+        piped = time.perf_counter() - t0
+        store.close()
+
+    print(f"{args.symbols} symbols x {args.bars} bars -> {events} events")
+    print(f"replay only:       {bare:7.2f}s  ({events / bare:,.0f} events/s)")
+    print(f"replay + pipeline: {piped:7.2f}s  ({events / piped:,.0f} events/s, {stats.signals} signals)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Portfolio risk throughput: tick marking and batch order screening.
+
+    python -m benchmarks.bench_risk --symbols 2000 --ticks 5000 --orders 1000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from market_sage_pro.risk.manager import RiskConfig
+from market_sage_pro.risk.portfolio import PortfolioRiskManager
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--ticks", type=int, default=5000, help="ticks per block")
+    parser.add_argument("--orders", type=int, default=1000, help="candidates per can_open_new call")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    names = [f"S{i:05d}" for i in range(args.symbols)]
+    risk = PortfolioRiskManager(RiskConfig(max_daily_loss_pct=-100), start_equity=1e9)
+    for sym in names:
+        risk.on_fill(sym, float(rng.integers(-100, 100)), 100.0)
+
+    blocks = [
+        ([names[i] for i in rng.integers(0, args.symbols, args.ticks)], (100 + rng.normal(0, 1, args.ticks)).tolist())
+        for _ in range(8)
+    ]
+    t0 = time.perf_counter()
+    for r in range(args.rounds):
+        risk.update_marks(*blocks[r % len(blocks)])
+    mark_rate = args.rounds * args.ticks / (time.perf_counter() - t0)
+
+    orders = [names[i] for i in rng.integers(0, args.symbols, args.orders)]
+    notional = rng.normal(0, 1e5, args.orders)
+    t0 = time.perf_counter()
+    for _ in range(args.rounds):
+        risk.can_open_new(orders, notional)
+    screen_us = 1e6 * (time.perf_counter() - t0) / args.rounds
+
+    print(f"{args.symbols} positions")
+    print(f"update_marks  {mark_rate:12,.0f} ticks/s  ({args.ticks} ticks per block)")
+    print(f"can_open_new  {screen_us:12,.0f} us per call  ({args.orders} orders, {args.orders / screen_us:.1f}M/s)")
+    assert abs(risk.equity - risk.revalue()) < 1e-3 * abs(risk.equity)
+
+
+if __name__ == "__main__":
+    main()
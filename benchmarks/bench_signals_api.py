@@ -0,0 +1,72 @@
+"""Throughput of single-row ``/signal`` vs. batch ``/signals`` (columnar JSON and Arrow IPC).
+
+    python -m benchmarks.bench_signals_api --rows 10000 --single 2000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from collections.abc import Callable
+
+import numpy as np
+import orjson
+import pyarrow as pa
+from fastapi.testclient import TestClient
+from pyarrow import ipc
+
+from market_sage_pro.api.main import app
+from market_sage_pro.signals.columnar import ARROW_STREAM, SIGNAL_INPUTS
+
+
+def _columns(n: int) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(0)
+    up = rng.uniform(0, 1, n)
+    values = [up, 1 - up, rng.normal(0, 0.5, n), rng.uniform(20, 80, n), rng.normal(0, 1, n),
+              rng.uniform(0, 1, n), rng.uniform(0, 1, n)]
+    return dict(zip(SIGNAL_INPUTS, values, strict=True))
+
+
+def _arrow(cols: dict[str, np.ndarray]) -> bytes:
+    table = pa.table(cols)
+    sink = pa.BufferOutputStream()
+    with ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _rate(fn: Callable[[], object], calls: int) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return calls / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--single", type=int, default=2000)
+    parser.add_argument("--batches", type=int, default=20)
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    cols = _columns(args.rows)
+    rows = [{k: float(v[i]) for k, v in cols.items()} for i in range(args.single)]
+    it = iter(rows * 2)
+    single = _rate(lambda: client.post("/signal", json=next(it)), args.single)
+
+    as_json = orjson.dumps(cols, option=orjson.OPT_SERIALIZE_NUMPY)
+    as_arrow = _arrow(cols)
+    json_rps = _rate(lambda: client.post("/signals", content=as_json), args.batches)
+    arrow_rps = _rate(
+        lambda: client.post("/signals", content=as_arrow, headers={"content-type": ARROW_STREAM}), args.batches
+    )
+
+    print(f"{'endpoint':<22}{'req/s':>10}{'rows/s':>14}")
+    print(f"{'/signal':<22}{single:>10.0f}{single:>14.0f}")
+    print(f"{'/signals json':<22}{json_rps:>10.1f}{json_rps * args.rows:>14.0f}")
+    print(f"{'/signals arrow':<22}{arrow_rps:>10.1f}{arrow_rps * args.rows:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Write throughput of DuckDBStore.write_bars as the database grows.
+
+Compares append-only ingest against the previous behaviour of running
+retention (DELETE + global VACUUM) after every write.
+
+    python -m benchmarks.bench_store_ingest --batches 200 --batch-rows 5000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from market_sage_pro.data.store import DuckDBStore
+
+
+def _batch(i: int, rows: int) -> pd.DataFrame:
+    end = pd.Timestamp.utcnow().tz_localize(None).floor("s") - pd.Timedelta(seconds=i * rows)
+    ts = pd.date_range(end=end, periods=rows, freq="s")
+    close = np.linspace(100.0, 101.0, rows)
+    return pd.DataFrame(
+        {"ts": ts, "open": close, "high": close, "low": close, "close": close, "volume": 1.0}
+    )
+
+
+def _run(db_path: Path, batches: int, rows: int, legacy: bool, report_every: int) -> None:
+    store = DuckDBStore(str(db_path))
+    label = "with retention per write" if legacy else "append-only"
+    print(f"-- {label}")
+    t_window = time.perf_counter()
+    for i in range(batches):
+        store.write_bars(f"S{i % 50}", _batch(i, rows))
+        if legacy:
+            store.vacuum_retention()
+        if (i + 1) % report_every == 0:
+            elapsed = time.perf_counter() - t_window
+            total = (i + 1) * rows
+            print(f"db rows {total:>12,}  write rate {report_every * rows / elapsed:>14,.0f} rows/sec")
+            t_window = time.perf_counter()
+    store.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batches", type=int, default=200)
+    parser.add_argument("--batch-rows", type=int, default=5_000)
+    parser.add_argument("--report-every", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _run(Path(tmp) / "legacy.duckdb", args.batches, args.batch_rows, True, args.report_every)
+        _run(Path(tmp) / "append.duckdb", args.batches, args.batch_rows, False, args.report_every)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Ticks/sec through the streaming pipeline (bars, features, model, signals, fan-out).
+
+    python -m benchmarks.bench_stream --ticks 1000000 --symbols 200 --subscribers 50
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+import numpy as np
+
+from market_sage_pro.streaming.feeds import TickBatch
+from market_sage_pro.streaming.pipeline import StreamConfig, StreamPipeline
+
+
+class _ArrayFeed:
+    def __init__(self, symbol: np.ndarray, ts: np.ndarray, price: np.ndarray, chunk: int) -> None:
+        self.symbol, self.ts, self.price, self.chunk = symbol, ts, price, chunk
+
+    async def batches(self):  # type: ignore[no-untyped-def]
+        for i in range(0, len(self.ts), self.chunk):
+            sl = slice(i, i + self.chunk)
+            n = len(self.ts[sl])
+            yield TickBatch(self.symbol[sl].tolist(), self.ts[sl].tolist(), self.price[sl].tolist(), [1.0] * n)
+
+
+async def _drain(sub) -> None:  # type: ignore[no-untyped-def]
+    while True:
+        await sub.get()
+        await asyncio.sleep(0.01)  # a deliberately slow client
+
+
+async def _run(args: argparse.Namespace) -> None:
+    rng = np.random.default_rng(0)
+    symbols = np.array([f"S{i:04d}" for i in range(args.symbols)])
+    ts = 1_700_000_000 + np.sort(rng.uniform(0, args.seconds, args.ticks))
+    sym = symbols[rng.integers(0, args.symbols, args.ticks)]
+    price = 100 * np.exp(np.cumsum(rng.normal(0, 1e-4, args.ticks)))
+
+    pipe = StreamPipeline(StreamConfig(bar_seconds=args.bar_seconds))
+    drains = [asyncio.create_task(_drain(pipe.subscribe())) for _ in range(args.subscribers)]
+    stats = await pipe.run(_ArrayFeed(sym, ts, price, args.chunk))
+    for task in drains:
+        task.cancel()
+    print(f"{stats.ticks} ticks, {args.symbols} symbols, {stats.bars} bars, {stats.signals} signals")
+    print(f"{args.subscribers} slow subscribers, {sum(s.conflated for s in pipe._subscribers)} events conflated")
+    print(f"pipeline: {stats.seconds:.2f}s  ({stats.ticks_per_sec:,.0f} ticks/s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ticks", type=int, default=1_000_000)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=6.5 * 3600)
+    parser.add_argument("--bar-seconds", type=float, default=60.0)
+    parser.add_argument("--subscribers", type=int, default=50)
+    parser.add_argument("--chunk", type=int, default=5000)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,102 @@
 from __future__ import annotations
 
-from collections.abc import Mapping
+import asyncio
+import os
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Annotated
 
 import orjson
-from fastapi import Depends, FastAPI, WebSocket, WebSocketDisconnect
+import pandas as pd
+from fastapi import (
+    Depends,
+    FastAPI,
+    HTTPException,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
-from ..backtest.engine import run_backtest
-from ..config import AppConfig, load_config
+from ..backtest.jobqueue import BacktestSpec, JobQueue, LocalJobQueue, default_job_queue
+from ..backtest.ledger import LedgerStore
+from ..config import AppConfig, ConfigService
+from ..models.serving import ModelServer
+from ..signals.columnar import (
+    ARROW_STREAM,
+    batch_to_arrow,
+    batch_to_json_columns,
+    read_arrow,
+    signals_from_columns,
+)
 from ..signals.generator import SignalConfig, generate_signal
+from ..streaming.feeds import FileFeed
+from ..streaming.pipeline import StreamPipeline
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
 
 
-class ORJSONResponse:
+class ORJSONResponse(Response):
     media_type = "application/json"
 
-    def __init__(self, content: object) -> None:
-        self.body = orjson.dumps(content)
+    def render(self, content: object) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+settings = ConfigService("config.yaml", "config.yaml.example")
 
 
 def get_settings() -> AppConfig:
-    path = "config.yaml" if __import__("os").path.exists("config.yaml") else "config.yaml.example"
-    return load_config(path)
+    return settings.get()
+
+
+model_server = ModelServer()
+# Built on startup rather than at import, so choosing Redis vs in-process
+# does not depend on Redis being reachable when the module is imported.
+backtest_jobs: JobQueue | None = None
+ledgers = LedgerStore()
+stream = StreamPipeline(server=model_server)
+
+
+def get_backtest_jobs() -> JobQueue:
+    global backtest_jobs
+    if backtest_jobs is None:
+        backtest_jobs = default_job_queue()
+    return backtest_jobs
 
 
-app = FastAPI(title="MarketSage-Pro API", version="0.1.0")
+def _log_feed_exit(task: asyncio.Task[object]) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Stream feed stopped", exc_info=task.exception())
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    global backtest_jobs
+    await settings.start()
+    await model_server.start()
+    jobs = await asyncio.to_thread(get_backtest_jobs)
+    feed_path = os.environ.get("MARKETSAGE_STREAM_FILE")
+    feed_task = asyncio.create_task(stream.run(FileFeed(feed_path))) if feed_path else None
+    if feed_task is not None:
+        feed_task.add_done_callback(_log_feed_exit)
+    try:
+        yield
+    finally:
+        if feed_task is not None:
+            feed_task.cancel()
+        await model_server.stop()
+        await settings.stop()
+        if isinstance(jobs, LocalJobQueue):
+            jobs.shutdown()
+        backtest_jobs = None
+
+
+app = FastAPI(title="MarketSage-Pro API", version="0.1.0", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -46,10 +116,15 @@ class SignalRequest(BaseModel):
     prob_big_move: float
 
 
+class PredictRequest(BaseModel):
+    features: list[list[float]]
+
+
 class BacktestRequest(BaseModel):
     from_date: str
     to_date: str
     symbols: list[str]
+    config: dict[str, float] | None = None  # SignalConfig overrides
 
 
 @app.get("/health")
@@ -72,25 +147,127 @@ def post_signal(req: SignalRequest, cfg: Annotated[AppConfig, Depends(get_settin
     return sig.__dict__
 
 
+@app.post("/signals")
+async def post_signals(request: Request, cfg: Annotated[AppConfig, Depends(get_settings)]) -> Response:
+    """Batch ``/signal``: columnar JSON (``{column: [values]}``) or an Arrow IPC stream in, same format out.
+
+    The response format follows ``Accept`` and defaults to the request's format.
+    """
+    body = await request.body()
+    arrow_in = request.headers.get("content-type", "").startswith(ARROW_STREAM)
+    try:
+        columns = read_arrow(body) if arrow_in else orjson.loads(body)
+        if not isinstance(columns, dict):
+            raise ValueError("expected an object of columns")
+        sig = signals_from_columns(columns, SignalConfig(kelly_fraction_cap=cfg.kelly_fraction_cap))
+    except (ValueError, TypeError, orjson.JSONDecodeError) as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    accept = request.headers.get("accept", "")
+    if ARROW_STREAM in accept or (arrow_in and "json" not in accept):
+        return Response(batch_to_arrow(sig), media_type=ARROW_STREAM)
+    return ORJSONResponse(batch_to_json_columns(sig))
+
+
+@app.post("/predict")
+async def post_predict(req: PredictRequest) -> dict[str, list[float]]:
+    try:
+        proba = await model_server.predict(req.features)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return {"ensemble_up_prob": proba.tolist()}
+
+
+@app.get("/metrics/models")
+def model_metrics() -> dict[str, object]:
+    return model_server.metrics()
+
+
 @app.post("/backtest")
-def post_backtest(req: BacktestRequest) -> Mapping[str, object]:
+def post_backtest(
+    req: BacktestRequest, jobs: Annotated[JobQueue, Depends(get_backtest_jobs)]
+) -> Mapping[str, object]:
     try:
         start = datetime.fromisoformat(req.from_date)
-        end = datetime.utcnow() if req.to_date.lower() == "today" else datetime.fromisoformat(req.to_date)
-    except ValueError:
-        return {"error": "invalid date"}
-    res = run_backtest(req.symbols, start, end)
-    return res
+        # "today" is truncated to the hour so repeated requests share a cache key.
+        end = (
+            datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+            if req.to_date.lower() == "today"
+            else datetime.fromisoformat(req.to_date)
+        )
+        cfg = SignalConfig(**{"kelly_fraction_cap": 0.5, **(req.config or {})})
+    except (ValueError, TypeError):
+        return {"error": "invalid request"}
+    job = jobs.submit(BacktestSpec.create(req.symbols, start, end, cfg))
+    return {"job_id": job.id, "status": job.status, "cached": job.cached}
+
+
+@app.get("/backtest/{job_id}")
+def get_backtest(job_id: str, jobs: Annotated[JobQueue, Depends(get_backtest_jobs)]) -> Mapping[str, object]:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="unknown job")
+    return job.summary()
+
+
+@app.get("/backtest/{job_id}/result")
+def get_backtest_result(
+    job_id: str, jobs: Annotated[JobQueue, Depends(get_backtest_jobs)]
+) -> Mapping[str, object]:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="unknown job")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"job is {job.status}")
+    return job.result or {}
+
+
+@app.get("/backtest/{job_id}/trades")
+def get_backtest_trades(
+    job_id: str,
+    jobs: Annotated[JobQueue, Depends(get_backtest_jobs)],
+    after: int = -1,
+    limit: int = 1000,
+    symbol: str | None = None,
+) -> Response:
+    """A page of the job's trade ledger; pass the last ``trade_id`` as ``after`` for the next page."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="unknown job")
+    if job.status != "done" or not ledgers.exists(job.key):
+        raise HTTPException(status_code=409, detail=f"no ledger for job ({job.status})")
+    limit = min(limit, 10_000)
+    page = ledgers.read_trades(job.key, after, limit, symbol)
+    for col in ("entry_ts", "exit_ts"):
+        if pd.api.types.is_datetime64_any_dtype(page[col]):
+            page[col] = page[col].dt.strftime("%Y-%m-%dT%H:%M:%S")  # NaT -> NaN -> null
+    return ORJSONResponse({
+        "trades": page.to_dict(orient="list"),
+        "next_after": int(page["trade_id"].iloc[-1]) if len(page) == limit else None,
+    })
 
 
 @app.websocket("/ws/stream")
-async def ws_stream(ws: WebSocket) -> None:
+async def ws_stream(ws: WebSocket, symbols: str | None = None) -> None:
     await ws.accept()
+    sub = stream.subscribe(set(symbols.split(",")) if symbols else None)
+    # Watch for the client leaving even while its symbols are quiet, so ``sub`` is dropped.
+    closed = asyncio.create_task(_wait_disconnect(ws))
     try:
         await ws.send_json({"msg": "stream started"})
-        # Placeholder: in production, push live ticks/minute bars
         while True:
-            data = await ws.receive_text()
-            await ws.send_json({"echo": data})
+            events = asyncio.create_task(sub.get())
+            await asyncio.wait({events, closed}, return_when=asyncio.FIRST_COMPLETED)
+            if not events.done():
+                events.cancel()
+                break
+            await ws.send_text(orjson.dumps(events.result()).decode())
     except WebSocketDisconnect:
-        pass
\ No newline at end of file
+        pass
+    finally:
+        closed.cancel()
+        stream.unsubscribe(sub)
+
+
+async def _wait_disconnect(ws: WebSocket) -> None:
+    while (await ws.receive())["type"] != "websocket.disconnect":
+        pass
@@ -1,47 +1,135 @@
 from __future__ import annotations
 
 import argparse
+from collections.abc import Mapping
+from dataclasses import dataclass
 from datetime import datetime
+from typing import TYPE_CHECKING
 
 import numpy as np
 import pandas as pd
 
-from ..data.features import ema, rsi
+from ..data.pipeline import IndicatorSpec, build_feature_matrix
 from ..data.store import fetch_historical_bars
-from ..signals.generator import Signal, SignalConfig, generate_signal
+from ..signals.generator import (
+    HOLD,
+    RATIONALE_DOWN,
+    Signal,
+    SignalBatch,
+    SignalConfig,
+    generate_signals_batch,
+)
+from .execution import EXIT_CLOSE, EXIT_REASONS, ExecutionConfig, simulate_fills
 
+if TYPE_CHECKING:
+    from .ledger import LedgerStore
 
-def backtest(df: pd.DataFrame, cfg: SignalConfig) -> dict[str, float | int]:
-    equity = 1.0
-    peak = 1.0
+
+def _column(df: pd.DataFrame, name: str, default: float) -> np.ndarray:
+    if name in df.columns:
+        return np.asarray(df[name].to_numpy(dtype=float))
+    return np.full(len(df), default)
+
+
+def _scalar_returns(df: pd.DataFrame, cfg: SignalConfig) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     returns: list[float] = []
-    wins = 0
-    trades = 0
+    traded: list[bool] = []
+    won: list[bool] = []
     for _, row in df.iterrows():
-        sig: Signal = generate_signal(
-            ensemble_up_prob=row.get("p_up", 0.5),
-            ensemble_down_prob=row.get("p_down", 0.5),
-            predicted_move_pct=row.get("pred_move", 0.0),
-            rsi=row.get("rsi", 50.0),
-            price_vs_ema21=row.get("px_vs_ema21", 0.0),
-            ivr=row.get("ivr", 0.5),
-            prob_big_move=row.get("p_big", 0.5),
+        # A one-row batch rather than ``generate_signal``: the side comes from
+        # the rationale bitmask, not from matching the display text.
+        batch = generate_signals_batch(
+            ensemble_up_prob=[row.get("p_up", 0.5)],
+            ensemble_down_prob=[row.get("p_down", 0.5)],
+            predicted_move_pct=[row.get("pred_move", 0.0)],
+            rsi=[row.get("rsi", 50.0)],
+            price_vs_ema21=[row.get("px_vs_ema21", 0.0)],
+            ivr=[row.get("ivr", 0.5)],
+            prob_big_move=[row.get("p_big", 0.5)],
             cfg=cfg,
         )
+        sig: Signal = batch.signal(0)
         if sig.action == "HOLD":
             returns.append(0.0)
+            traded.append(False)
+            won.append(False)
             continue
-        ret = row.get("actual_move", 0.0) / 100.0
-        trades += 1
-        if ret > 0:
-            wins += 1
-        equity *= (1 + ret * sig.size_fraction)
-        peak = max(peak, equity)
+        side = -1.0 if batch.rationale[0] & RATIONALE_DOWN else 1.0
+        ret = side * row.get("actual_move", 0.0) / 100.0
         returns.append(ret * sig.size_fraction)
+        traded.append(True)
+        won.append(ret > 0)
+    return np.array(returns, dtype=float), np.array(traded, dtype=bool), np.array(won, dtype=bool)
+
+
+def _signal_inputs(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Columns the signal engine reads, keyed by ``generate_signals_batch`` argument."""
+    return {
+        "ensemble_up_prob": _column(df, "p_up", 0.5),
+        "ensemble_down_prob": _column(df, "p_down", 0.5),
+        "predicted_move_pct": _column(df, "pred_move", 0.0),
+        "rsi": _column(df, "rsi", 50.0),
+        "price_vs_ema21": _column(df, "px_vs_ema21", 0.0),
+        "ivr": _column(df, "ivr", 0.5),
+        "prob_big_move": _column(df, "p_big", 0.5),
+        "actual_move": _column(df, "actual_move", 0.0),
+    }
+
+
+def _signal_batch(inputs: Mapping[str, np.ndarray], cfg: SignalConfig) -> SignalBatch:
+    return generate_signals_batch(
+        ensemble_up_prob=inputs["ensemble_up_prob"],
+        ensemble_down_prob=inputs["ensemble_down_prob"],
+        predicted_move_pct=inputs["predicted_move_pct"],
+        rsi=inputs["rsi"],
+        price_vs_ema21=inputs["price_vs_ema21"],
+        ivr=inputs["ivr"],
+        prob_big_move=inputs["prob_big_move"],
+        cfg=cfg,
+    )
+
+
+def _direction(batch: SignalBatch) -> np.ndarray:
+    """+1 long / -1 short per row; rows without a downside call count as long."""
+    return np.where(batch.rationale & RATIONALE_DOWN, -1.0, 1.0)
+
+
+def _trade_returns(
+    inputs: Mapping[str, np.ndarray], cfg: SignalConfig
+) -> tuple[SignalBatch, np.ndarray, np.ndarray, np.ndarray]:
+    """Signals, per-bar strategy returns, traded mask and won mask; shorts gain on down moves."""
+    batch = _signal_batch(inputs, cfg)
+    traded = batch.action != HOLD
+    ret = _direction(batch) * inputs["actual_move"] / 100.0
+    returns = np.where(traded, ret * batch.size_fraction, 0.0)
+    return batch, returns, traded, traded & (ret > 0)
+
+
+def _returns_from_inputs(
+    inputs: Mapping[str, np.ndarray], cfg: SignalConfig
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    return _trade_returns(inputs, cfg)[1:]
+
+
+def _vector_returns(df: pd.DataFrame, cfg: SignalConfig) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    return _returns_from_inputs(_signal_inputs(df), cfg)
+
+
+def equity_curve(arr: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Compounded equity (starting from 1.0) and running drawdown from the peak so far."""
+    curve = np.cumprod(1 + arr)
+    peak = np.maximum.accumulate(np.maximum(curve, 1.0)) if curve.size else curve
+    return curve, (peak - curve) / peak
+
+
+def _metrics(arr: np.ndarray, traded: np.ndarray, won: np.ndarray) -> dict[str, float | int]:
+    curve, drawdown = equity_curve(arr)
+    equity = float(curve[-1]) if curve.size else 1.0
+    trades = int(traded.sum())
+    wins = int(won.sum())
 
-    arr = np.array(returns)
     cagr = (equity) ** (252 / max(1, len(arr))) - 1
-    dd = (peak - equity) / peak if peak > 0 else 0.0
+    dd = float(drawdown.max()) if drawdown.size else 0.0
     sharpe = (arr.mean() / (arr.std(ddof=1) + 1e-9)) * np.sqrt(252)
     sortino = (arr.mean() / (arr[arr < 0].std(ddof=1) + 1e-9)) * np.sqrt(252)
     win_rate = wins / max(1, trades)
@@ -59,11 +147,122 @@ def backtest(df: pd.DataFrame, cfg: SignalConfig) -> dict[str, float | int]:
     }
 
 
+def _executed_returns(
+    df: pd.DataFrame,
+    cfg: SignalConfig,
+    execution: ExecutionConfig,
+    fine: pd.DataFrame | None = None,
+) -> tuple[SignalBatch, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Like ``_trade_returns`` but filled by ``simulate_fills``; also returns side and exit reason."""
+    batch = _signal_batch(_signal_inputs(df), cfg)
+    traded = batch.action != HOLD
+    side = _direction(batch)
+    rows = np.flatnonzero(traded)
+    fills = simulate_fills(
+        df, side[rows], batch.stop_loss_pct[rows], batch.target_pct[rows], execution, fine, rows
+    )
+    returns = np.zeros(len(traded))
+    returns[rows] = fills.returns * batch.size_fraction[rows]
+    won = np.zeros(len(traded), dtype=bool)
+    won[rows] = fills.returns > 0
+    reason = np.full(len(traded), EXIT_CLOSE, dtype=np.int8)
+    reason[rows] = fills.exit_reason
+    return batch, returns, traded, won, side, reason
+
+
+def backtest(
+    df: pd.DataFrame,
+    cfg: SignalConfig,
+    vectorized: bool = True,
+    execution: ExecutionConfig | None = None,
+    fine: pd.DataFrame | None = None,
+) -> dict[str, float | int]:
+    """Run the signal engine over ``df``.
+
+    The vectorized mode evaluates every bar in one pass over the columns; the
+    scalar mode scores one row at a time and is kept as the reference.
+    Trades take their signal's side (see ``_direction``). With ``execution``
+    each trade is filled against the bar's range with its signal's stop and
+    target and costs (see ``simulate_fills``) instead of taking the
+    close-to-close move.
+    """
+    if execution is not None:
+        arr, traded, won = _executed_returns(df, cfg, execution, fine)[1:4]
+    elif vectorized:
+        arr, traded, won = _vector_returns(df, cfg)
+    else:
+        arr, traded, won = _scalar_returns(df, cfg)
+    return _metrics(arr, traded, won)
+
+
+@dataclass
+class BacktestResult:
+    metrics: dict[str, float | int]
+    equity: pd.DataFrame  # ts, equity, drawdown: one row per bar
+    trades: pd.DataFrame  # one row per trade, see ``_trade_ledger``
+
+
+def _bar_times(df: pd.DataFrame) -> pd.Series:
+    return (df["ts"] if "ts" in df.columns else df.index.to_series()).reset_index(drop=True)
+
+
+def _trade_ledger(
+    df: pd.DataFrame,
+    symbol: str,
+    batch: SignalBatch,
+    returns: np.ndarray,
+    traded: np.ndarray,
+    side: np.ndarray,
+    exit_reason: np.ndarray,
+) -> pd.DataFrame:
+    """Each traded bar is a trade entered at the previous bar's close and exited within this bar."""
+    ts = _bar_times(df)
+    rows = np.flatnonzero(traded)
+    move = _column(df, "actual_move", 0.0)
+    return pd.DataFrame({
+        "symbol": symbol,
+        "entry_ts": ts.shift(1).iloc[rows].to_numpy(),
+        "exit_ts": ts.iloc[rows].to_numpy(),
+        "action": batch.action_names()[rows],
+        "side": side[rows],
+        "size": batch.size_fraction[rows],
+        "move_pct": move[rows],
+        "pnl_pct": returns[rows] * 100,
+        "exit_reason": np.asarray(EXIT_REASONS, dtype=object)[exit_reason[rows]],
+    })
+
+
+def backtest_detailed(
+    df: pd.DataFrame,
+    cfg: SignalConfig,
+    symbol: str = "",
+    execution: ExecutionConfig | None = None,
+    fine: pd.DataFrame | None = None,
+) -> BacktestResult:
+    """``backtest`` plus the per-bar equity curve and the trade ledger."""
+    if execution is not None:
+        batch, returns, traded, won, side, reason = _executed_returns(df, cfg, execution, fine)
+    else:
+        batch, returns, traded, won = _trade_returns(_signal_inputs(df), cfg)
+        side, reason = _direction(batch), np.full(len(returns), EXIT_CLOSE, dtype=np.int8)
+    curve, drawdown = equity_curve(returns)
+    equity = pd.DataFrame({"ts": _bar_times(df).to_numpy(), "equity": curve, "drawdown": drawdown})
+    return BacktestResult(
+        metrics=_metrics(returns, traded, won),
+        equity=equity,
+        trades=_trade_ledger(df, symbol, batch, returns, traded, side, reason),
+    )
+
+
+_PREPARE_SPECS = [IndicatorSpec("rsi", 14), IndicatorSpec("ema", 21), IndicatorSpec("px_vs_ema", 21)]
+
+
 def _prepare_df(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
-    df["rsi"] = rsi(df["close"]).fillna(50)
-    df["ema21"] = ema(df["close"], span=21)
-    df["px_vs_ema21"] = ((df["close"] - df["ema21"]) / df["ema21"]).fillna(0)
+    fm = build_feature_matrix(_PREPARE_SPECS, df["close"])
+    df["rsi"] = np.nan_to_num(fm.column("rsi_14"), nan=50.0)
+    df["ema21"] = fm.column("ema_21")
+    df["px_vs_ema21"] = np.nan_to_num(fm.column("px_vs_ema_21"), nan=0.0)
     df["actual_move"] = df["close"].pct_change() * 100
     df["pred_move"] = df["actual_move"].shift(1).fillna(0)
     df["p_up"] = np.where(df["pred_move"] >= 0, 0.7, 0.3)
@@ -73,14 +272,37 @@ def _prepare_df(df: pd.DataFrame) -> pd.DataFrame:
     return df.dropna(subset=["actual_move"])
 
 
-def run_backtest(symbols: list[str], start: datetime, end: datetime) -> dict[str, dict[str, float | int]]:
+def run_backtest(
+    symbols: list[str],
+    start: datetime,
+    end: datetime,
+    cfg: SignalConfig | None = None,
+    ledger: LedgerStore | None = None,
+    run_id: str | None = None,
+    execution: ExecutionConfig | None = None,
+    bars: Mapping[str, pd.DataFrame] | None = None,
+) -> dict[str, dict[str, float | int]]:
+    """Per-symbol metrics; with ``ledger`` and ``run_id`` the trades and equity curves are saved too.
+
+    ``bars`` (symbol -> bars, e.g. from ``load_historical_bars``) skips the
+    bar cache, so worker processes never open it.
+    """
+    cfg = cfg or SignalConfig(kelly_fraction_cap=0.5)
+    keep = ledger is not None and run_id is not None
     results = {}
+    detailed: dict[str, BacktestResult] = {}
     for sym in symbols:
-        bars = fetch_historical_bars(sym, start, end)
-        if bars.empty:
+        sym_bars = bars[sym] if bars is not None else fetch_historical_bars(sym, start, end)
+        if sym_bars.empty:
             continue
-        df = _prepare_df(bars)
-        results[sym] = backtest(df, SignalConfig(kelly_fraction_cap=0.5))
+        df = _prepare_df(sym_bars)
+        if keep:
+            detailed[sym] = backtest_detailed(df, cfg, sym.upper(), execution)
+            results[sym] = detailed[sym].metrics
+        else:
+            results[sym] = backtest(df, cfg, execution=execution)
+    if ledger is not None and run_id is not None:
+        ledger.save(run_id, detailed)
     return results
 
 
@@ -89,13 +311,32 @@ def main() -> None:
     parser.add_argument("--from", dest="from_date", required=True)
     parser.add_argument("--to", dest="to_date", required=True)
     parser.add_argument("--symbols", type=str, required=True)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--portfolio", action="store_true", help="trade all symbols from one capital pool")
+    parser.add_argument("--intrabar", action="store_true", help="fill stops/targets against each bar's range")
+    parser.add_argument("--slippage-bps", type=float, default=0.0)
+    parser.add_argument("--commission-bps", type=float, default=0.0)
     args = parser.parse_args()
+    if args.intrabar and (args.portfolio or args.workers > 1):
+        parser.error("--intrabar is not supported with --portfolio or --workers")
+    if (args.slippage_bps or args.commission_bps) and not args.intrabar:
+        parser.error("--slippage-bps/--commission-bps need --intrabar")
 
     start = datetime.fromisoformat(args.from_date)
     end = datetime.utcnow() if args.to_date.lower() == "today" else datetime.fromisoformat(args.to_date)
     symbols = [s.strip() for s in args.symbols.split(",")]
 
-    res = run_backtest(symbols, start, end)
+    if args.portfolio:
+        from .portfolio import run_portfolio_backtest
+
+        res = {"PORTFOLIO": run_portfolio_backtest(symbols, start, end).metrics}
+    elif args.workers > 1:
+        from .parallel import run_backtest_parallel
+
+        res = run_backtest_parallel(symbols, start, end, workers=args.workers).results
+    else:
+        execution = ExecutionConfig(args.slippage_bps, args.commission_bps) if args.intrabar else None
+        res = run_backtest(symbols, start, end, execution=execution)
     for sym, metrics in res.items():
         print(sym)
         for k, v in metrics.items():
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Exit reason codes; ``EXIT_REASONS[code]`` gives the ledger label.
+EXIT_REASONS = ("close", "stop", "target")
+EXIT_CLOSE, EXIT_STOP, EXIT_TARGET = range(len(EXIT_REASONS))
+
+
+@dataclass
+class ExecutionConfig:
+    slippage_bps: float = 0.0  # per market fill: entry, stop and close exits (targets are limit fills)
+    commission_bps: float = 0.0  # per side, on notional
+
+
+@dataclass
+class Fills:
+    returns: np.ndarray  # per-trade return on notional, after costs (fraction)
+    exit_reason: np.ndarray  # int8 codes into EXIT_REASONS
+
+
+def _signed_pct(px: np.ndarray, ref: np.ndarray, side: np.ndarray) -> np.ndarray:
+    return np.asarray(side * (px / ref - 1) * 100)
+
+
+def _first_hits(
+    fine: pd.DataFrame,
+    start: np.ndarray,
+    end: np.ndarray,
+    ref: np.ndarray,
+    side: np.ndarray,
+    stop: np.ndarray,
+    target: np.ndarray,
+) -> np.ndarray:
+    """Resolve stop-vs-target for each trade from the finer bars starting in [start, end).
+
+    Returns EXIT_STOP / EXIT_TARGET, or -1 where the fine bars hit neither.
+    All trades' windows are scanned as one flat array and reduced per
+    segment; a fine bar that touches both still counts as the stop.
+    """
+    ts = pd.to_datetime(fine["ts"]).to_numpy(dtype="datetime64[ns]")
+    lo_i = np.searchsorted(ts, start)
+    hi_i = np.searchsorted(ts, end)
+    counts = hi_i - lo_i
+    out = np.full(len(ref), -1, dtype=np.int8)
+    has = counts > 0
+    if not has.any():
+        return out
+    counts, lo_i = counts[has], lo_i[has]
+    seg = np.repeat(np.arange(len(counts)), counts)
+    rows = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + lo_i[seg]
+    high = fine["high"].to_numpy(dtype=float)[rows]
+    low = fine["low"].to_numpy(dtype=float)[rows]
+    s, r = side[has][seg], ref[has][seg]
+    adverse = _signed_pct(np.where(s > 0, low, high), r, s)
+    favorable = _signed_pct(np.where(s > 0, high, low), r, s)
+    pos = np.arange(len(rows))
+    none = len(rows)
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+    first_stop = np.minimum.reduceat(np.where(adverse <= stop[has][seg], pos, none), starts)
+    first_target = np.minimum.reduceat(np.where(favorable >= target[has][seg], pos, none), starts)
+    code = np.where(first_stop <= first_target, EXIT_STOP, EXIT_TARGET).astype(np.int8)
+    code[(first_stop == none) & (first_target == none)] = -1
+    out[has] = code
+    return out
+
+
+def simulate_fills(
+    bars: pd.DataFrame,
+    side: np.ndarray,
+    stop_pct: np.ndarray,
+    target_pct: np.ndarray,
+    cfg: ExecutionConfig,
+    fine: pd.DataFrame | None = None,
+    rows: np.ndarray | None = None,
+) -> Fills:
+    """Fill one-bar trades entered at the previous close, for all ``rows`` of ``bars`` at once.
+
+    ``bars`` needs ``actual_move`` and ``close`` (plus ``open``/``high``/``low``
+    when available, and ``ts`` for ``fine``). ``side`` (+1/-1) and
+    ``stop_pct``/``target_pct`` (signal-relative moves in percent, 0 means
+    none) are aligned with ``rows`` (default: every bar). A gap through a
+    level fills at the open; when the bar's range covers both levels,
+    ``fine`` bars (``ts``, ``high``, ``low``, e.g. from
+    ``DuckDBStore.iter_bars``) decide which came first, and without them the
+    stop is assumed.
+    """
+    sel = slice(None) if rows is None else rows
+    move = bars["actual_move"].to_numpy(dtype=float)[sel]
+    # Without prices, work in units of the previous close.
+    close = bars["close"].to_numpy(dtype=float)[sel] if "close" in bars.columns else 1 + move / 100
+    ref = close / (1 + move / 100)  # previous close
+    col = {c: bars[c].to_numpy(dtype=float)[sel] if c in bars.columns else close for c in ("open", "high", "low")}
+    stop = np.where(stop_pct != 0, -np.abs(stop_pct), -np.inf)
+    target = np.where(target_pct != 0, np.abs(target_pct), np.inf)
+
+    long = side > 0
+    open_r = _signed_pct(col["open"], ref, side)
+    adverse = _signed_pct(np.where(long, col["low"], col["high"]), ref, side)
+    favorable = _signed_pct(np.where(long, col["high"], col["low"]), ref, side)
+
+    stop_hit = adverse <= stop
+    target_hit = favorable >= target
+    reason = np.full(len(close), EXIT_CLOSE, dtype=np.int8)
+    reason[target_hit] = EXIT_TARGET
+    reason[stop_hit] = EXIT_STOP
+    both = stop_hit & target_hit & (open_r > stop) & (open_r < target)
+    if fine is not None and both.any():
+        # Bars are labelled by their start, so a bar spans up to the next bar's ts.
+        ts = pd.to_datetime(bars["ts"]).to_numpy(dtype="datetime64[ns]")
+        last_span = ts[-1] - ts[-2] if len(ts) > 1 else np.timedelta64(1, "D")
+        end = np.r_[ts[1:], ts[-1:] + last_span]
+        ts, end = ts[sel], end[sel]
+        first = _first_hits(fine, ts[both], end[both], ref[both], side[both], stop[both], target[both])
+        idx = np.flatnonzero(both)
+        reason[idx[first >= 0]] = first[first >= 0]
+    gap_stop = open_r <= stop
+    gap_target = open_r >= target
+    reason[gap_target] = EXIT_TARGET
+    reason[gap_stop] = EXIT_STOP
+
+    exit_r = _signed_pct(close, ref, side)
+    at_stop = reason == EXIT_STOP
+    at_target = reason == EXIT_TARGET
+    exit_r[at_stop] = np.minimum(stop, open_r)[at_stop]
+    exit_r[at_target] = np.where(gap_target, open_r, target)[at_target]
+    costs = cfg.slippage_bps * (1 + ~at_target) + 2 * cfg.commission_bps
+    return Fills(returns=exit_r / 100 - costs / 1e4, exit_reason=reason)
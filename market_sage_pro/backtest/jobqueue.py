@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Mapping, Sequence
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Protocol
+
+import orjson
+import pandas as pd
+
+from ..data.store import load_historical_bars
+from ..signals.generator import SignalConfig
+from ..utils.logging import get_logger
+from .engine import run_backtest
+from .ledger import LedgerStore
+
+try:
+    import redis
+except Exception:  # pragma: no cover - Redis is optional; jobs fall back to in-process
+    redis = None  # type: ignore
+
+logger = get_logger(__name__)
+
+REDIS_URL = os.environ.get("MARKETSAGE_REDIS_URL")
+RESULT_TTL = int(os.environ.get("MARKETSAGE_BACKTEST_TTL", "3600"))
+WORKERS = int(os.environ.get("MARKETSAGE_BACKTEST_WORKERS", "2"))
+
+Results = dict[str, dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class BacktestSpec:
+    symbols: tuple[str, ...]
+    start: datetime
+    end: datetime
+    cfg: SignalConfig = field(default_factory=lambda: SignalConfig(kelly_fraction_cap=0.5))
+
+    @classmethod
+    def create(
+        cls,
+        symbols: Sequence[str],
+        start: datetime,
+        end: datetime,
+        cfg: SignalConfig | None = None,
+    ) -> BacktestSpec:
+        syms = tuple(sorted({s.strip().upper() for s in symbols if s.strip()}))
+        return cls(syms, start, end, cfg or SignalConfig(kelly_fraction_cap=0.5))
+
+    def key(self) -> str:
+        payload = orjson.dumps(self.to_dict(), option=orjson.OPT_SORT_KEYS)
+        return hashlib.sha256(payload).hexdigest()
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"symbols": list(self.symbols), "start": self.start, "end": self.end, "cfg": asdict(self.cfg)}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> BacktestSpec:
+        return cls(
+            tuple(data["symbols"]),
+            datetime.fromisoformat(data["start"]),
+            datetime.fromisoformat(data["end"]),
+            SignalConfig(**data["cfg"]),
+        )
+
+
+def load_spec_bars(spec: BacktestSpec) -> dict[str, pd.DataFrame]:
+    return load_historical_bars(list(spec.symbols), spec.start, spec.end)
+
+
+def run_spec(spec: BacktestSpec, bars: Mapping[str, pd.DataFrame] | None = None) -> Results:
+    """Run a spec and keep its trade ledger under the spec key.
+
+    Pass ``bars`` when running in a pool worker: DuckDB allows one writer
+    process per file, so only the parent should open the bar cache.
+    """
+    return run_backtest(
+        list(spec.symbols), spec.start, spec.end, spec.cfg, LedgerStore(), spec.key(), bars=bars
+    )
+
+
+@dataclass
+class Job:
+    id: str
+    key: str
+    status: str = "queued"  # queued -> running -> done | failed
+    cached: bool = False
+    submitted_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    error: str | None = None
+    result: Results | None = None
+
+    def summary(self) -> dict[str, Any]:
+        return {k: v for k, v in asdict(self).items() if k != "result"}
+
+
+class TTLCache:
+    """Thread-safe LRU map whose entries also expire ``ttl`` seconds after being set."""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 3600.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class JobQueue(Protocol):
+    def submit(self, spec: BacktestSpec) -> Job: ...
+
+    def get(self, job_id: str) -> Job | None: ...
+
+
+class LocalJobQueue:
+    """In-process queue: jobs run on an executor, results land in a ``TTLCache``.
+
+    Identical specs share one in-flight job and later hit the cache.
+    ``submit`` returns at once; a loader thread then reads the bars with
+    ``loader`` (the default for ``run_spec``) and hands them to ``runner``
+    on the executor as a second argument, so pool workers never open the
+    bar cache themselves. Up to ``max_jobs`` jobs stay visible to ``get``;
+    past that the oldest finished ones are dropped, never in-flight ones.
+    """
+
+    def __init__(
+        self,
+        workers: int = WORKERS,
+        cache: TTLCache | None = None,
+        executor: Executor | None = None,
+        runner: Callable[..., Results] = run_spec,
+        max_jobs: int = 1000,
+        loader: Callable[[BacktestSpec], Mapping[str, pd.DataFrame]] | None = None,
+    ) -> None:
+        self.cache = cache or TTLCache(ttl=RESULT_TTL)
+        self._executor = executor
+        self._workers = workers
+        self._runner = runner
+        self._loader = loader if loader is not None or runner is not run_spec else load_spec_bars
+        self._max_jobs = max_jobs
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._inflight: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        # Bar loads run here, off the caller's thread; one at a time, as they share the bar cache.
+        self._loads = ThreadPoolExecutor(max_workers=1, thread_name_prefix="backtest-load")
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._workers)
+        return self._executor
+
+    def submit(self, spec: BacktestSpec) -> Job:
+        key = spec.key()
+        with self._lock:
+            hit = self.cache.get(key)
+            if hit is not None:
+                job = Job(uuid.uuid4().hex, key, "done", cached=True, finished_at=time.time(), result=hit)
+                self._remember(job)
+                return job
+            if key in self._inflight:
+                return self._inflight[key]
+            job = Job(uuid.uuid4().hex, key)
+            self._remember(job)
+            self._inflight[key] = job
+        self._loads.submit(self._dispatch, job, spec)
+        return job
+
+    def _remember(self, job: Job) -> None:
+        self._jobs[job.id] = job
+        excess = len(self._jobs) - self._max_jobs
+        if excess > 0:
+            finished = [k for k, j in self._jobs.items() if j.finished_at is not None]
+            for k in finished[:excess]:
+                del self._jobs[k]
+
+    def _dispatch(self, job: Job, spec: BacktestSpec) -> None:
+        try:
+            args = (spec,) if self._loader is None else (spec, self._loader(spec))
+            job.status = "running"
+            future = self._pool().submit(self._runner, *args)
+        except Exception as exc:
+            failed: Future[Results] = Future()
+            failed.set_exception(exc)
+            self._finish(job, failed)
+            return
+        future.add_done_callback(lambda f: self._finish(job, f))
+
+    def _finish(self, job: Job, future: Future[Results]) -> None:
+        with self._lock:
+            try:
+                job.result = future.result()
+                job.status = "done"
+                self.cache.set(job.key, job.result)
+            except Exception as exc:
+                job.status, job.error = "failed", repr(exc)
+                logger.warning("Backtest job %s failed: %s", job.id, exc)
+            job.finished_at = time.time()
+            self._inflight.pop(job.key, None)
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self) -> None:
+        self._loads.shutdown(wait=False, cancel_futures=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class RedisJobQueue:
+    """Jobs and results shared through Redis; ``work`` runs in separate worker processes.
+
+    Results are stored with ``EX ttl``; LRU eviction is left to the server's
+    ``maxmemory-policy``.
+    """
+
+    def __init__(self, client: Any, ttl: int = RESULT_TTL, prefix: str = "marketsage:backtest") -> None:
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.queue = f"{prefix}:queue"
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.prefix}:job:{job_id}"
+
+    def _result_key(self, key: str) -> str:
+        return f"{self.prefix}:result:{key}"
+
+    def _inflight_key(self, key: str) -> str:
+        return f"{self.prefix}:inflight:{key}"
+
+    def submit(self, spec: BacktestSpec) -> Job:
+        """Queue ``spec``; identical specs share the in-flight job through a ``SET NX`` claim."""
+        key = spec.key()
+        job = Job(uuid.uuid4().hex, key)
+        if self.client.exists(self._result_key(key)):
+            job.status, job.cached, job.finished_at = "done", True, time.time()
+        elif not self.client.set(self._inflight_key(key), job.id, nx=True, ex=self.ttl):
+            owner = self.client.get(self._inflight_key(key))
+            existing = self.get(owner.decode()) if owner is not None else None
+            if existing is not None:
+                return existing
+            # The claim's job expired; take the claim over.
+            self.client.set(self._inflight_key(key), job.id, ex=self.ttl)
+        fields = {"key": key, "status": job.status, "cached": int(job.cached), "submitted_at": job.submitted_at}
+        pipe = self.client.pipeline()
+        pipe.hset(self._job_key(job.id), mapping={**fields, "spec": orjson.dumps(spec.to_dict())})
+        pipe.expire(self._job_key(job.id), self.ttl)
+        if not job.cached:
+            pipe.lpush(self.queue, job.id)
+        pipe.execute()
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        raw = self.client.hgetall(self._job_key(job_id))
+        if not raw:
+            return None
+        data = {k.decode(): v.decode() for k, v in raw.items()}
+        job = Job(
+            job_id,
+            data["key"],
+            data["status"],
+            cached=bool(int(data["cached"])),
+            submitted_at=float(data["submitted_at"]),
+            finished_at=float(data["finished_at"]) if "finished_at" in data else None,
+            error=data.get("error"),
+        )
+        if job.status == "done":
+            blob = self.client.get(self._result_key(job.key))
+            job.result = orjson.loads(blob) if blob is not None else None
+        return job
+
+    def work(self, runner: Callable[[BacktestSpec], Results] = run_spec, timeout: int = 5) -> None:
+        """Worker loop: pop job ids and run them until interrupted."""
+        while True:
+            item = self.client.brpop(self.queue, timeout=timeout)
+            if item is None:
+                continue
+            job_id = item[1].decode()
+            raw = self.client.hget(self._job_key(job_id), "spec")
+            if raw is None:
+                continue
+            spec = BacktestSpec.from_dict(orjson.loads(raw))
+            self.client.hset(self._job_key(job_id), "status", "running")
+            fields: dict[str, Any]
+            try:
+                result = runner(spec)
+                self.client.set(self._result_key(spec.key()), orjson.dumps(result), ex=self.ttl)
+                fields = {"status": "done"}
+            except Exception as exc:
+                logger.warning("Backtest job %s failed: %s", job_id, exc)
+                fields = {"status": "failed", "error": repr(exc)}
+            self.client.hset(self._job_key(job_id), mapping={**fields, "finished_at": time.time()})
+            self.client.delete(self._inflight_key(spec.key()))
+
+
+def default_job_queue() -> JobQueue:
+    """Redis-backed when ``MARKETSAGE_REDIS_URL`` is set and reachable, else in-process."""
+    if REDIS_URL and redis is not None:
+        client = redis.Redis.from_url(REDIS_URL)
+        try:
+            client.ping()
+            return RedisJobQueue(client)
+        except Exception as exc:
+            logger.warning("Redis unavailable (%s); using in-process backtest queue", exc)
+    return LocalJobQueue()
+
+
+if __name__ == "__main__":
+    if not REDIS_URL or redis is None:
+        raise SystemExit("MARKETSAGE_REDIS_URL must be set to run a backtest worker")
+    logger.info("Starting backtest worker on %s", REDIS_URL)
+    RedisJobQueue(redis.Redis.from_url(REDIS_URL)).work()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+import shutil
+from collections.abc import Mapping
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+
+from ..utils.logging import get_logger
+from .engine import BacktestResult
+
+logger = get_logger(__name__)
+
+LEDGER_DIR = os.environ.get("MARKETSAGE_LEDGER_DIR", "data/backtests")
+
+# Column types of an empty run, matching ``BacktestResult.trades`` / ``.equity``.
+_EMPTY_TRADES = {
+    "symbol": "object",
+    "entry_ts": "datetime64[ns]",
+    "exit_ts": "datetime64[ns]",
+    "action": "object",
+    "side": "float64",
+    "size": "float64",
+    "move_pct": "float64",
+    "pnl_pct": "float64",
+    "exit_reason": "object",
+}
+_EMPTY_EQUITY = {"symbol": "object", "ts": "datetime64[ns]", "equity": "float64", "drawdown": "float64"}
+
+
+def _empty(schema: Mapping[str, str]) -> pd.DataFrame:
+    return pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in schema.items()})
+
+
+class LedgerStore:
+    """Backtest trade ledgers and equity curves as Parquet files, one directory per run.
+
+    Each run is written once (``trades.parquet`` and ``equity.parquet``) and
+    read back through DuckDB, so callers can page through a run's trades
+    without loading or recomputing it. Files rather than one database keep
+    concurrent worker processes from contending for a writer lock.
+    """
+
+    def __init__(self, root: str | Path = LEDGER_DIR, row_group_size: int = 100_000) -> None:
+        self.root = Path(root)
+        self.row_group_size = row_group_size
+
+    def _dir(self, run_id: str) -> Path:
+        if not run_id or not run_id.replace("-", "").replace("_", "").isalnum():
+            raise ValueError(f"invalid run id: {run_id!r}")
+        return self.root / run_id
+
+    def exists(self, run_id: str) -> bool:
+        return (self._dir(run_id) / "trades.parquet").exists()
+
+    def save(self, run_id: str, results: Mapping[str, BacktestResult]) -> int:
+        """Write every symbol's trades and equity for ``run_id``; returns the trade count.
+
+        Trades get a ``trade_id`` in (symbol, exit_ts) order, which is the
+        paging key for ``read_trades``.
+        """
+        out = self._dir(run_id)
+        tmp = out.with_name(out.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        if results:
+            trades = pd.concat([r.trades for r in results.values()], ignore_index=True)
+            equity = pd.concat([r.equity.assign(symbol=sym) for sym, r in results.items()], ignore_index=True)
+        else:
+            trades, equity = _empty(_EMPTY_TRADES), _empty(_EMPTY_EQUITY)
+        with duckdb.connect() as conn:
+            conn.execute("SET TimeZone = 'UTC'")
+            conn.register("trades_df", trades)
+            conn.register("equity_df", equity)
+            opts = f"(FORMAT PARQUET, ROW_GROUP_SIZE {int(self.row_group_size)})"
+            conn.execute(
+                f"""
+                COPY (SELECT row_number() OVER (ORDER BY symbol, exit_ts) - 1 AS trade_id, *
+                      FROM trades_df ORDER BY trade_id)
+                TO '{tmp / "trades.parquet"}' {opts}
+                """
+            )
+            conn.execute(
+                f"COPY (SELECT symbol, ts, equity, drawdown FROM equity_df ORDER BY symbol, ts) "
+                f"TO '{tmp / 'equity.parquet'}' {opts}"
+            )
+        shutil.rmtree(out, ignore_errors=True)
+        tmp.rename(out)
+        logger.info("Saved ledger %s: %d trades", run_id, len(trades))
+        return len(trades)
+
+    def _query(self, sql: str, params: list[object]) -> pd.DataFrame:
+        with duckdb.connect() as conn:
+            conn.execute("SET TimeZone = 'UTC'")
+            return conn.execute(sql, params).fetchdf()
+
+    def read_trades(
+        self,
+        run_id: str,
+        after: int = -1,
+        limit: int = 1000,
+        symbol: str | None = None,
+    ) -> pd.DataFrame:
+        """Up to ``limit`` trades with ``trade_id > after`` (keyset paging)."""
+        path = self._dir(run_id) / "trades.parquet"
+        if not path.exists():
+            raise FileNotFoundError(f"no ledger for run {run_id}")
+        where = "trade_id > ?"
+        params: list[object] = [after]
+        if symbol is not None:
+            where += " AND symbol = ?"
+            params.append(symbol.upper())
+        return self._query(
+            f"SELECT * FROM read_parquet('{path}') WHERE {where} ORDER BY trade_id LIMIT ?", [*params, limit]
+        )
+
+    def read_equity(self, run_id: str, symbol: str | None = None) -> pd.DataFrame:
+        path = self._dir(run_id) / "equity.parquet"
+        if not path.exists():
+            raise FileNotFoundError(f"no ledger for run {run_id}")
+        if symbol is None:
+            return self._query(f"SELECT * FROM read_parquet('{path}') ORDER BY symbol, ts", [])
+        return self._query(f"SELECT * FROM read_parquet('{path}') WHERE symbol = ? ORDER BY ts", [symbol.upper()])
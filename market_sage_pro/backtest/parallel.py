@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ..data.store import load_historical_bars
+from ..signals.generator import SignalConfig
+from ..utils.logging import get_logger
+from .engine import _prepare_df, backtest
+
+logger = get_logger(__name__)
+
+_FIELDS = ("open", "high", "low", "close", "volume")
+
+# Memory-mapped views opened once per worker process by ``_init_worker``.
+_TS: np.ndarray | None = None
+_VALUES: np.ndarray | None = None
+
+
+@dataclass
+class WorkerTiming:
+    pid: int
+    symbols: list[str] = field(default_factory=list)
+    bars: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class ParallelBacktestResult:
+    results: dict[str, dict[str, float | int]]
+    worker_timings: list[WorkerTiming]
+    wall_seconds: float
+
+
+def _pack_bars(bars: Mapping[str, pd.DataFrame], out_dir: Path) -> dict[str, tuple[int, int]]:
+    """Write all symbols' bars as one long ts/values pair of ``.npy`` files.
+
+    Workers memory-map these files, so each one only touches the rows of the
+    symbols it is given instead of receiving pickled DataFrames.
+    """
+    slices: dict[str, tuple[int, int]] = {}
+    ts_parts: list[np.ndarray] = []
+    value_parts: list[np.ndarray] = []
+    offset = 0
+    for sym, df in bars.items():
+        if df.empty:
+            continue
+        ts_parts.append(pd.to_datetime(df["ts"]).to_numpy(dtype="datetime64[ns]").view(np.int64))
+        value_parts.append(df[list(_FIELDS)].to_numpy(dtype=np.float64))
+        slices[sym] = (offset, offset + len(df))
+        offset += len(df)
+    ts = np.concatenate(ts_parts) if ts_parts else np.empty(0, dtype=np.int64)
+    values = np.concatenate(value_parts) if value_parts else np.empty((0, len(_FIELDS)))
+    np.save(out_dir / "ts.npy", ts)
+    np.save(out_dir / "values.npy", np.ascontiguousarray(values))
+    return slices
+
+
+def _init_worker(data_dir: str) -> None:
+    global _TS, _VALUES
+    _TS = np.load(Path(data_dir) / "ts.npy", mmap_mode="r")
+    _VALUES = np.load(Path(data_dir) / "values.npy", mmap_mode="r")
+
+
+def _bars_slice(start: int, stop: int) -> pd.DataFrame:
+    assert _TS is not None and _VALUES is not None
+    values = np.asarray(_VALUES[start:stop])
+    df = pd.DataFrame({"ts": np.asarray(_TS[start:stop]).view("datetime64[ns]")})
+    for i, name in enumerate(_FIELDS):
+        df[name] = values[:, i]
+    return df
+
+
+def _run_symbol(
+    symbol: str, start: int, stop: int, cfg: SignalConfig
+) -> tuple[str, dict[str, float | int], int, float]:
+    t0 = time.perf_counter()
+    metrics = backtest(_prepare_df(_bars_slice(start, stop)), cfg)
+    return symbol, metrics, os.getpid(), time.perf_counter() - t0
+
+
+def backtest_many(
+    bars: Mapping[str, pd.DataFrame],
+    cfg: SignalConfig,
+    workers: int | None = None,
+) -> ParallelBacktestResult:
+    t0 = time.perf_counter()
+    results: dict[str, dict[str, float | int]] = {}
+    timings: dict[int, WorkerTiming] = {}
+    with tempfile.TemporaryDirectory(prefix="msp-bars-") as data_dir:
+        slices = _pack_bars(bars, Path(data_dir))
+        if slices:
+            with ProcessPoolExecutor(
+                max_workers=workers or os.cpu_count(),
+                initializer=_init_worker,
+                initargs=(data_dir,),
+            ) as pool:
+                futures = [
+                    pool.submit(_run_symbol, sym, start, stop, cfg)
+                    for sym, (start, stop) in slices.items()
+                ]
+                for fut in futures:
+                    sym, metrics, pid, seconds = fut.result()
+                    results[sym] = metrics
+                    timing = timings.setdefault(pid, WorkerTiming(pid=pid))
+                    timing.symbols.append(sym)
+                    timing.bars += slices[sym][1] - slices[sym][0]
+                    timing.seconds += seconds
+    wall = time.perf_counter() - t0
+    for timing in timings.values():
+        logger.info(
+            "worker %d: %d symbols, %d bars in %.3fs",
+            timing.pid,
+            len(timing.symbols),
+            timing.bars,
+            timing.seconds,
+        )
+    return ParallelBacktestResult(results=results, worker_timings=list(timings.values()), wall_seconds=wall)
+
+
+def run_backtest_parallel(
+    symbols: list[str], start: datetime, end: datetime, workers: int | None = None
+) -> ParallelBacktestResult:
+    bars = load_historical_bars(symbols, start, end)
+    return backtest_many(bars, SignalConfig(kelly_fraction_cap=0.5), workers=workers)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from ..data.store import fetch_historical_bars
+from ..risk.manager import RiskConfig, RiskManager
+from ..signals.generator import HOLD, SignalConfig
+from ..utils.logging import get_logger
+from .engine import _direction, _metrics, _prepare_df, _signal_batch, _signal_inputs
+
+logger = get_logger(__name__)
+
+_INPUTS = (
+    "ensemble_up_prob",
+    "ensemble_down_prob",
+    "predicted_move_pct",
+    "rsi",
+    "price_vs_ema21",
+    "ivr",
+    "prob_big_move",
+    "actual_move",
+)
+
+
+@dataclass
+class PortfolioConfig:
+    initial_equity: float = 100_000.0
+    risk: RiskConfig = field(default_factory=lambda: RiskConfig(max_daily_loss_pct=-2.0))
+    max_gross_exposure: float = 1.0  # sum of |weights| per bar, as a fraction of equity
+    pdt_restricted: bool = False
+
+
+@dataclass
+class PortfolioResult:
+    metrics: dict[str, float | int]
+    equity: pd.Series  # portfolio equity after each bar
+    exposure: pd.DataFrame  # applied signed weight per (bar, symbol)
+    gross: pd.Series
+    blocked: pd.Series  # bars where RiskManager refused new positions
+
+
+def _panels(frames: Mapping[str, pd.DataFrame]) -> tuple[pd.Index, list[str], dict[str, np.ndarray]]:
+    """Align every symbol's signal inputs on the union of timestamps (time x symbol)."""
+    symbols = sorted(sym for sym, df in frames.items() if not df.empty)
+    index = pd.DatetimeIndex([])
+    ts_by_sym = {}
+    for sym in symbols:
+        df = frames[sym]
+        ts_by_sym[sym] = pd.DatetimeIndex(df["ts"] if "ts" in df.columns else df.index)
+        index = index.union(ts_by_sym[sym])
+    panels = {name: np.full((len(index), len(symbols)), np.nan) for name in _INPUTS}
+    for j, sym in enumerate(symbols):
+        rows = index.get_indexer(ts_by_sym[sym])
+        for name, values in _signal_inputs(frames[sym]).items():
+            panels[name][rows, j] = values
+    return index, symbols, panels
+
+
+def target_weights(panels: Mapping[str, np.ndarray], cfg: SignalConfig, pf: PortfolioConfig) -> np.ndarray:
+    """Signed Kelly weights per (bar, symbol) after the per-symbol cap and the gross limit."""
+    shape = panels["actual_move"].shape
+    flat = {k: np.nan_to_num(v.ravel(), nan=0.0) for k, v in panels.items()}
+    batch = _signal_batch(flat, cfg)
+    w = np.where(batch.action != HOLD, _direction(batch) * batch.size_fraction, 0.0).reshape(shape)
+    w[np.isnan(panels["actual_move"])] = 0.0
+    cap = pf.risk.per_symbol_cap_pct / 100
+    w = np.clip(w, -cap, cap)
+    gross = np.abs(w).sum(axis=1, keepdims=True)
+    return np.asarray(w * np.minimum(1.0, pf.max_gross_exposure / np.maximum(gross, 1e-12)))
+
+
+def backtest_portfolio(
+    frames: Mapping[str, pd.DataFrame],
+    cfg: SignalConfig,
+    pf: PortfolioConfig | None = None,
+) -> PortfolioResult:
+    """Trade all symbols from one capital pool on a shared timeline.
+
+    ``frames`` are prepared per-symbol frames (``_prepare_df`` columns plus
+    ``ts`` or a datetime index). Weights are computed for the whole panel
+    at once; the loop over bars only carries equity and the RiskManager
+    state (daily loss breaker, reset each calendar day, and PDT check),
+    which gate whether the bar's positions are taken.
+    """
+    pf = pf or PortfolioConfig()
+    index, symbols, panels = _panels(frames)
+    weights = target_weights(panels, cfg, pf)
+    bar_ret = (weights * np.nan_to_num(panels["actual_move"]) / 100).sum(axis=1)
+
+    rm = RiskManager(pf.risk)
+    days = index.normalize().asi8 if len(index) else np.empty(0, dtype=np.int64)
+    equity = np.empty(len(index))
+    allowed = np.ones(len(index), dtype=bool)
+    eq = day_start = pf.initial_equity
+    day = None
+    for t in range(len(index)):
+        if days[t] != day:
+            day, day_start = days[t], eq
+            rm.reset_day()
+        allowed[t] = rm.can_open_new(eq, 0.0, pf.pdt_restricted)
+        if allowed[t]:
+            eq *= 1 + bar_ret[t]
+            rm.update_daily_pnl((eq / day_start - 1) * 100)
+        equity[t] = eq
+
+    weights[~allowed] = 0.0
+    ret = np.where(allowed, bar_ret, 0.0)
+    traded = np.abs(weights).sum(axis=1) > 0
+    metrics = _metrics(ret, traded, traded & (ret > 0))
+    metrics["final_equity"] = float(equity[-1]) if len(equity) else pf.initial_equity
+    metrics["blocked_bars"] = int((~allowed).sum())
+    logger.info("Portfolio backtest: %d symbols x %d bars, %d bars blocked", len(symbols), len(index),
+                metrics["blocked_bars"])
+    return PortfolioResult(
+        metrics=metrics,
+        equity=pd.Series(equity, index=index, name="equity"),
+        exposure=pd.DataFrame(weights, index=index, columns=symbols),
+        gross=pd.Series(np.abs(weights).sum(axis=1), index=index, name="gross"),
+        blocked=pd.Series(~allowed, index=index, name="blocked"),
+    )
+
+
+def run_portfolio_backtest(
+    symbols: list[str],
+    start: datetime,
+    end: datetime,
+    cfg: SignalConfig | None = None,
+    pf: PortfolioConfig | None = None,
+) -> PortfolioResult:
+    frames = {}
+    for sym in symbols:
+        bars = fetch_historical_bars(sym, start, end)
+        if not bars.empty:
+            frames[sym] = _prepare_df(bars)
+    return backtest_portfolio(frames, cfg or SignalConfig(kelly_fraction_cap=0.5), pf)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import itertools
+import os
+import time
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields, replace
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from ..signals.generator import SignalConfig
+from ..utils.logging import get_logger
+from .engine import _metrics, _prepare_df, _returns_from_inputs, _signal_inputs
+
+try:
+    import optuna
+except Exception:  # pragma: no cover - optional tuning backend
+    optuna = None  # type: ignore
+
+logger = get_logger(__name__)
+
+PreparedInputs = dict[str, dict[str, np.ndarray]]
+
+TUNABLE = tuple(f.name for f in fields(SignalConfig))
+_METRICS = ("CAGR", "max_drawdown", "Sharpe", "Sortino", "win_rate", "profit_factor")
+
+# Per-process copy of the prepared inputs, set once by ``_init_worker``.
+_WORKER_INPUTS: PreparedInputs = {}
+
+
+def prepare_inputs(bars: Mapping[str, pd.DataFrame]) -> PreparedInputs:
+    """Run ``_prepare_df`` once per symbol and keep only the signal input arrays."""
+    return {sym: _signal_inputs(_prepare_df(df)) for sym, df in bars.items() if not df.empty}
+
+
+def param_grid(space: Mapping[str, Sequence[float]]) -> list[dict[str, float]]:
+    _check_params(space)
+    keys = list(space)
+    return [dict(zip(keys, combo, strict=True)) for combo in itertools.product(*space.values())]
+
+
+def _check_params(params: Mapping[str, Any]) -> None:
+    unknown = set(params) - set(TUNABLE)
+    if unknown:
+        raise ValueError(f"not SignalConfig fields: {sorted(unknown)}")
+
+
+def evaluate(prepared: PreparedInputs, cfg: SignalConfig) -> dict[str, float]:
+    """Metrics for one parameter set, averaged across symbols (trades summed)."""
+    per_symbol = [_metrics(*_returns_from_inputs(inputs, cfg)) for inputs in prepared.values()]
+    out = {k: float(np.nanmean([m[k] for m in per_symbol])) for k in _METRICS}
+    out["trades"] = float(sum(m["trades"] for m in per_symbol))
+    return out
+
+
+def _init_worker(prepared: PreparedInputs) -> None:
+    global _WORKER_INPUTS
+    _WORKER_INPUTS = prepared
+
+
+def _evaluate_chunk(base: SignalConfig, trials: list[dict[str, float]]) -> list[dict[str, float]]:
+    return [{**params, **evaluate(_WORKER_INPUTS, replace(base, **params))} for params in trials]
+
+
+def _rank(rows: list[dict[str, float]], objective: str, maximize: bool) -> pd.DataFrame:
+    table = pd.DataFrame(rows)
+    if table.empty:
+        return table
+    table = table.sort_values(objective, ascending=not maximize, na_position="last", kind="stable")
+    return table.reset_index(drop=True)
+
+
+def sweep(
+    prepared: PreparedInputs,
+    grid: Sequence[Mapping[str, float]] | Mapping[str, Sequence[float]],
+    base: SignalConfig | None = None,
+    objective: str = "Sharpe",
+    maximize: bool = True,
+    workers: int | None = 1,
+) -> pd.DataFrame:
+    """Evaluate every parameter set against precomputed inputs and rank them.
+
+    ``grid`` is either a list of parameter dicts or a ``{field: values}``
+    space expanded with ``param_grid``. Features are never recomputed; with
+    ``workers > 1`` (``None`` for all cores) each process receives the
+    inputs once at start-up and then evaluates chunks of trials.
+    """
+    base = base or SignalConfig(kelly_fraction_cap=0.5)
+    trials = param_grid(grid) if isinstance(grid, Mapping) else [dict(p) for p in grid]
+    for params in trials:
+        _check_params(params)
+    n_workers = workers or os.cpu_count() or 1
+    t0 = time.perf_counter()
+    if n_workers <= 1 or len(trials) < 2:
+        _init_worker(prepared)
+        rows = _evaluate_chunk(base, trials)
+    else:
+        size = max(1, len(trials) // (n_workers * 4))
+        chunks = [trials[i : i + size] for i in range(0, len(trials), size)]
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_worker,
+            initargs=(prepared,),
+        ) as pool:
+            rows = [row for chunk in pool.map(_evaluate_chunk, [base] * len(chunks), chunks) for row in chunk]
+    elapsed = time.perf_counter() - t0
+    logger.info(
+        "Evaluated %d trials in %.2fs (%.0f trials/min)",
+        len(trials),
+        elapsed,
+        60 * len(trials) / max(elapsed, 1e-9),
+    )
+    return _rank(rows, objective, maximize)
+
+
+def optuna_search(
+    prepared: PreparedInputs,
+    space: Mapping[str, tuple[float, float]],
+    n_trials: int = 200,
+    base: SignalConfig | None = None,
+    objective: str = "Sharpe",
+    maximize: bool = True,
+    seed: int | None = None,
+) -> pd.DataFrame:
+    """Optuna search over ``{field: (low, high)}`` ranges; needs ``optuna`` installed."""
+    if optuna is None:
+        raise RuntimeError("optuna is not installed; use sweep() for grid search")
+    _check_params(space)
+    base = base or SignalConfig(kelly_fraction_cap=0.5)
+    rows: list[dict[str, float]] = []
+
+    def trial_fn(trial: Any) -> float:
+        params = {k: trial.suggest_float(k, lo, hi) for k, (lo, hi) in space.items()}
+        row = {**params, **evaluate(prepared, replace(base, **params))}
+        rows.append(row)
+        value = row[objective]
+        return float("-inf" if maximize else "inf") if np.isnan(value) else value
+
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    study = optuna.create_study(
+        direction="maximize" if maximize else "minimize",
+        sampler=optuna.samplers.TPESampler(seed=seed),
+    )
+    study.optimize(trial_fn, n_trials=n_trials)
+    return _rank(rows, objective, maximize)
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from ..data.pipeline import DEFAULT_SPECS, IndicatorSpec, build_feature_matrix
+from ..models.ensemble import soft_vote
+from ..models.lightgbm_hourly import HourlyLightGBM, HourlyModelConfig
+from ..models.tft_daily import DailyTFT
+from ..signals.generator import SignalConfig
+from ..utils.logging import get_logger
+from .engine import _metrics, _returns_from_inputs
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class WalkForwardConfig:
+    train_bars: int = 500
+    test_bars: int = 100
+    expanding: bool = False
+    # Continue the previous fold's booster on the bars added since it was
+    # trained instead of refitting from scratch. Folds then run in order; a
+    # fold whose warm start would pass ``model.max_trees`` refits instead.
+    warm_start: bool = False
+    warm_start_rounds: int = 50
+    specs: Sequence[str | IndicatorSpec] = DEFAULT_SPECS
+    vote_mode: str = "intraday"
+    model: HourlyModelConfig = field(default_factory=HourlyModelConfig)
+
+
+@dataclass
+class Fold:
+    index: int
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+
+
+@dataclass
+class FoldResult:
+    fold: Fold
+    metrics: dict[str, float | int]
+    seconds: float
+    trees: int = 0
+
+
+@dataclass
+class WalkForwardResult:
+    metrics: dict[str, float | int]
+    folds: list[FoldResult]
+    predictions: pd.DataFrame
+
+
+@dataclass
+class _Dataset:
+    """Cached, one-bar-lagged feature matrix plus the signal inputs per row."""
+
+    X: np.ndarray
+    y: np.ndarray
+    move_pct: np.ndarray
+    rsi: np.ndarray
+    px_vs_ema21: np.ndarray
+    ts: np.ndarray
+
+
+# Per-process dataset, shipped once to each worker by ``_init_worker``.
+_WORKER_DATA: _Dataset | None = None
+
+
+def _optional(df: pd.DataFrame, name: str) -> np.ndarray | None:
+    return df[name].to_numpy(dtype=float) if name in df.columns else None
+
+
+def build_dataset(bars: pd.DataFrame, specs: Sequence[str | IndicatorSpec] = DEFAULT_SPECS) -> _Dataset:
+    close = bars["close"].to_numpy(dtype=float)
+    fm = build_feature_matrix(specs, close, _optional(bars, "high"), _optional(bars, "low"), _optional(bars, "volume"))
+    move_pct = np.full(close.shape, np.nan)
+    move_pct[1:] = (close[1:] / close[:-1] - 1) * 100
+    # Row t is predicted from features known at the close of bar t-1.
+    X = fm.values[:-1]
+    move = move_pct[1:]
+    valid = np.isfinite(X).all(axis=1) & np.isfinite(move)
+    first = int(np.argmax(valid)) if valid.any() else len(valid)
+    sl = slice(first, None)
+
+    def feature(name: str, default: float) -> np.ndarray:
+        if name in fm.columns:
+            return np.asarray(np.nan_to_num(fm.column(name)[:-1][sl], nan=default))
+        return np.full(len(move[sl]), default)
+
+    ts = bars["ts"].to_numpy()[1:][sl] if "ts" in bars.columns else np.arange(1, len(close))[sl]
+    return _Dataset(
+        X=np.ascontiguousarray(X[sl]),
+        y=(move[sl] > 0).astype(int),
+        move_pct=np.nan_to_num(move[sl]),
+        rsi=feature("rsi_14", 50.0),
+        px_vs_ema21=feature("px_vs_ema_21", 0.0),
+        ts=ts,
+    )
+
+
+def make_folds(n: int, wf: WalkForwardConfig) -> list[Fold]:
+    folds: list[Fold] = []
+    test_start = wf.train_bars
+    while test_start < n:
+        test_end = min(test_start + wf.test_bars, n)
+        train_start = 0 if wf.expanding else test_start - wf.train_bars
+        folds.append(Fold(len(folds), train_start, test_start, test_start, test_end))
+        test_start = test_end
+    return folds
+
+
+def _score_fold(
+    data: _Dataset,
+    fold: Fold,
+    cfg: SignalConfig,
+    wf: WalkForwardConfig,
+    init_model: HourlyLightGBM | None = None,
+    fit_from: int | None = None,
+) -> tuple[FoldResult, np.ndarray, np.ndarray, HourlyLightGBM]:
+    t0 = time.perf_counter()
+    start = fold.train_start if fit_from is None else fit_from
+    X_train, y_train = data.X[start : fold.train_end], data.y[start : fold.train_end]
+    test = slice(fold.test_start, fold.test_end)
+
+    if init_model is None:
+        model = HourlyLightGBM(wf.model)
+        model.fit(X_train, y_train)
+    else:
+        model = HourlyLightGBM(HourlyModelConfig(**{**wf.model.__dict__, "n_estimators": wf.warm_start_rounds}))
+        model.fit(X_train, y_train, init_model=init_model)
+    daily = DailyTFT()
+    daily.fit(X_train, y_train)
+    p_up = soft_vote(model.predict_proba(data.X[test])[:, 1], daily.predict_proba(data.X[test])[:, 1], wf.vote_mode)
+
+    # Expected move scales the training window's typical move by the edge.
+    typical_move = float(np.mean(np.abs(data.move_pct[fold.train_start : fold.train_end])))
+    n = fold.test_end - fold.test_start
+    inputs = {
+        "ensemble_up_prob": p_up,
+        "ensemble_down_prob": 1 - p_up,
+        "predicted_move_pct": (2 * p_up - 1) * typical_move,
+        "rsi": data.rsi[test],
+        "price_vs_ema21": data.px_vs_ema21[test],
+        "ivr": np.full(n, 0.5),
+        "prob_big_move": np.full(n, 0.7),
+        "actual_move": data.move_pct[test],
+    }
+    returns, traded, won = _returns_from_inputs(inputs, cfg)
+    result = FoldResult(fold, _metrics(returns, traded, won), time.perf_counter() - t0, model.num_trees)
+    return result, np.stack([returns, traded, won]), p_up, model
+
+
+def _init_worker(data: _Dataset) -> None:
+    global _WORKER_DATA
+    _WORKER_DATA = data
+
+
+def _score_fold_worker(
+    fold: Fold, cfg: SignalConfig, wf: WalkForwardConfig
+) -> tuple[FoldResult, np.ndarray, np.ndarray]:
+    assert _WORKER_DATA is not None
+    result, arrays, p_up, _ = _score_fold(_WORKER_DATA, fold, cfg, wf)
+    return result, arrays, p_up
+
+
+def walk_forward(
+    bars: pd.DataFrame,
+    cfg: SignalConfig,
+    wf: WalkForwardConfig | None = None,
+    workers: int | None = 1,
+) -> WalkForwardResult:
+    """Train on each window, predict the next out-of-sample block, backtest it.
+
+    The feature matrix is built once and every fold slices it. Independent
+    folds run across ``workers`` processes; with ``wf.warm_start`` they run
+    in order, each continuing the previous fold's booster.
+    """
+    wf = wf or WalkForwardConfig()
+    data = build_dataset(bars, wf.specs)
+    folds = make_folds(len(data.y), wf)
+    outputs: list[tuple[FoldResult, np.ndarray, np.ndarray]] = []
+    n_workers = workers or os.cpu_count() or 1
+    if wf.warm_start:
+        prev: HourlyLightGBM | None = None
+        for fold in folds:
+            if prev is not None and prev.num_trees + wf.warm_start_rounds > wf.model.max_trees:
+                prev = None
+            fit_from = None if prev is None else outputs[-1][0].fold.train_end
+            result, arrays, p_up, prev = _score_fold(data, fold, cfg, wf, prev, fit_from)
+            outputs.append((result, arrays, p_up))
+    elif n_workers <= 1 or len(folds) < 2:
+        outputs = [_score_fold(data, fold, cfg, wf)[:3] for fold in folds]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=(data,)) as pool:
+            outputs = list(pool.map(_score_fold_worker, folds, [cfg] * len(folds), [wf] * len(folds)))
+
+    if not outputs:
+        empty = np.empty(0)
+        return WalkForwardResult(_metrics(empty, empty.astype(bool), empty.astype(bool)), [], pd.DataFrame())
+    arrays = np.concatenate([o[1] for o in outputs], axis=1)
+    returns, traded, won = arrays[0], arrays[1].astype(bool), arrays[2].astype(bool)
+    p_up = np.concatenate([o[2] for o in outputs])
+    oos = slice(folds[0].test_start, folds[-1].test_end)
+    predictions = pd.DataFrame(
+        {"ts": data.ts[oos], "p_up": p_up, "actual_move": data.move_pct[oos], "return": returns, "traded": traded}
+    )
+    for res in (o[0] for o in outputs):
+        logger.info(
+            "fold %d: train [%d, %d) test [%d, %d), %d trees in %.2fs",
+            res.fold.index,
+            res.fold.train_start,
+            res.fold.train_end,
+            res.fold.test_start,
+            res.fold.test_end,
+            res.trees,
+            res.seconds,
+        )
+    return WalkForwardResult(_metrics(returns, traded, won), [o[0] for o in outputs], predictions)
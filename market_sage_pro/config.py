@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import os
+import threading
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
 import yaml
-from pydantic import BaseModel, Field, ValidationError, field_validator
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
 
 from .secrets import decrypt_text, encrypt_text
 from .utils.logging import get_logger
@@ -15,6 +18,9 @@ logger = get_logger(__name__)
 
 
 class AppConfig(BaseModel):
+    # Frozen so one validated instance can be shared by every request.
+    model_config = ConfigDict(frozen=True)
+
     alpaca_key: str
     alpaca_secret: str
     alpaca_endpoint: str = "https://paper-api.alpaca.markets/v2"
@@ -46,7 +52,12 @@ class SecretBundle:
 
 def load_config(path: str = "config.yaml") -> AppConfig:
     with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
+        try:
+            data = yaml.safe_load(f) or {}
+        except yaml.YAMLError as e:
+            raise RuntimeError(f"Invalid config.yaml: {e}") from e
+    if not isinstance(data, dict):
+        raise RuntimeError(f"Invalid config.yaml: expected a mapping, got {type(data).__name__}")
     try:
         cfg = AppConfig(**data)
     except ValidationError as e:
@@ -54,6 +65,90 @@ def load_config(path: str = "config.yaml") -> AppConfig:
     return cfg
 
 
+class ConfigService:
+    """Holds the parsed ``AppConfig`` and reloads it when the file changes.
+
+    ``get()`` returns the current snapshot without touching the filesystem
+    (after the first load). The first existing path in ``paths`` is used;
+    changes are detected by polling (path, mtime, size) every
+    ``poll_seconds`` and the new config replaces the old one in a single
+    assignment. An invalid edit, or the file going missing, is logged once
+    and the previous config kept.
+    """
+
+    def __init__(self, *paths: str, poll_seconds: float = 2.0) -> None:
+        self.paths = paths or ("config.yaml",)
+        self.poll_seconds = poll_seconds
+        self.reloads = 0
+        self._snapshot: AppConfig | None = None
+        self._stamp: tuple[str, int, int] | None = None
+        self._lock = threading.Lock()
+        self._task: asyncio.Task[None] | None = None
+
+    def _current_stamp(self) -> tuple[str, int, int]:
+        for path in self.paths:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            return path, st.st_mtime_ns, st.st_size
+        raise FileNotFoundError(f"no config file found in {', '.join(self.paths)}")
+
+    def get(self) -> AppConfig:
+        cfg = self._snapshot
+        if cfg is None:
+            self.reload_if_changed()
+            cfg = self._snapshot
+            assert cfg is not None
+        return cfg
+
+    def reload_if_changed(self) -> bool:
+        with self._lock:
+            try:
+                stamp = self._current_stamp()
+            except FileNotFoundError as exc:
+                if self._snapshot is None:
+                    raise
+                if self._stamp is not None:
+                    logger.warning("Config file missing, keeping current config: %s", exc)
+                    self._stamp = None
+                return False
+            if stamp == self._stamp:
+                return False
+            try:
+                cfg = load_config(stamp[0])
+            except (RuntimeError, OSError) as exc:
+                if self._snapshot is None:
+                    raise
+                logger.warning("Config reload failed, keeping current config: %s", exc)
+                self._stamp = stamp
+                return False
+            self._snapshot, self._stamp = cfg, stamp
+            self.reloads += 1
+            logger.info("Loaded config from %s", stamp[0])
+            return True
+
+    async def _poll_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await asyncio.to_thread(self.reload_if_changed)
+            except Exception as exc:
+                logger.warning("Config check failed: %s", exc)
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self.get)
+        if self.poll_seconds > 0 and self._task is None:
+            self._task = asyncio.create_task(self._poll_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
 def ensure_encrypted_secrets(cfg: AppConfig, passphrase: str, secrets_path: str = "secrets.gpg") -> None:
     if Path(secrets_path).exists():
         logger.info("Encrypted secrets already exist; skipping re-encryption.")
@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+from collections.abc import Sequence
+from dataclasses import dataclass, field, fields
+from typing import Any, TypeVar
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .pipeline import IndicatorSpec
+
+# Stateful, O(window) counterparts of the batch indicators in ``features``.
+# Each one takes bar-by-bar ``update`` calls or micro-batches via
+# ``update_many`` and round-trips through ``state_dict``/``from_state`` so a
+# live process can checkpoint and resume without replaying history.
+
+T = TypeVar("T", bound="_Incremental")
+
+NAN = float("nan")
+
+
+def _window(maxlen: int, values: Any = ()) -> deque[Any]:
+    return deque((tuple(v) if isinstance(v, list) else v for v in values), maxlen=maxlen)
+
+
+def _ema_step(prev: float, x: float, span: int) -> float:
+    if math.isnan(x):
+        return prev
+    if math.isnan(prev):
+        return x
+    alpha = 2.0 / (span + 1)
+    return (1 - alpha) * prev + alpha * x
+
+
+class _Incremental:
+    def state_dict(self) -> dict[str, Any]:
+        out: dict[str, Any] = {}
+        for f in fields(self):  # type: ignore[arg-type]
+            v = getattr(self, f.name)
+            out[f.name] = [list(x) if isinstance(x, tuple) else x for x in v] if isinstance(v, deque) else v
+        return out
+
+    @classmethod
+    def from_state(cls: type[T], state: dict[str, Any]) -> T:
+        return cls(**state)
+
+
+@dataclass
+class IncrementalEMA(_Incremental):
+    span: int
+    value: float = NAN
+
+    def update(self, x: float) -> float:
+        self.value = _ema_step(self.value, x, self.span)
+        return self.value
+
+    def update_many(self, xs: ArrayLike) -> np.ndarray:
+        return np.array([self.update(x) for x in np.asarray(xs, dtype=float).tolist()])
+
+
+@dataclass
+class IncrementalRSI(_Incremental):
+    period: int = 14
+    prev: float = NAN
+    ups: deque[float] = field(default_factory=deque)
+    downs: deque[float] = field(default_factory=deque)
+
+    def __post_init__(self) -> None:
+        self.ups = _window(self.period, self.ups)
+        self.downs = _window(self.period, self.downs)
+
+    def update(self, x: float) -> float:
+        if not math.isnan(self.prev):
+            delta = x - self.prev
+            self.ups.append(max(delta, 0.0))
+            self.downs.append(-min(delta, 0.0))
+        self.prev = x
+        if len(self.ups) < self.period:
+            return NAN
+        rs = (sum(self.ups) / self.period) / (sum(self.downs) / self.period + 1e-9)
+        return 100 - (100 / (1 + rs))
+
+    def update_many(self, xs: ArrayLike) -> np.ndarray:
+        return np.array([self.update(x) for x in np.asarray(xs, dtype=float).tolist()])
+
+
+@dataclass
+class IncrementalMACD(_Incremental):
+    fast: int = 12
+    slow: int = 26
+    signal: int = 9
+    ema_fast: float = NAN
+    ema_slow: float = NAN
+    ema_signal: float = NAN
+
+    def update(self, x: float) -> tuple[float, float]:
+        self.ema_fast = _ema_step(self.ema_fast, x, self.fast)
+        self.ema_slow = _ema_step(self.ema_slow, x, self.slow)
+        macd_line = self.ema_fast - self.ema_slow
+        self.ema_signal = _ema_step(self.ema_signal, macd_line, self.signal)
+        return macd_line, macd_line - self.ema_signal
+
+    def update_many(self, xs: ArrayLike) -> np.ndarray:
+        """Columns are (macd_line, histogram), as returned by ``features.macd``."""
+        out = [self.update(x) for x in np.asarray(xs, dtype=float).tolist()]
+        return np.array(out, dtype=float).reshape(-1, 2)
+
+
+@dataclass
+class IncrementalATR(_Incremental):
+    period: int = 14
+    prev_close: float = NAN
+    trs: deque[float] = field(default_factory=deque)
+
+    def __post_init__(self) -> None:
+        self.trs = _window(self.period, self.trs)
+
+    def update(self, high: float, low: float, close: float) -> float:
+        tr = abs(high - low)
+        if not math.isnan(self.prev_close):
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.trs.append(tr)
+        if len(self.trs) < self.period:
+            return NAN
+        return sum(self.trs) / self.period
+
+    def update_many(self, high: ArrayLike, low: ArrayLike, close: ArrayLike) -> np.ndarray:
+        rows = zip(
+            np.asarray(high, dtype=float).tolist(),
+            np.asarray(low, dtype=float).tolist(),
+            np.asarray(close, dtype=float).tolist(),
+            strict=True,
+        )
+        return np.array([self.update(h, lo, c) for h, lo, c in rows])
+
+
+@dataclass
+class IncrementalVWAP(_Incremental):
+    pv: float = 0.0
+    volume: float = 0.0
+
+    def update(self, close: float, volume: float) -> float:
+        self.pv += close * volume
+        self.volume += volume
+        return self.pv / (self.volume + 1e-9)
+
+    def update_many(self, close: ArrayLike, volume: ArrayLike) -> np.ndarray:
+        rows = zip(
+            np.asarray(close, dtype=float).tolist(),
+            np.asarray(volume, dtype=float).tolist(),
+            strict=True,
+        )
+        return np.array([self.update(c, v) for c, v in rows])
+
+
+@dataclass
+class IncrementalZScore(_Incremental):
+    window: int = 20
+    values: deque[float] = field(default_factory=deque)
+
+    def __post_init__(self) -> None:
+        self.values = _window(self.window, self.values)
+
+    def update(self, x: float) -> float:
+        self.values.append(x)
+        if len(self.values) < self.window:
+            return NAN
+        mean = sum(self.values) / self.window
+        var = sum((v - mean) ** 2 for v in self.values) / self.window
+        return (x - mean) / (math.sqrt(var) + 1e-9)
+
+    def update_many(self, xs: ArrayLike) -> np.ndarray:
+        return np.array([self.update(x) for x in np.asarray(xs, dtype=float).tolist()])
+
+
+@dataclass
+class IncrementalIVRank(_Incremental):
+    lookback_days: int = 252
+    count: int = 0
+    # Monotonic (index, value) deques: front is the window min / max.
+    mins: deque[tuple[int, float]] = field(default_factory=deque)
+    maxs: deque[tuple[int, float]] = field(default_factory=deque)
+
+    def __post_init__(self) -> None:
+        self.mins = _window(self.lookback_days, self.mins)
+        self.maxs = _window(self.lookback_days, self.maxs)
+
+    def update(self, iv: float) -> float:
+        i = self.count
+        self.count += 1
+        while self.mins and self.mins[-1][1] >= iv:
+            self.mins.pop()
+        while self.maxs and self.maxs[-1][1] <= iv:
+            self.maxs.pop()
+        self.mins.append((i, iv))
+        self.maxs.append((i, iv))
+        start = i - self.lookback_days + 1
+        while self.mins[0][0] < start:
+            self.mins.popleft()
+        while self.maxs[0][0] < start:
+            self.maxs.popleft()
+        if self.count < self.lookback_days:
+            return NAN
+        lo, hi = self.mins[0][1], self.maxs[0][1]
+        return (iv - lo) / (hi - lo + 1e-9)
+
+    def update_many(self, xs: ArrayLike) -> np.ndarray:
+        return np.array([self.update(x) for x in np.asarray(xs, dtype=float).tolist()])
+
+
+class IncrementalFeatureSet:
+    """Bar-by-bar counterpart of ``pipeline.build_feature_matrix`` for one symbol.
+
+    ``update`` returns the same row the batch builder would produce for that
+    bar, in ``columns`` order. EMAs/MACDs shared between specs are stepped once.
+    ``state_dict``/``from_state`` checkpoint all of it, like the single indicators.
+    """
+
+    def __init__(self, specs: Sequence[IndicatorSpec | str]) -> None:
+        self.specs = [s if isinstance(s, IndicatorSpec) else IndicatorSpec.parse(s) for s in specs]
+        self.columns = [s.name for s in self.specs]
+        self._emas: dict[int, IncrementalEMA] = {}
+        self._macds: dict[tuple[int, int, int], IncrementalMACD] = {}
+        self._states: dict[tuple[Any, ...], Any] = {}
+        self.prev_close = NAN
+        for spec in self.specs:
+            w = spec.window or 0
+            if spec.kind in ("ema", "px_vs_ema"):
+                self._emas.setdefault(w, IncrementalEMA(w))
+            elif spec.kind in ("macd", "macd_hist"):
+                self._macds.setdefault((spec.fast, spec.slow, spec.signal), IncrementalMACD(spec.fast, spec.slow, spec.signal))
+            elif spec.kind == "rsi":
+                self._states.setdefault(("rsi", w), IncrementalRSI(w))
+            elif spec.kind == "atr":
+                self._states.setdefault(("atr", w), IncrementalATR(w))
+            elif spec.kind == "vwap":
+                self._states.setdefault(("vwap",), IncrementalVWAP())
+            elif spec.kind == "zscore":
+                self._states.setdefault(("zscore", w), IncrementalZScore(w))
+
+    def state_dict(self) -> dict[str, Any]:
+        """JSON-serialisable checkpoint of the specs and every indicator's state."""
+        return {
+            "specs": [[s.kind, s.window, s.fast, s.slow, s.signal] for s in self.specs],
+            "prev_close": self.prev_close,
+            "emas": [[w, e.state_dict()] for w, e in self._emas.items()],
+            "macds": [[list(k), m.state_dict()] for k, m in self._macds.items()],
+            "states": [[list(k), st.state_dict()] for k, st in self._states.items()],
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> IncrementalFeatureSet:
+        out = cls([IndicatorSpec(*spec) for spec in state["specs"]])
+        out.prev_close = state["prev_close"]
+        out._emas = {int(w): IncrementalEMA.from_state(s) for w, s in state["emas"]}
+        out._macds = {(k[0], k[1], k[2]): IncrementalMACD.from_state(s) for k, s in state["macds"]}
+        out._states = {tuple(k): type(out._states[tuple(k)]).from_state(s) for k, s in state["states"]}
+        return out
+
+    def update(self, close: float, high: float = NAN, low: float = NAN, volume: float = 0.0) -> np.ndarray:
+        ema = {w: e.update(close) for w, e in self._emas.items()}
+        macd = {k: m.update(close) for k, m in self._macds.items()}
+        values: dict[tuple[Any, ...], float] = {}
+        for key, state in self._states.items():
+            if key[0] == "atr":
+                values[key] = state.update(high, low, close)
+            elif key[0] == "vwap":
+                values[key] = state.update(close, volume)
+            else:
+                values[key] = state.update(close)
+        out = np.empty(len(self.specs))
+        for i, spec in enumerate(self.specs):
+            w = spec.window or 0
+            if spec.kind == "ema":
+                out[i] = ema[w]
+            elif spec.kind == "px_vs_ema":
+                out[i] = (close - ema[w]) / ema[w]
+            elif spec.kind in ("macd", "macd_hist"):
+                out[i] = macd[(spec.fast, spec.slow, spec.signal)][spec.kind == "macd_hist"]
+            elif spec.kind == "pct_change":
+                out[i] = close / self.prev_close - 1
+            else:
+                out[i] = values[(spec.kind,) if spec.kind == "vwap" else (spec.kind, w)]
+        self.prev_close = close
+        return out
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+from numpy.typing import ArrayLike
+
+from .pipeline import (
+    IndicatorSpec,
+    _Kernels,
+    _rolling_max,
+    _rolling_mean,
+    _rolling_min,
+    _rolling_std,
+    build_feature_matrix,
+)
+
+# Cross-sectional variants of ``features``: every function takes 2-D
+# (time x symbol) arrays and computes all symbols in one call. Symbols that
+# start trading later are NaN-padded at the top; their warm-up NaNs line up
+# with what the single-series function gives on that symbol's own history.
+# A NaN inside a column is treated as a missing value, not a skipped bar, so
+# symbols with gaps or their own timestamps should go through
+# ``panel_features``, which lines each symbol up by bar number instead.
+
+
+def _panel(x: ArrayLike) -> np.ndarray:
+    arr = np.asarray(x, dtype=np.float64)
+    if arr.ndim != 2:
+        raise ValueError("panel inputs must be 2-D (time x symbol)")
+    return arr
+
+
+def ema_panel(close: ArrayLike, span: int) -> np.ndarray:
+    return _Kernels(_panel(close), None, None, None).ema(span)
+
+
+def rsi_panel(close: ArrayLike, period: int = 14) -> np.ndarray:
+    return _Kernels(_panel(close), None, None, None).rsi(period)
+
+
+def macd_panel(
+    close: ArrayLike, fast: int = 12, slow: int = 26, signal: int = 9
+) -> tuple[np.ndarray, np.ndarray]:
+    k = _Kernels(_panel(close), None, None, None)
+    macd_line = k.macd(fast, slow)
+    return macd_line, macd_line - k.macd_signal(fast, slow, signal)
+
+
+def atr_panel(high: ArrayLike, low: ArrayLike, close: ArrayLike, period: int = 14) -> np.ndarray:
+    return _Kernels(_panel(close), _panel(high), _panel(low), None).atr(period)
+
+
+def vwap_panel(close: ArrayLike, volume: ArrayLike) -> np.ndarray:
+    return _Kernels(_panel(close), None, None, _panel(volume)).vwap()
+
+
+def rolling_zscore_panel(x: ArrayLike, window: int = 20) -> np.ndarray:
+    arr = _panel(x)
+    return np.asarray((arr - _rolling_mean(arr, window)) / (_rolling_std(arr, window) + 1e-9))
+
+
+def implied_vol_rank_panel(iv: ArrayLike, lookback_days: int = 252) -> np.ndarray:
+    arr = _panel(iv)
+    roll_min = _rolling_min(arr, lookback_days)
+    return np.asarray((arr - roll_min) / (_rolling_max(arr, lookback_days) - roll_min + 1e-9))
+
+
+def to_panel(
+    long_df: pd.DataFrame, field: str, symbol_col: str = "symbol", ts_col: str = "ts"
+) -> tuple[np.ndarray, pd.Index, pd.Index]:
+    """Pivot a long (symbol, ts) frame to a (time x symbol) array plus its axes."""
+    wide = long_df.pivot(index=ts_col, columns=symbol_col, values=field).sort_index()
+    return wide.to_numpy(dtype=np.float64), wide.index, wide.columns
+
+
+def panel_features(
+    long_df: pd.DataFrame,
+    specs: Sequence[IndicatorSpec | str],
+    symbol_col: str = "symbol",
+    ts_col: str = "ts",
+) -> pd.DataFrame:
+    """Features for a long-format bar frame, computed for all symbols at once.
+
+    Returns one row per input (symbol, ts) with a column per spec, sorted by
+    (symbol, ts). Each symbol's bars are stacked by bar number rather than
+    timestamp, so gaps and unaligned timestamps give exactly the values of
+    ``build_feature_matrix`` on that symbol's own history.
+    """
+    fields = [f for f in ("close", "high", "low", "volume") if f in long_df.columns]
+    bars = long_df.sort_values([symbol_col, ts_col], kind="stable").reset_index(drop=True)
+    codes, symbols = pd.factorize(bars[symbol_col], sort=True)
+    rank = bars.groupby(symbol_col, sort=False).cumcount().to_numpy()
+    shape = (int(rank.max()) + 1 if len(rank) else 0, len(symbols))
+    arrays = {}
+    for f in fields:
+        arrays[f] = np.full(shape, np.nan)
+        arrays[f][rank, codes] = bars[f].to_numpy(dtype=np.float64)
+    fm = build_feature_matrix(
+        specs,
+        arrays["close"],
+        arrays.get("high"),
+        arrays.get("low"),
+        arrays.get("volume"),
+    )
+    out = pd.DataFrame(fm.values[rank, codes], columns=fm.columns)
+    out.insert(0, symbol_col, bars[symbol_col].to_numpy())
+    out.insert(1, ts_col, bars[ts_col].to_numpy())
+    return out
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from numpy.typing import ArrayLike, DTypeLike
+
+# Single-pass feature matrix builder. The kernels below work on 1-D
+# (time,) or 2-D (time x symbol) arrays alike and reproduce the batch
+# functions in ``features`` without building per-feature DataFrames or
+# columns: results go straight into one matrix. Rolling and EWM windows
+# still run through zero-copy pandas views of the input arrays (``_pandas``),
+# since pandas' window kernels are what the batch functions use.
+
+KINDS = ("ema", "px_vs_ema", "rsi", "macd", "macd_hist", "atr", "vwap", "zscore", "pct_change")
+_DEFAULT_WINDOW = {"ema": 21, "px_vs_ema": 21, "rsi": 14, "atr": 14, "zscore": 20}
+
+# Model feature set shared by walk-forward training, streaming and the scheduler.
+DEFAULT_SPECS: tuple[str, ...] = ("rsi:14", "px_vs_ema:21", "macd_hist", "atr:14", "zscore:20", "pct_change")
+
+
+@dataclass(frozen=True)
+class IndicatorSpec:
+    kind: str
+    window: int | None = None
+    fast: int = 12
+    slow: int = 26
+    signal: int = 9
+
+    def __post_init__(self) -> None:
+        if self.kind not in KINDS:
+            raise ValueError(f"unknown indicator kind: {self.kind}")
+        if self.window is None and self.kind in _DEFAULT_WINDOW:
+            object.__setattr__(self, "window", _DEFAULT_WINDOW[self.kind])
+
+    @property
+    def name(self) -> str:
+        if self.kind in ("macd", "macd_hist"):
+            return f"{self.kind}_{self.fast}_{self.slow}_{self.signal}"
+        return self.kind if self.window is None else f"{self.kind}_{self.window}"
+
+    @classmethod
+    def parse(cls, text: str) -> IndicatorSpec:
+        """``"rsi"``, ``"ema:50"`` or ``"macd:12:26:9"``."""
+        kind, *args = text.split(":")
+        if kind in ("macd", "macd_hist") and args:
+            fast, slow, signal = (int(a) for a in args)
+            return cls(kind, fast=fast, slow=slow, signal=signal)
+        return cls(kind, int(args[0]) if args else None)
+
+
+@dataclass
+class FeatureMatrix:
+    values: np.ndarray
+    columns: list[str]
+
+    def column(self, name: str) -> np.ndarray:
+        return self.values[..., self.columns.index(name)]
+
+
+def _pandas(x: np.ndarray) -> Any:
+    return pd.Series(x, copy=False) if x.ndim == 1 else pd.DataFrame(x, copy=False)
+
+
+def _ema(x: np.ndarray, span: int) -> np.ndarray:
+    return np.asarray(_pandas(x).ewm(span=span, adjust=False).mean().to_numpy(dtype=float))
+
+
+def _rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    return np.asarray(_pandas(x).rolling(window).mean().to_numpy(dtype=float))
+
+
+def _rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    return np.asarray(_pandas(x).rolling(window).std(ddof=0).to_numpy(dtype=float))
+
+
+def _rolling_min(x: np.ndarray, window: int) -> np.ndarray:
+    return np.asarray(_pandas(x).rolling(window).min().to_numpy(dtype=float))
+
+
+def _rolling_max(x: np.ndarray, window: int) -> np.ndarray:
+    return np.asarray(_pandas(x).rolling(window).max().to_numpy(dtype=float))
+
+
+def _cumsum_skipna(x: np.ndarray) -> np.ndarray:
+    # pandas ``cumsum`` semantics: NaNs stay NaN but do not reset the sum.
+    out = np.nancumsum(x, axis=0)
+    out[np.isnan(x)] = np.nan
+    return out
+
+
+def _shift(x: np.ndarray) -> np.ndarray:
+    out = np.empty_like(x)
+    out[:1] = np.nan
+    out[1:] = x[:-1]
+    return out
+
+
+class _Kernels:
+    """Memoised sub-results (EMAs, shifted close, deltas) shared across specs."""
+
+    def __init__(
+        self,
+        close: np.ndarray,
+        high: np.ndarray | None,
+        low: np.ndarray | None,
+        volume: np.ndarray | None,
+    ) -> None:
+        self.close = close
+        self.high = high
+        self.low = low
+        self.volume = volume
+        self._cache: dict[tuple[Any, ...], np.ndarray] = {}
+
+    def _memo(self, key: tuple[Any, ...], fn: Any) -> np.ndarray:
+        if key not in self._cache:
+            self._cache[key] = fn()
+        return self._cache[key]
+
+    def prev_close(self) -> np.ndarray:
+        return self._memo(("prev_close",), lambda: _shift(self.close))
+
+    def delta(self) -> np.ndarray:
+        return self._memo(("delta",), lambda: self.close - self.prev_close())
+
+    def ema(self, span: int) -> np.ndarray:
+        return self._memo(("ema", span), lambda: _ema(self.close, span))
+
+    def macd(self, fast: int, slow: int) -> np.ndarray:
+        return self._memo(("macd", fast, slow), lambda: self.ema(fast) - self.ema(slow))
+
+    def macd_signal(self, fast: int, slow: int, signal: int) -> np.ndarray:
+        return self._memo(("macd_signal", fast, slow, signal), lambda: _ema(self.macd(fast, slow), signal))
+
+    def rsi(self, period: int) -> np.ndarray:
+        delta = self.delta()
+        roll_up = _rolling_mean(np.maximum(delta, 0), period)
+        roll_down = _rolling_mean(-np.minimum(delta, 0), period)
+        rs = roll_up / (roll_down + 1e-9)
+        return np.asarray(100 - (100 / (1 + rs)))
+
+    def atr(self, period: int) -> np.ndarray:
+        if self.high is None or self.low is None:
+            raise ValueError("atr needs high and low arrays")
+        prev = self.prev_close()
+        tr = np.fmax(
+            np.abs(self.high - self.low),
+            np.fmax(np.abs(self.high - prev), np.abs(self.low - prev)),
+        )
+        return _rolling_mean(tr, period)
+
+    def vwap(self) -> np.ndarray:
+        if self.volume is None:
+            raise ValueError("vwap needs a volume array")
+        # Volume only counts where there is a price, so each symbol in a
+        # panel starts accumulating at its own first bar.
+        volume = np.where(np.isnan(self.close), np.nan, self.volume)
+        pv = _cumsum_skipna(self.close * volume)
+        return np.asarray(pv / (_cumsum_skipna(volume) + 1e-9))
+
+    def zscore(self, window: int) -> np.ndarray:
+        mean = _rolling_mean(self.close, window)
+        std = _rolling_std(self.close, window)
+        return np.asarray((self.close - mean) / (std + 1e-9))
+
+    def compute(self, spec: IndicatorSpec) -> np.ndarray:
+        w = spec.window or 0
+        if spec.kind == "ema":
+            return self.ema(w)
+        if spec.kind == "px_vs_ema":
+            ema = self.ema(w)
+            return np.asarray((self.close - ema) / ema)
+        if spec.kind == "rsi":
+            return self.rsi(w)
+        if spec.kind == "macd":
+            return self.macd(spec.fast, spec.slow)
+        if spec.kind == "macd_hist":
+            return np.asarray(self.macd(spec.fast, spec.slow) - self.macd_signal(spec.fast, spec.slow, spec.signal))
+        if spec.kind == "atr":
+            return self.atr(w)
+        if spec.kind == "vwap":
+            return self.vwap()
+        if spec.kind == "zscore":
+            return self.zscore(w)
+        return np.asarray(self.close / self.prev_close() - 1)  # pct_change
+
+
+def _as_array(x: ArrayLike | None) -> np.ndarray | None:
+    return None if x is None else np.asarray(x, dtype=np.float64)
+
+
+def build_feature_matrix(
+    specs: Sequence[IndicatorSpec | str],
+    close: ArrayLike,
+    high: ArrayLike | None = None,
+    low: ArrayLike | None = None,
+    volume: ArrayLike | None = None,
+    dtype: DTypeLike = np.float64,
+) -> FeatureMatrix:
+    """Compute ``specs`` into one C-contiguous matrix, sharing common sub-results.
+
+    1-D inputs give a (time, n_specs) matrix that can go straight into
+    ``HourlyLightGBM.fit``/``predict_proba``; 2-D (time x symbol) inputs give
+    (time, symbol, n_specs).
+    """
+    parsed = [s if isinstance(s, IndicatorSpec) else IndicatorSpec.parse(s) for s in specs]
+    close_arr = _as_array(close)
+    assert close_arr is not None
+    kernels = _Kernels(close_arr, _as_array(high), _as_array(low), _as_array(volume))
+    out = np.empty((*close_arr.shape, len(parsed)), dtype=dtype)
+    for i, spec in enumerate(parsed):
+        out[..., i] = kernels.compute(spec)
+    return FeatureMatrix(values=out, columns=[s.name for s in parsed])
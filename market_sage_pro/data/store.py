@@ -1,30 +1,73 @@
 from __future__ import annotations
 
+import os
+import threading
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Any, Union
 
 import duckdb
 import pandas as pd
 
+try:
+    import pyarrow as pa
+except Exception:  # pragma: no cover - Arrow ingest is optional
+    pa = None
+
 from ..utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+STOCKDATA_URL = "https://raw.githubusercontent.com/plotly/datasets/master/stockdata.csv"
+BAR_COLUMNS = ["ts", "open", "high", "low", "close", "volume"]
+_BAR_SELECT = ", ".join(BAR_COLUMNS)
+
+
+@dataclass
+class RetentionConfig:
+    days: int = 180
+    min_expired_rows: int = 1
+    compact_after_deleted: int = 100_000
+
+
+BarsInput = Union[
+    pd.DataFrame,
+    "pa.Table",
+    "pa.RecordBatch",
+    Sequence["pa.RecordBatch"],
+    Mapping[str, Union[pd.DataFrame, "pa.Table"]],
+]
+
+
+def _bar_sources(data: BarsInput) -> list[tuple[str | None, Any]]:
+    """Split ingest input into (symbol or None if the source has a column, source)."""
+    if isinstance(data, Mapping):
+        return [(sym, src) for sym, src in data.items()]
+    if pa is not None:
+        if isinstance(data, pa.RecordBatch):
+            data = pa.Table.from_batches([data])
+        elif isinstance(data, Sequence) and data and isinstance(data[0], pa.RecordBatch):
+            data = pa.Table.from_batches(list(data))
+    return [(None, data)]
+
 
 class DuckDBStore:
+    """Bars for all symbols in one long ``bars`` table kept sorted by (symbol, ts).
+
+    ``ts`` is naive UTC: time-zone-aware input is converted on ingest, on a
+    cursor whose session ``TimeZone`` is UTC, so other connections to the
+    database keep their own setting.
+    """
+
     def __init__(self, db_path: str = "data/market.duckdb") -> None:
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         self.conn = duckdb.connect(db_path)
-
-    def write_bars(self, symbol: str, df: pd.DataFrame) -> None:
-        if df.empty:
-            return
-        df = df.copy()
-        df["ts"] = pd.to_datetime(df["ts"], utc=True)
-        table = self._table_name(symbol)
         self.conn.execute(
-            f"""
-            CREATE TABLE IF NOT EXISTS {table} (
+            """
+            CREATE TABLE IF NOT EXISTS bars (
+                symbol VARCHAR,
                 ts TIMESTAMP,
                 open DOUBLE,
                 high DOUBLE,
@@ -34,50 +77,412 @@ class DuckDBStore:
             )
             """
         )
-        self.conn.register("tmp_df", df)
-        self.conn.execute(f"INSERT INTO {table} SELECT * FROM tmp_df")
-        self.conn.unregister("tmp_df")
-        self.vacuum_retention(table)
+        self._write_lock = threading.RLock()
+        self._deleted_since_compact = 0
+        self.migrate_legacy_tables()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def write_bars(self, symbol: str, df: pd.DataFrame) -> None:
+        self.upsert_bars({symbol: df})
+
+    def upsert_bars(self, data: BarsInput) -> int:
+        """Insert or replace bars keyed on (symbol, ts) and return the rows written.
+
+        ``data`` is either a mapping of symbol to a bar frame/Arrow table, or
+        a long frame, Arrow table, record batch or list of record batches with
+        a ``symbol`` column. Duplicate keys within the batch keep the last row.
+        Safe to call from several threads; writers are serialized.
+        """
+        sources = _bar_sources(data)
+        with self._write_lock:
+            cur = self.conn.cursor()
+            try:
+                # Cursors are separate sessions; cast aware timestamps to naive UTC on this one.
+                cur.execute("SET TimeZone = 'UTC'")
+                cur.execute(
+                    """
+                    CREATE OR REPLACE TEMP TABLE staged_bars (
+                        seq BIGINT, symbol VARCHAR, ts TIMESTAMP, open DOUBLE,
+                        high DOUBLE, low DOUBLE, close DOUBLE, volume DOUBLE
+                    )
+                    """
+                )
+                offset = 0
+                for i, (symbol, src) in enumerate(sources):
+                    if len(src) == 0:
+                        continue
+                    view = f"ingest_src_{i}"
+                    cur.register(view, src)
+                    sym_expr = "upper(symbol)" if symbol is None else "?"
+                    params: list[object] = [offset] if symbol is None else [offset, symbol.upper()]
+                    cur.execute(
+                        f"""
+                        INSERT INTO staged_bars
+                        SELECT ? + row_number() OVER (), {sym_expr}, CAST(ts AS TIMESTAMP),
+                               open, high, low, close, volume
+                        FROM {view}
+                        """,
+                        params,
+                    )
+                    cur.unregister(view)
+                    offset += len(src)
+                if offset == 0:
+                    return 0
+                row = cur.execute("SELECT min(ts), max(ts) FROM staged_bars").fetchone()
+                assert row is not None
+                cur.execute("BEGIN TRANSACTION")
+                # Constant ts bounds let zone maps skip untouched row groups.
+                cur.execute(
+                    """
+                    DELETE FROM bars USING (SELECT DISTINCT symbol, ts FROM staged_bars) s
+                    WHERE bars.ts >= ? AND bars.ts <= ?
+                      AND bars.symbol = s.symbol AND bars.ts = s.ts
+                    """,
+                    [row[0], row[1]],
+                )
+                written = cur.execute(
+                    f"""
+                    INSERT INTO bars
+                    SELECT symbol, {_BAR_SELECT} FROM staged_bars
+                    QUALIFY row_number() OVER (PARTITION BY symbol, ts ORDER BY seq DESC) = 1
+                    ORDER BY symbol, ts
+                    """
+                ).fetchone()
+                cur.execute("COMMIT")
+            finally:
+                # Closing the cursor rolls back an uncommitted transaction.
+                cur.close()
+        return int(written[0]) if written else 0
 
     def read_bars(self, symbol: str, since_days: int = 180) -> pd.DataFrame:
-        table = self._table_name(symbol)
-        try:
-            cutoff = datetime.utcnow() - timedelta(days=since_days)
-            q = f"SELECT * FROM {table} WHERE ts >= ? ORDER BY ts"
-            return self.conn.execute(q, [cutoff]).fetchdf()
-        except duckdb.CatalogException:
-            return pd.DataFrame(columns=["ts", "open", "high", "low", "close", "volume"])  # empty
+        cutoff = datetime.utcnow() - timedelta(days=since_days)
+        q = f"SELECT {_BAR_SELECT} FROM bars WHERE symbol = ? AND ts >= ? ORDER BY ts"
+        with self.conn.cursor() as cur:
+            return cur.execute(q, [symbol.upper(), cutoff]).fetchdf()
+
+    def iter_bars(
+        self,
+        symbol: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        chunk: int = 50_000,
+    ) -> Iterator[pd.DataFrame]:
+        """``symbol``'s bars in ts order, ``chunk`` rows at a time (keyset paging)."""
+        q = f"SELECT {_BAR_SELECT} FROM bars WHERE symbol = ? AND ts > ? AND ts <= ? ORDER BY ts LIMIT ?"
+        last = start - timedelta(microseconds=1) if start is not None else datetime.min
+        stop = end or datetime.max
+        while True:
+            with self.conn.cursor() as cur:
+                df = cur.execute(q, [symbol.upper(), last, stop, chunk]).fetchdf()
+            if df.empty:
+                return
+            yield df
+            if len(df) < chunk:
+                return
+            last = df["ts"].iloc[-1].to_pydatetime()
+
+    def read_bars_many(self, symbols: list[str], since_days: int = 180) -> pd.DataFrame:
+        """Long-format bars (``symbol`` + bar columns) for ``symbols`` in one scan."""
+        cutoff = datetime.utcnow() - timedelta(days=since_days)
+        q = f"""
+            SELECT symbol, {_BAR_SELECT} FROM bars
+            WHERE symbol IN (SELECT UNNEST(?)) AND ts >= ?
+            ORDER BY symbol, ts
+        """
+        with self.conn.cursor() as cur:
+            return cur.execute(q, [[s.upper() for s in symbols], cutoff]).fetchdf()
+
+    def read_cross_section(self, at: datetime | None = None, symbols: list[str] | None = None) -> pd.DataFrame:
+        """Latest bar per symbol at or before ``at`` (default: now), one row per symbol."""
+        params: list[object] = [at or datetime.utcnow()]
+        where = "ts <= ?"
+        if symbols is not None:
+            where += " AND symbol IN (SELECT UNNEST(?))"
+            params.append([s.upper() for s in symbols])
+        q = f"""
+            SELECT symbol, {_BAR_SELECT} FROM bars
+            WHERE {where}
+            QUALIFY row_number() OVER (PARTITION BY symbol ORDER BY ts DESC) = 1
+            ORDER BY symbol
+        """
+        with self.conn.cursor() as cur:
+            return cur.execute(q, params).fetchdf()
 
-    def vacuum_retention(self, table: str, days: int = 180) -> None:
+    def read_panel(self, symbols: list[str], since_days: int = 180, field: str = "close") -> pd.DataFrame:
+        """``field`` as a (ts x symbol) frame for the cross-sectional feature code."""
+        if field not in BAR_COLUMNS[1:]:
+            raise ValueError(f"unknown bar field: {field}")
+        long_df = self.read_bars_many(symbols, since_days)
+        return long_df.pivot(index="ts", columns="symbol", values=field)
+
+    def vacuum_retention(self, days: int = 180) -> None:
         cutoff = datetime.utcnow() - timedelta(days=days)
-        self.conn.execute(f"DELETE FROM {table} WHERE ts < ?", [cutoff])
-        # DuckDB VACUUM is global
-        self.conn.execute("VACUUM")
+        with self._write_lock:
+            self.conn.execute("DELETE FROM bars WHERE ts < ?", [cutoff])
+            # DuckDB VACUUM is global
+            self.conn.execute("VACUUM")
+
+    def run_maintenance(self, cfg: RetentionConfig | None = None) -> dict[str, int]:
+        """Retention and compaction, meant for a background job rather than ingest.
+
+        Expired rows are only deleted once there are at least
+        ``cfg.min_expired_rows`` of them, and the table is only rewritten and
+        checkpointed after ``cfg.compact_after_deleted`` rows have been deleted.
+        """
+        cfg = cfg or RetentionConfig()
+        with self._write_lock:
+            return self._run_maintenance(cfg)
+
+    def _run_maintenance(self, cfg: RetentionConfig) -> dict[str, int]:
+        cutoff = datetime.utcnow() - timedelta(days=cfg.days)
+        row = self.conn.execute("SELECT count(*) FROM bars WHERE ts < ?", [cutoff]).fetchone()
+        expired = int(row[0]) if row else 0
+        deleted = 0
+        if expired and expired >= cfg.min_expired_rows:
+            self.conn.execute("DELETE FROM bars WHERE ts < ?", [cutoff])
+            deleted = expired
+            self._deleted_since_compact += deleted
+        compacted = 0
+        if self._deleted_since_compact and self._deleted_since_compact >= cfg.compact_after_deleted:
+            self.cluster()
+            self.conn.execute("CHECKPOINT")
+            self._deleted_since_compact = 0
+            compacted = 1
+        return {"expired": expired, "deleted": deleted, "compacted": compacted}
+
+    def cluster(self) -> None:
+        """Rewrite ``bars`` in (symbol, ts) order so zone maps prune per-symbol scans."""
+        with self._write_lock:
+            self.conn.execute("CREATE OR REPLACE TABLE bars AS SELECT * FROM bars ORDER BY symbol, ts")
+
+    def migrate_legacy_tables(self) -> int:
+        """Move rows from the old one-table-per-symbol layout into ``bars``."""
+        legacy = [
+            r[0]
+            for r in self.conn.execute(
+                """
+                SELECT table_name FROM information_schema.tables
+                WHERE table_name LIKE 'bars\\_%' ESCAPE '\\'
+                """
+            ).fetchall()
+        ]
+        if not legacy:
+            return 0
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            for table in legacy:
+                symbol = table[len("bars_") :].upper()
+                # Legacy tables were plain appends, so drop duplicate timestamps.
+                self.conn.execute(
+                    f"""
+                    INSERT INTO bars SELECT ?, {_BAR_SELECT} FROM "{table}"
+                    QUALIFY row_number() OVER (PARTITION BY ts) = 1
+                    """,
+                    [symbol],
+                )
+                self.conn.execute(f'DROP TABLE "{table}"')
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.cluster()
+        logger.info("Migrated %d per-symbol bar tables into bars", len(legacy))
+        return len(legacy)
+
+
+class BarCache:
+    """On-disk DuckDB snapshot of a bar source, indexed by (symbol, ts).
+
+    ``source`` is a URL or local path to either the wide stockdata layout
+    (``Date`` plus one close column per symbol) or a long CSV with
+    ``symbol, ts, open, high, low, close, volume`` columns. The source is
+    parsed once per cache file; later reads, including from new processes,
+    are served from the snapshot. Timestamps are stored naive; an aware
+    source is converted to UTC on load, under a session ``TimeZone`` of UTC.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "data/bar_cache.duckdb",
+        source: str = STOCKDATA_URL,
+        max_age: timedelta | None = None,
+    ) -> None:
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = duckdb.connect(db_path)
+        self.source = source
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._ready = False
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS bar_snapshots (
+                source VARCHAR PRIMARY KEY,
+                first_ts TIMESTAMP,
+                last_ts TIMESTAMP,
+                n_rows BIGINT,
+                loaded_at TIMESTAMP
+            )
+            """
+        )
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cached_bars (
+                source VARCHAR,
+                symbol VARCHAR,
+                ts TIMESTAMP,
+                open DOUBLE,
+                high DOUBLE,
+                low DOUBLE,
+                close DOUBLE,
+                volume DOUBLE
+            )
+            """
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS cached_bars_idx ON cached_bars (source, symbol, ts)"
+        )
+
+    def ensure_loaded(self) -> None:
+        if self._ready:
+            return
+        with self._lock:
+            if self._ready:
+                return
+            row = self.conn.execute(
+                "SELECT loaded_at FROM bar_snapshots WHERE source = ?", [self.source]
+            ).fetchone()
+            stale = (
+                row is not None
+                and self.max_age is not None
+                and datetime.utcnow() - row[0] > self.max_age
+            )
+            if row is None or stale:
+                self._load_snapshot()
+            self._ready = True
+
+    def refresh(self) -> None:
+        with self._lock:
+            self._load_snapshot()
+            self._ready = True
 
-    @staticmethod
-    def _table_name(symbol: str) -> str:
-        return f"bars_{symbol.upper()}"
+    def symbols(self) -> list[str]:
+        self.ensure_loaded()
+        with self.conn.cursor() as cur:
+            rows = cur.execute(
+                "SELECT DISTINCT symbol FROM cached_bars WHERE source = ? ORDER BY symbol", [self.source]
+            ).fetchall()
+        return [r[0] for r in rows]
 
+    def bars(self, symbol: str, start: datetime, end: datetime) -> pd.DataFrame:
+        return self.bars_many([symbol], start, end)[symbol]
 
-def fetch_historical_bars(symbol: str, start: datetime, end: datetime) -> pd.DataFrame:
-    """Fetch historical bars from a public CSV hosted on GitHub."""
-    url = "https://raw.githubusercontent.com/plotly/datasets/master/stockdata.csv"
-    raw = pd.read_csv(url)
+    def bars_many(self, symbols: list[str], start: datetime, end: datetime) -> dict[str, pd.DataFrame]:
+        self.ensure_loaded()
+        wanted = [s.upper() for s in symbols]
+        with self.conn.cursor() as cur:
+            df = cur.execute(
+                """
+                SELECT symbol, ts, open, high, low, close, volume
+                FROM cached_bars
+                WHERE source = ? AND symbol IN (SELECT UNNEST(?)) AND ts >= ? AND ts <= ?
+                ORDER BY symbol, ts
+                """,
+                [self.source, wanted, pd.to_datetime(start), pd.to_datetime(end)],
+            ).fetchdf()
+        df["ts"] = df["ts"].astype("datetime64[ns]")
+        groups = {sym: g for sym, g in df.groupby("symbol", sort=False)}
+        out: dict[str, pd.DataFrame] = {}
+        for sym, key in zip(symbols, wanted, strict=True):
+            g = groups.get(key)
+            if g is None:
+                out[sym] = pd.DataFrame(columns=BAR_COLUMNS)
+            else:
+                out[sym] = g[BAR_COLUMNS].reset_index(drop=True)
+        return out
+
+    def _load_snapshot(self) -> None:
+        logger.info("Loading bar source into cache: %s", self.source)
+        long_df = _parse_bar_source(self.source)
+        with self.conn.cursor() as cur:
+            cur.execute("SET TimeZone = 'UTC'")
+            cur.execute("BEGIN TRANSACTION")
+            try:
+                cur.execute("DELETE FROM cached_bars WHERE source = ?", [self.source])
+                cur.execute("DELETE FROM bar_snapshots WHERE source = ?", [self.source])
+                cur.register("src_bars", long_df)
+                cur.execute(
+                    """
+                    INSERT INTO cached_bars
+                    SELECT ?, symbol, ts, open, high, low, close, volume
+                    FROM src_bars ORDER BY symbol, ts
+                    """,
+                    [self.source],
+                )
+                cur.unregister("src_bars")
+                cur.execute(
+                    "INSERT INTO bar_snapshots VALUES (?, ?, ?, ?, ?)",
+                    [
+                        self.source,
+                        long_df["ts"].min() if len(long_df) else None,
+                        long_df["ts"].max() if len(long_df) else None,
+                        len(long_df),
+                        datetime.utcnow(),
+                    ],
+                )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+
+def _parse_bar_source(source: str) -> pd.DataFrame:
+    raw = pd.read_csv(source)
+    if {"symbol", "ts"}.issubset(raw.columns):
+        long_df = raw[["symbol", *BAR_COLUMNS]].copy()
+        long_df["symbol"] = long_df["symbol"].str.upper()
+        long_df["ts"] = pd.to_datetime(long_df["ts"])
+        return long_df
+    # Wide stockdata layout: one close column per symbol.
     raw["Date"] = pd.to_datetime(raw["Date"])
-    mask = (raw["Date"] >= pd.to_datetime(start)) & (raw["Date"] <= pd.to_datetime(end))
-    raw = raw.loc[mask]
-    col = symbol.upper()
-    if col not in raw.columns:
-        return pd.DataFrame(columns=["ts", "open", "high", "low", "close", "volume"])
-    close = raw[col].astype(float)
-    df = pd.DataFrame(
+    close = raw.melt(id_vars="Date", var_name="symbol", value_name="close")
+    close["close"] = close["close"].astype(float)
+    return pd.DataFrame(
         {
-            "ts": raw["Date"],
-            "open": close,
-            "high": close,
-            "low": close,
-            "close": close,
+            "symbol": close["symbol"].str.upper(),
+            "ts": close["Date"],
+            "open": close["close"],
+            "high": close["close"],
+            "low": close["close"],
+            "close": close["close"],
             "volume": 0.0,
         }
     )
-    return df
\ No newline at end of file
+
+
+_default_cache: BarCache | None = None
+
+
+def default_bar_cache() -> BarCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = BarCache(
+            db_path=os.environ.get("MARKETSAGE_BAR_CACHE", "data/bar_cache.duckdb"),
+            source=os.environ.get("MARKETSAGE_BAR_SOURCE", STOCKDATA_URL),
+        )
+    return _default_cache
+
+
+def fetch_historical_bars(
+    symbol: str, start: datetime, end: datetime, cache: BarCache | None = None
+) -> pd.DataFrame:
+    """Fetch historical bars, parsing the public CSV source at most once per cache."""
+    return (cache or default_bar_cache()).bars(symbol, start, end)
+
+
+def load_historical_bars(
+    symbols: list[str], start: datetime, end: datetime, cache: BarCache | None = None
+) -> dict[str, pd.DataFrame]:
+    """Like ``fetch_historical_bars`` for many symbols, in one indexed read."""
+    return (cache or default_bar_cache()).bars_many(symbols, start, end)
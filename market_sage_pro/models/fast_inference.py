@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import ctypes
+import threading
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from ..utils.logging import get_logger
+
+try:
+    import lightgbm
+    from lightgbm import basic as _lgb_basic
+except Exception:  # pragma: no cover - fast path needs lightgbm's C library
+    lightgbm = None  # type: ignore
+    _lgb_basic = None  # type: ignore
+
+logger = get_logger(__name__)
+
+# LightGBM releases [min, max) whose private helpers (``basic._LIB``,
+# ``_c_str``, ``_safe_call`` and ``Booster._handle``) the single-row path is
+# tested against; other versions use ``Booster.predict``.
+FAST_PATH_VERSIONS = ((4, 0), (5, 0))
+
+_PREDICT_NORMAL = 0
+_DTYPE_FLOAT64 = 1
+
+
+def _fast_api() -> tuple[Any, Any, Any] | None:
+    """LightGBM's (``_LIB``, ``_c_str``, ``_safe_call``), or None if unavailable or untested."""
+    if lightgbm is None or _lgb_basic is None:
+        return None
+    try:
+        version = tuple(int(part) for part in lightgbm.__version__.split(".")[:2])
+    except ValueError:
+        return None
+    if not FAST_PATH_VERSIONS[0] <= version < FAST_PATH_VERSIONS[1]:
+        return None
+    lib, c_str, safe_call = (getattr(_lgb_basic, name, None) for name in ("_LIB", "_c_str", "_safe_call"))
+    if lib is None or c_str is None or safe_call is None:
+        return None
+    return lib, c_str, safe_call
+
+
+class FastBoosterPredictor:
+    """Low-overhead ``predict_proba`` for a trained binary LightGBM booster.
+
+    Single rows go through LightGBM's ``PredictForMatSingleRowFast`` C API,
+    which reuses a prediction config prepared once here; larger batches call
+    ``Booster.predict`` directly. Both skip the sklearn wrapper's per-call
+    validation and return the same probabilities as ``LGBMClassifier``.
+    """
+
+    def __init__(self, booster: Any) -> None:
+        self.booster = booster
+        self.num_features = booster.num_feature()
+        self._config: ctypes.c_void_p | None = None
+        # A fast config carries its own scratch buffers; calls must not overlap.
+        self._lock = threading.Lock()
+        self._api = _fast_api()
+        handle = getattr(booster, "_handle", None)
+        if self._api is None or handle is None:
+            logger.info("LightGBM fast single-row API unavailable; using Booster.predict")
+            return
+        lib, c_str, safe_call = self._api
+        config = ctypes.c_void_p()
+        try:
+            safe_call(
+                lib.LGBM_BoosterPredictForMatSingleRowFastInit(
+                    handle,
+                    ctypes.c_int(_PREDICT_NORMAL),
+                    ctypes.c_int(0),
+                    ctypes.c_int(-1),
+                    ctypes.c_int(_DTYPE_FLOAT64),
+                    ctypes.c_int32(self.num_features),
+                    c_str(""),
+                    ctypes.byref(config),
+                )
+            )
+        except Exception as exc:
+            logger.warning("LightGBM fast single-row API failed (%s); using Booster.predict", exc)
+            return
+        self._config = config
+
+    def __del__(self) -> None:
+        if self._config is not None and self._api is not None:
+            self._api[0].LGBM_FastConfigFree(self._config)
+            self._config = None
+
+    def predict_one(self, x: ArrayLike) -> float:
+        row = np.ascontiguousarray(x, dtype=np.float64).reshape(-1)
+        if row.shape[0] != self.num_features:
+            raise ValueError(f"expected {self.num_features} features, got {row.shape[0]}")
+        if self._config is None or self._api is None:
+            return float(self.booster.predict(row[None, :])[0])
+        lib, _, safe_call = self._api
+        out = np.empty(1, dtype=np.float64)
+        out_len = ctypes.c_int64()
+        with self._lock:
+            safe_call(
+                lib.LGBM_BoosterPredictForMatSingleRowFast(
+                    self._config,
+                    row.ctypes.data_as(ctypes.c_void_p),
+                    ctypes.byref(out_len),
+                    out.ctypes.data_as(ctypes.POINTER(ctypes.c_double)),
+                )
+            )
+        return float(out[0])
+
+    def predict_proba(self, X: ArrayLike) -> np.ndarray:
+        rows = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        if len(rows) == 1:
+            p_one = self.predict_one(rows[0])
+            return np.array([[1 - p_one, p_one]])
+        p: np.ndarray = np.asarray(self.booster.predict(rows), dtype=np.float64)
+        return np.column_stack([1 - p, p])
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Optional
 
 import numpy as np
 
+from ..utils.logging import get_logger
+from .fast_inference import FastBoosterPredictor
+
 try:
     import lightgbm as lgb
 except Exception:  # pragma: no cover - fallback if not installed
     lgb = None  # type: ignore
 
+logger = get_logger(__name__)
+
 
 @dataclass
 class HourlyModelConfig:
@@ -17,28 +23,152 @@ class HourlyModelConfig:
     learning_rate: float = 0.05
     n_estimators: int = 200
     random_state: int = 42
+    # Online updates: boosting rounds added per ``partial_update``, the tree
+    # budget before a full refit, and a full refit every ``refit_every``
+    # updates regardless. ``window_bars`` is the history kept for refits.
+    update_rounds: int = 10
+    max_trees: int = 1000
+    refit_every: int = 144
+    window_bars: int = 10_000
+    # Full refit when the log loss on incoming bars exceeds the running
+    # reference by this much (nats).
+    drift_tolerance: float = 0.05
+    # Score through ``FastBoosterPredictor`` instead of the sklearn wrapper.
+    fast_inference: bool = False
+
+
+@dataclass
+class UpdateStats:
+    mode: str  # "full", "incremental", "pending" or "none"
+    reason: str
+    bars: int
+    trees: int
+    logloss: float
+    seconds: float
+
+
+def _logloss(y: np.ndarray, p: np.ndarray) -> float:
+    p = np.clip(p, 1e-7, 1 - 1e-7)
+    return float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
 
 
 class HourlyLightGBM:
     def __init__(self, cfg: Optional[HourlyModelConfig] = None) -> None:
         self.cfg = cfg or HourlyModelConfig()
-        self.model = None
+        self.model: Any = None  # LGBMClassifier, or (X mean, y mean) without lightgbm
+        self._X: Optional[np.ndarray] = None
+        self._y: Optional[np.ndarray] = None
+        self._pending = 0
+        self._updates = 0
+        self._loss_ref = float("nan")
+        self._fast: Optional[FastBoosterPredictor] = None
 
-    def fit(self, X: np.ndarray, y: np.ndarray) -> None:
-        if lgb is None:
-            self.model = (X.mean(), y.mean())  # trivial fallback
-            return
+    def __getstate__(self) -> dict[str, object]:
+        # The fast predictor wraps a C handle; it is rebuilt on first use.
+        return {**self.__dict__, "_fast": None}
+
+    def _train(self, X: np.ndarray, y: np.ndarray, rounds: int, booster: object = None) -> None:
         self.model = lgb.LGBMClassifier(
             num_leaves=self.cfg.num_leaves,
             learning_rate=self.cfg.learning_rate,
-            n_estimators=self.cfg.n_estimators,
+            n_estimators=rounds,
             random_state=self.cfg.random_state,
+            verbose=-1,
         )
-        self.model.fit(X, y)
+        self.model.fit(X, y, init_model=booster)
+        self._fast = None
 
-    def partial_update(self, X: np.ndarray, y: np.ndarray) -> None:
-        # retrain simple approach; in production use DART/keep booster
-        self.fit(X, y)
+    def fit(self, X: np.ndarray, y: np.ndarray, init_model: Optional[HourlyLightGBM] = None) -> None:
+        """Train on ``X, y``; with ``init_model`` keep boosting from its trees."""
+        tail = slice(-self.cfg.window_bars, None)
+        self._X, self._y = np.array(X[tail]), np.array(y[tail])
+        self._pending = 0
+        self._updates = 0
+        self._loss_ref = float("nan")
+        if lgb is None:
+            self.model = (X.mean(), y.mean())  # trivial fallback
+            return
+        booster = None
+        if init_model is not None and isinstance(init_model.model, lgb.LGBMClassifier):
+            booster = init_model.model.booster_
+        self._train(X, y, self.cfg.n_estimators, booster)
+
+    @property
+    def num_features(self) -> Optional[int]:
+        """Feature width the model was trained on, or None before any training."""
+        if lgb is not None and isinstance(self.model, lgb.LGBMClassifier):
+            return int(self.model.n_features_in_)
+        return None if self._X is None else int(self._X.shape[1])
+
+    @property
+    def num_trees(self) -> int:
+        if lgb is None or not isinstance(self.model, lgb.LGBMClassifier):
+            return 0
+        return int(self.model.booster_.num_trees())
+
+    def _append(self, X: np.ndarray, y: np.ndarray) -> None:
+        if self._X is None or self._y is None:
+            self._X, self._y = np.array(X), np.array(y)
+        else:
+            self._X = np.concatenate([self._X, X])[-self.cfg.window_bars :]
+            self._y = np.concatenate([self._y, y])[-self.cfg.window_bars :]
+        self._pending = min(self._pending + len(y), len(self._y))
+
+    def partial_update(self, X: np.ndarray, y: np.ndarray) -> UpdateStats:
+        """Absorb only the bars seen since the last call.
+
+        Normally this adds ``update_rounds`` trees on top of the current
+        booster, trained on the new bars alone. It falls back to a full refit
+        on the last ``window_bars`` when there is no model yet, the tree
+        budget or ``refit_every`` is reached, or the log loss on the new bars
+        drifts above the running reference.
+        """
+        t0 = time.perf_counter()
+        loss = float("nan")
+        if self.model is not None and len(y):
+            loss = _logloss(y, self.predict_proba(X)[:, 1])
+        self._append(X, y)
+        assert self._X is not None and self._y is not None
+        if not self._pending:
+            # ``[-0:]`` below would select the whole window.
+            return UpdateStats("none", "no new bars", 0, self.num_trees, loss, time.perf_counter() - t0)
+
+        reason = ""
+        if self.model is None or lgb is None:
+            reason = "no model"
+        elif self.num_trees + self.cfg.update_rounds > self.cfg.max_trees:
+            reason = "tree budget"
+        elif self._updates + 1 >= self.cfg.refit_every:
+            reason = "scheduled"
+        elif loss > self._loss_ref + self.cfg.drift_tolerance:
+            reason = "drift"
+
+        new_X, new_y = self._X[-self._pending :], self._y[-self._pending :]
+        if reason:
+            self.fit(self._X, self._y)
+            mode = "full"
+        elif np.unique(new_y).size < 2:
+            # A one-class batch cannot be boosted on; keep it for next time.
+            mode, reason = "pending", "single class"
+        else:
+            self._train(new_X, new_y, self.cfg.update_rounds, self.model.booster_)
+            self._pending = 0
+            self._updates += 1
+            mode, reason = "incremental", "new bars"
+        if mode != "full" and not np.isnan(loss):
+            self._loss_ref = loss if np.isnan(self._loss_ref) else 0.9 * self._loss_ref + 0.1 * loss
+
+        stats = UpdateStats(mode, reason, len(y), self.num_trees, loss, time.perf_counter() - t0)
+        logger.info(
+            "Hourly model %s update (%s): %d bars, %d trees, logloss %.4f in %.1f ms",
+            stats.mode,
+            stats.reason,
+            stats.bars,
+            stats.trees,
+            stats.logloss,
+            1000 * stats.seconds,
+        )
+        return stats
 
     def predict_proba(self, X: np.ndarray) -> np.ndarray:
         if self.model is None:
@@ -47,4 +177,8 @@ class HourlyLightGBM:
             _, y_mean = self.model
             proba = np.clip(y_mean, 0.01, 0.99)
             return np.column_stack([1 - proba, proba])
-        return self.model.predict_proba(X)
\ No newline at end of file
+        if self.cfg.fast_inference:
+            if self._fast is None:
+                self._fast = FastBoosterPredictor(self.model.booster_)
+            return self._fast.predict_proba(X)
+        return np.asarray(self.model.predict_proba(X))
@@ -5,11 +5,34 @@ from contextlib import contextmanager
 from typing import Generator
 
 import mlflow
+from mlflow.tracking import MlflowClient
+
+
+def _set_tracking_uri() -> None:
+    mlflow.set_tracking_uri(os.environ.get("MLFLOW_TRACKING_URI", "file:./mlruns"))
 
 
 @contextmanager
 def start_run(name: str) -> Generator[None, None, None]:
-    tracking_uri = os.environ.get("MLFLOW_TRACKING_URI", "file:./mlruns")
-    mlflow.set_tracking_uri(tracking_uri)
+    _set_tracking_uri()
     with mlflow.start_run(run_name=name):
-        yield
\ No newline at end of file
+        yield
+
+
+def register_model(model: object, name: str) -> str:
+    """Log ``model`` (pickled) in a new run and register it as the next version of ``name``."""
+    _set_tracking_uri()
+    with mlflow.start_run(run_name=f"register-{name}"):
+        info = mlflow.sklearn.log_model(model, name="model", registered_model_name=name, serialization_format="cloudpickle")
+    return str(info.registered_model_version)
+
+
+def latest_version(name: str) -> str | None:
+    _set_tracking_uri()
+    versions = MlflowClient().search_model_versions(f"name='{name}'")
+    return max((v.version for v in versions), key=int, default=None)
+
+
+def load_model(name: str, version: str) -> object:
+    _set_tracking_uri()
+    return mlflow.sklearn.load_model(f"models:/{name}/{version}")
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from ..utils.logging import get_logger
+from .ensemble import soft_vote
+from .lightgbm_hourly import HourlyLightGBM
+from .tft_daily import DailyTFT
+
+logger = get_logger(__name__)
+
+VersionLookup = Callable[[str], str | None]
+ModelLoader = Callable[[str, str], object]
+
+
+@dataclass
+class ServingConfig:
+    hourly_model: str = "hourly_lightgbm"
+    daily_model: str = "daily_tft"
+    vote_mode: str = "intraday"
+    # Requests arriving within ``max_wait_ms`` of the first one share a
+    # single predict_proba call, up to ``max_batch`` rows.
+    max_batch: int = 512
+    max_wait_ms: float = 2.0
+    poll_seconds: float = 60.0
+    latency_window: int = 10_000
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 10_000) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self.count += 1
+
+    def snapshot(self) -> dict[str, float | None]:
+        if not self._samples:
+            return {"count": self.count, "p50_ms": None, "p99_ms": None}
+        p50, p99 = np.percentile(np.fromiter(self._samples, dtype=float), [50, 99]) * 1000
+        return {"count": self.count, "p50_ms": float(p50), "p99_ms": float(p99)}
+
+
+@dataclass(frozen=True)
+class ModelSet:
+    hourly: HourlyLightGBM
+    daily: DailyTFT
+    versions: dict[str, str | None] = field(default_factory=dict)
+
+
+def _registry_lookup(name: str) -> str | None:
+    from .registry import latest_version
+
+    return latest_version(name)
+
+
+def _registry_loader(name: str, version: str) -> object:
+    from .registry import load_model
+
+    return load_model(name, version)
+
+
+@dataclass
+class _Pending:
+    rows: np.ndarray
+    future: asyncio.Future[np.ndarray]
+
+
+class ModelServer:
+    """Keeps the latest registered hourly/daily models resident and scores features.
+
+    ``load`` swaps in a new ``ModelSet`` with one reference assignment, so
+    batches already running finish on the models they started with. Async
+    callers go through ``predict``, which coalesces concurrent requests into
+    one ``predict_proba`` per model.
+    """
+
+    def __init__(
+        self,
+        cfg: ServingConfig | None = None,
+        lookup: VersionLookup | None = None,
+        loader: ModelLoader | None = None,
+    ) -> None:
+        self.cfg = cfg or ServingConfig()
+        self._lookup = lookup or _registry_lookup
+        self._loader = loader or _registry_loader
+        self.models = ModelSet(HourlyLightGBM(), DailyTFT(), {})
+        self.latency = LatencyTracker(self.cfg.latency_window)
+        self.batches = 0
+        self.batched_rows = 0
+        self._queue: asyncio.Queue[_Pending] | None = None
+        self._tasks: list[asyncio.Task[None]] = []
+
+    def load(self) -> bool:
+        """Load any newer registered versions; returns True if the models were swapped."""
+        names = {"hourly": self.cfg.hourly_model, "daily": self.cfg.daily_model}
+        versions = {name: self._lookup(name) for name in names.values()}
+        if versions == self.models.versions:
+            return False
+        current = self.models
+        loaded = {}
+        for key, name in names.items():
+            version = versions[name]
+            if version is None or version == current.versions.get(name):
+                loaded[key] = getattr(current, key)
+            else:
+                loaded[key] = self._loader(name, version)
+        self.models = ModelSet(loaded["hourly"], loaded["daily"], versions)
+        logger.info("Serving models %s", versions)
+        return True
+
+    def predict_batch(self, X: ArrayLike) -> np.ndarray:
+        """Ensemble up-probability for each row of ``X``."""
+        rows = np.atleast_2d(np.asarray(X, dtype=float))
+        models = self.models
+        hourly = models.hourly.predict_proba(rows)[:, 1]
+        daily = models.daily.predict_proba(rows)[:, 1]
+        return soft_vote(hourly, daily, self.cfg.vote_mode)
+
+    async def predict(self, X: ArrayLike) -> np.ndarray:
+        started = time.perf_counter()
+        rows = np.atleast_2d(np.asarray(X, dtype=float))
+        width = self.models.hourly.num_features
+        if rows.ndim != 2 or (width is not None and rows.shape[1] != width):
+            raise ValueError(f"expected rows of {width} features, got shape {rows.shape}")
+        if self._queue is None:
+            out = await asyncio.to_thread(self.predict_batch, rows)
+        else:
+            future: asyncio.Future[np.ndarray] = asyncio.get_running_loop().create_future()
+            await self._queue.put(_Pending(rows, future))
+            out = await future
+        self.latency.record(time.perf_counter() - started)
+        return out
+
+    async def _batch_loop(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        wait = self.cfg.max_wait_ms / 1000
+        while True:
+            batch = [await queue.get()]
+            size = len(batch[0].rows)
+            deadline = time.perf_counter() + wait
+            while size < self.cfg.max_batch:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                size += len(item.rows)
+            try:
+                await self._score(batch)
+            except Exception:
+                # Rows that cannot share a batch (e.g. mixed widths before a
+                # model is loaded): score each request alone so only the bad
+                # ones fail.
+                await self._score_each(batch)
+            self.batches += 1
+            self.batched_rows += size
+
+    async def _score(self, batch: list[_Pending]) -> None:
+        X = np.concatenate([p.rows for p in batch])
+        proba = await asyncio.to_thread(self.predict_batch, X)
+        offset = 0
+        for p in batch:
+            n = len(p.rows)
+            if not p.future.done():
+                p.future.set_result(proba[offset : offset + n])
+            offset += n
+
+    async def _score_each(self, batch: list[_Pending]) -> None:
+        for p in batch:
+            if p.future.done():
+                continue
+            try:
+                out = await asyncio.to_thread(self.predict_batch, p.rows)
+            except Exception as exc:
+                p.future.set_exception(exc)
+            else:
+                p.future.set_result(out)
+
+    async def _poll_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.cfg.poll_seconds)
+            try:
+                await asyncio.to_thread(self.load)
+            except Exception as exc:
+                logger.warning("Model reload failed, keeping current versions: %s", exc)
+
+    async def start(self) -> None:
+        try:
+            await asyncio.to_thread(self.load)
+        except Exception as exc:
+            logger.warning("Model registry unavailable, serving fallback models: %s", exc)
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._batch_loop())]
+        if self.cfg.poll_seconds > 0:
+            self._tasks.append(asyncio.create_task(self._poll_loop()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+        self._queue = None
+
+    def metrics(self) -> dict[str, object]:
+        return {
+            **self.latency.snapshot(),
+            "batches": self.batches,
+            "mean_batch_rows": self.batched_rows / self.batches if self.batches else 0.0,
+            "versions": self.models.versions,
+        }
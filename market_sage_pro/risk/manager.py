@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
+PDT_MIN_EQUITY = 25_000.0
+
 
 @dataclass
 class RiskConfig:
@@ -15,6 +17,10 @@ class RiskManager:
         self.daily_pnl_pct = 0.0
         self.disabled = False
 
+    def reset_day(self) -> None:
+        self.daily_pnl_pct = 0.0
+        self.disabled = False
+
     def update_daily_pnl(self, pnl_pct: float) -> None:
         self.daily_pnl_pct = pnl_pct
         if self.daily_pnl_pct <= self.cfg.max_daily_loss_pct:
@@ -31,6 +37,6 @@ class RiskManager:
         # flag, allowing accounts with low equity to open new positions
         # if the flag was not set.  This check makes the behaviour
         # robust by also validating the equity value.
-        if is_pdt_restricted or equity_usd < 25_000:
+        if is_pdt_restricted or equity_usd < PDT_MIN_EQUITY:
             return False
         return True
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .manager import PDT_MIN_EQUITY, RiskConfig
+
+
+class PortfolioRiskManager:
+    """Portfolio-wide risk state in flat per-symbol arrays.
+
+    Fills update position, average cost and cash; ticks update marks. Both
+    keep ``equity`` current incrementally, so the daily loss breaker is
+    checked on every update without a full revaluation. ``can_open_new``
+    screens a batch of candidate orders in one pass.
+    """
+
+    def __init__(self, cfg: RiskConfig, start_equity: float, capacity: int = 1024) -> None:
+        self.cfg = cfg
+        self.index: dict[str, int] = {}
+        self.symbols: list[str] = []
+        self.qty = np.zeros(capacity)
+        self.avg_cost = np.zeros(capacity)
+        self.mark = np.zeros(capacity)
+        self.realized = np.zeros(capacity)
+        self.pdt_restricted = False
+        self.cash = self._equity = start_equity
+        self.reset_day(start_equity)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def reset_day(self, start_equity: float | None = None) -> None:
+        """Start a new trading day; re-arms the loss breaker."""
+        self.revalue()
+        self.start_equity = self._equity if start_equity is None else start_equity
+        self.disabled = False
+
+    def revalue(self) -> float:
+        """Recompute equity from scratch, dropping drift from incremental updates."""
+        n = len(self.symbols)
+        self._equity = float(self.cash + self.qty[:n] @ self.mark[:n])
+        return self._equity
+
+    @property
+    def equity(self) -> float:
+        return self._equity
+
+    @property
+    def daily_pnl_pct(self) -> float:
+        return (self._equity - self.start_equity) / self.start_equity * 100
+
+    def _slot(self, symbol: str) -> int:
+        i = self.index.get(symbol)
+        if i is None:
+            i = self.index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            if i == len(self.qty):
+                for name in ("qty", "avg_cost", "mark", "realized"):
+                    arr = getattr(self, name)
+                    setattr(self, name, np.concatenate([arr, np.zeros(len(arr))]))
+        return i
+
+    def _check_breaker(self) -> None:
+        if self.daily_pnl_pct <= self.cfg.max_daily_loss_pct:
+            self.disabled = True
+
+    def on_fill(self, symbol: str, qty: float, price: float) -> None:
+        """Apply a signed fill (``qty`` > 0 buys, < 0 sells) and mark the symbol at ``price``."""
+        if not qty:
+            return
+        i = self._slot(symbol)
+        pos = self.qty[i]
+        new = pos + qty
+        if pos == 0 or np.sign(qty) == np.sign(pos):
+            self.avg_cost[i] = (self.avg_cost[i] * pos + price * qty) / new
+        else:
+            closed = min(abs(qty), abs(pos)) * np.sign(pos)
+            self.realized[i] += closed * (price - self.avg_cost[i])
+            if np.sign(new) != np.sign(pos):  # flipped through flat
+                self.avg_cost[i] = price if new else 0.0
+        self.cash -= qty * price
+        self._equity += pos * (price - self.mark[i])
+        self.qty[i] = new
+        self.mark[i] = price
+        self._check_breaker()
+
+    def update_marks(self, symbols: Sequence[str], prices: ArrayLike) -> None:
+        """Mark a block of ticks (e.g. a ``TickBatch``'s ``symbol``/``price``); the last tick per symbol wins.
+
+        Symbols without a position are ignored.
+        """
+        get = self.index.get
+        idx = np.fromiter((get(s, -1) for s in symbols), dtype=np.int64, count=len(symbols))
+        px = np.asarray(prices, dtype=float)
+        held = idx >= 0
+        idx, px = idx[held][::-1], px[held][::-1]
+        if not len(idx):
+            return
+        idx, first = np.unique(idx, return_index=True)  # first in reversed order = last tick
+        px = px[first]
+        self._equity += float(self.qty[idx] @ (px - self.mark[idx]))
+        self.mark[idx] = px
+        self._check_breaker()
+
+    def exposure_pct(self) -> dict[str, float]:
+        n = len(self.symbols)
+        pct = np.abs(self.qty[:n] * self.mark[:n]) / self._equity * 100
+        return dict(zip(self.symbols, pct.tolist(), strict=True))
+
+    def can_open_new(self, symbols: Sequence[str], notional: ArrayLike) -> np.ndarray:
+        """Boolean mask over candidate orders with signed ``notional`` (USD).
+
+        An order passes if the breaker is armed, the account is not PDT
+        restricted and the symbol's exposure after it stays within
+        ``per_symbol_cap_pct``. Earlier candidates for the same symbol count
+        towards later ones, whether or not they pass.
+        """
+        notional = np.asarray(notional, dtype=float)
+        n = len(notional)
+        equity = self._equity
+        if self.disabled or self.pdt_restricted or equity < PDT_MIN_EQUITY:
+            return np.zeros(n, dtype=bool)
+        get = self.index.get
+        idx = np.fromiter((get(s, -1) for s in symbols), dtype=np.int64, count=n)
+        held = idx >= 0
+        current = np.zeros(n)
+        current[held] = self.qty[idx[held]] * self.mark[idx[held]]
+        # Running total of notional per symbol, in candidate order.
+        seen: dict[str, int] = {}
+        keys = np.fromiter((seen.setdefault(s, len(seen)) for s in symbols), dtype=np.int64, count=n)
+        order = np.argsort(keys, kind="stable")
+        run = np.cumsum(notional[order])
+        starts = np.r_[0, np.flatnonzero(np.diff(keys[order])) + 1]
+        run -= np.repeat(np.r_[0.0, run][starts], np.diff(np.r_[starts, n]))
+        projected = np.empty(n)
+        projected[order] = run
+        projected += current
+        return np.abs(projected) / equity * 100 <= self.cfg.per_symbol_cap_pct
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from ..models.serving import LatencyTracker
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class JobPolicy:
+    # Runs of one job that may be queued or running at once; triggers past
+    # the limit are skipped, so an overrunning job never piles up.
+    max_instances: int = 1
+    # Collapse runs missed while the scheduler was busy or down into one,
+    # and drop runs more than ``misfire_grace_seconds`` late.
+    coalesce: bool = True
+    misfire_grace_seconds: int | None = 60
+    timeout_seconds: float | None = None
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobContext:
+    """Passed to each run: the shared resources plus a cancel flag set on timeout.
+
+    Threads cannot be killed, so timeouts are cooperative: long jobs call
+    ``check`` between steps and stop there.
+    """
+
+    def __init__(self, name: str, resources: Any) -> None:
+        self.name = name
+        self.resources = resources
+        self.cancelled = threading.Event()
+
+    def check(self) -> None:
+        if self.cancelled.is_set():
+            raise JobCancelled(self.name)
+
+
+JobFunc = Callable[[JobContext], Any]
+
+
+@dataclass
+class JobStats:
+    runs: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    skipped: int = 0
+    active: int = 0  # queued + running
+    duration: LatencyTracker = field(default_factory=lambda: LatencyTracker(1000))
+    queue_lag: LatencyTracker = field(default_factory=lambda: LatencyTracker(1000))
+
+    def snapshot(self) -> dict[str, object]:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "skipped": self.skipped,
+            "active": self.active,
+            "duration": self.duration.snapshot(),
+            "queue_lag": self.queue_lag.snapshot(),
+        }
+
+
+@dataclass
+class _Job:
+    func: JobFunc
+    policy: JobPolicy
+    stats: JobStats = field(default_factory=JobStats)
+
+
+class JobExecutor:
+    """Runs registered jobs on one bounded thread pool with per-job limits.
+
+    The scheduler only decides when a job is due and calls ``submit``; the
+    body runs here, so a slow job holds one worker instead of the scheduler.
+    Threads rather than processes let jobs share ``resources`` (store
+    connection, resident models, feature state) across runs; the heavy
+    parts (DuckDB, LightGBM) release the GIL.
+    """
+
+    def __init__(self, resources: Any = None, workers: int = 4) -> None:
+        self.resources = resources
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs: dict[str, _Job] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, func: JobFunc, policy: JobPolicy | None = None) -> None:
+        self._jobs[name] = _Job(func, policy or JobPolicy())
+
+    def schedule(self, sched: Any, name: str, trigger: str, **trigger_args: Any) -> None:
+        """Add ``name`` to an APScheduler scheduler with its coalesce/misfire policy."""
+        policy = self._jobs[name].policy
+        sched.add_job(
+            self.submit,
+            trigger,
+            args=[name],
+            id=name,
+            name=name,
+            coalesce=policy.coalesce,
+            misfire_grace_time=policy.misfire_grace_seconds,
+            replace_existing=True,
+            **trigger_args,
+        )
+
+    def submit(self, name: str) -> Future[Any] | None:
+        """Queue a run of ``name``; returns None if it is already at ``max_instances``."""
+        job = self._jobs[name]
+        with self._lock:
+            if job.stats.active >= job.policy.max_instances:
+                job.stats.skipped += 1
+                logger.warning("Job %s skipped: %d run(s) still active", name, job.stats.active)
+                return None
+            job.stats.active += 1
+        try:
+            return self._pool.submit(self._run, name, job, time.perf_counter())
+        except RuntimeError:  # pool shut down
+            with self._lock:
+                job.stats.active -= 1
+            raise
+
+    def _run(self, name: str, job: _Job, queued_at: float) -> Any:
+        started = time.perf_counter()
+        job.stats.queue_lag.record(started - queued_at)
+        ctx = JobContext(name, self.resources)
+        timer = None
+        if job.policy.timeout_seconds is not None:
+            timer = threading.Timer(job.policy.timeout_seconds, self._timeout, (name, job, ctx))
+            timer.daemon = True
+            timer.start()
+        try:
+            return job.func(ctx)
+        except JobCancelled:
+            logger.warning("Job %s stopped after timeout", name)
+            return None
+        except Exception:
+            with self._lock:
+                job.stats.failures += 1
+            logger.exception("Job %s failed", name)
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+            elapsed = time.perf_counter() - started
+            job.stats.duration.record(elapsed)
+            with self._lock:
+                job.stats.runs += 1
+                job.stats.active -= 1
+            logger.info("Job %s finished in %.1f ms (queued %.1f ms)", name, 1000 * elapsed,
+                        1000 * (started - queued_at))
+
+    def _timeout(self, name: str, job: _Job, ctx: JobContext) -> None:
+        with self._lock:
+            job.stats.timeouts += 1
+        ctx.cancelled.set()
+        logger.warning("Job %s exceeded %.0f s; cancelling", name, job.policy.timeout_seconds)
+
+    def metrics(self) -> dict[str, dict[str, object]]:
+        return {name: job.stats.snapshot() for name, job in self._jobs.items()}
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
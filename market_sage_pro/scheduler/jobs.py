@@ -1,33 +1,244 @@
 from __future__ import annotations
 
+import copy
 import os
-from datetime import datetime
+import threading
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 
+import numpy as np
 from apscheduler.schedulers.blocking import BlockingScheduler
 
+from ..data.incremental import IncrementalFeatureSet
+from ..data.pipeline import DEFAULT_SPECS, IndicatorSpec
+from ..data.store import DuckDBStore, RetentionConfig
+from ..models.lightgbm_hourly import HourlyLightGBM
+from ..models.serving import ModelServer, ServingConfig
 from ..utils.logging import get_logger
+from .executor import JobContext, JobExecutor, JobPolicy
+
+try:
+    from ..notifications.email import render_pdf_report
+except Exception:  # pragma: no cover - weasyprint needs system libraries
+    render_pdf_report = None  # type: ignore
 
 logger = get_logger(__name__)
 
+DB_PATH = os.environ.get("MARKETSAGE_DB", "data/market.duckdb")
+MAINTENANCE_MINUTES = int(os.environ.get("MARKETSAGE_MAINTENANCE_MINUTES", "60"))
+JOB_WORKERS = int(os.environ.get("MARKETSAGE_JOB_WORKERS", "4"))
+RETENTION = RetentionConfig(
+    days=int(os.environ.get("MARKETSAGE_RETENTION_DAYS", "180")),
+    min_expired_rows=int(os.environ.get("MARKETSAGE_RETENTION_MIN_ROWS", "10000")),
+    compact_after_deleted=int(os.environ.get("MARKETSAGE_COMPACT_AFTER_ROWS", "1000000")),
+)
+
+# Registers a model under a name and returns its new version.
+ModelPublisher = Callable[[object, str], str]
+
+
+def _registry_publish(model: object, name: str) -> str:
+    from ..models.registry import register_model
+
+    return register_model(model, name)
+
+
+@dataclass
+class TrainingRows:
+    X: np.ndarray
+    y: np.ndarray
+    # Feature state after these rows; becomes current on ``JobResources.commit``.
+    features: dict[str, IncrementalFeatureSet]
+    watermark: dict[str, datetime]
+    unlabelled: dict[str, tuple[np.ndarray, float]]
+
+
+class JobResources:
+    """Warm state shared by every job run in the scheduler process.
+
+    The store connection is opened once, the hourly model stays resident
+    between updates, and per-symbol incremental features carry over so each
+    update only reads and featurizes bars newer than the last one seen.
+    Only ``update_hourly_model`` touches the model and feature state, and it
+    runs one instance at a time; the state only advances after a successful
+    update. Each update trains a copy of the resident model and registers
+    it with ``publish``, so the API's ``ModelServer`` hot-swaps it on its
+    next poll and a restart resumes from it.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DB_PATH,
+        server: ModelServer | None = None,
+        specs: Sequence[str | IndicatorSpec] = DEFAULT_SPECS,
+        publish: ModelPublisher | None = None,
+    ) -> None:
+        self.db_path = db_path
+        self.server = server or ModelServer(ServingConfig(poll_seconds=0))
+        self.publish = publish or _registry_publish
+        self.hourly = HourlyLightGBM()
+        self.specs = specs
+        self.symbols: list[str] = []
+        self.features: dict[str, IncrementalFeatureSet] = {}
+        self.watermark: dict[str, datetime] = {}
+        # Last bar's feature row and close per symbol, labelled once the next bar arrives.
+        self._unlabelled: dict[str, tuple[np.ndarray, float]] = {}
+        self._store: DuckDBStore | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def store(self) -> DuckDBStore:
+        with self._lock:
+            if self._store is None:
+                self._store = DuckDBStore(self.db_path)
+            return self._store
+
+    def refresh_symbols(self) -> list[str]:
+        with self.store.conn.cursor() as cur:
+            rows = cur.execute("SELECT DISTINCT symbol FROM bars ORDER BY symbol").fetchall()
+        self.symbols = [r[0] for r in rows]
+        return self.symbols
+
+    def load_models(self) -> None:
+        try:
+            self.server.load()
+        except Exception as exc:
+            logger.warning("Model registry unavailable, keeping resident models: %s", exc)
+        if self.hourly.model is None:
+            # Shared with the server; updates train a copy, so this one is never mutated.
+            self.hourly = self.server.models.hourly
+
+    def _first_start(self, symbol: str, bars: int) -> datetime | None:
+        """Start of ``symbol``'s last ``bars`` bars, so a cold start does not scan all history."""
+        q = "SELECT ts FROM bars WHERE symbol = ? ORDER BY ts DESC LIMIT 1 OFFSET ?"
+        with self.store.conn.cursor() as cur:
+            row = cur.execute(q, [symbol, bars - 1]).fetchone()
+        return None if row is None else row[0]
+
+    def new_training_rows(self, ctx: JobContext | None = None) -> TrainingRows:
+        """Feature rows and next-bar-up labels for bars seen since the last ``commit``.
+
+        Works on copies of the feature state, so rows that never get trained
+        on (failure, timeout) are produced again by the next call. A cold
+        start reads at most the model's ``window_bars``, split across symbols.
+        """
+        symbols = self.symbols or self.refresh_symbols()
+        per_symbol = max(1, self.hourly.cfg.window_bars // max(1, len(symbols)))
+        out = TrainingRows(
+            np.empty((0, len(IncrementalFeatureSet(self.specs).columns))),
+            np.empty(0),
+            copy.deepcopy(self.features),
+            dict(self.watermark),
+            dict(self._unlabelled),
+        )
+        X: list[np.ndarray] = []
+        y: list[float] = []
+        for sym in symbols:
+            if ctx is not None:
+                ctx.check()
+            fs = out.features.get(sym)
+            if fs is None:
+                fs = out.features[sym] = IncrementalFeatureSet(self.specs)
+            last = out.watermark.get(sym)
+            start = last + timedelta(microseconds=1) if last is not None else self._first_start(sym, per_symbol)
+            for df in self.store.iter_bars(sym, start=start):
+                cols = df[["close", "high", "low", "volume"]].to_numpy(dtype=float)
+                for close, high, low, volume in cols.tolist():
+                    row = fs.update(close, high, low, volume)
+                    prev = out.unlabelled.get(sym)
+                    if prev is not None:
+                        X.append(prev[0])
+                        y.append(float(close > prev[1]))
+                    out.unlabelled[sym] = (row, close)
+                out.watermark[sym] = df["ts"].iloc[-1].to_pydatetime()
+        if y:
+            out.X, out.y = np.array(X), np.array(y)
+        return out
+
+    def commit(self, rows: TrainingRows) -> None:
+        """Advance the feature state and watermarks past ``rows`` once they are trained on."""
+        self.features, self.watermark, self._unlabelled = rows.features, rows.watermark, rows.unlabelled
+
+    def close(self) -> None:
+        with self._lock:
+            if self._store is not None:
+                self._store.close()
+                self._store = None
+
+
+def morning_setup(ctx: JobContext) -> None:
+    res: JobResources = ctx.resources
+    symbols = res.refresh_symbols()
+    res.load_models()
+    logger.info("Morning setup: %d symbols, models %s", len(symbols), res.server.models.versions)
+
+
+def daily_report(ctx: JobContext) -> None:
+    res: JobResources = ctx.resources
+    latest = res.store.read_cross_section(symbols=res.symbols or None)
+    metrics: dict[str, object] = {
+        "symbols": len(latest),
+        "last_bar": str(latest["ts"].max()) if len(latest) else None,
+        "hourly_trees": res.hourly.num_trees if res.hourly.model is not None else 0,
+        "model_versions": res.server.models.versions,
+    }
+    if render_pdf_report is None:
+        logger.info("Daily report (PDF rendering unavailable): %s", metrics)
+        return
+    path = render_pdf_report(metrics, f"reports/daily_report_{datetime.utcnow():%Y%m%d}.pdf")
+    logger.info("Daily report written to %s", path)
+
 
-sched = BlockingScheduler(timezone="US/Eastern")
+def update_hourly_model(ctx: JobContext) -> None:
+    res: JobResources = ctx.resources
+    rows = res.new_training_rows(ctx)
+    if not len(rows.y):
+        logger.info("Hourly model: no new bars")
+        res.commit(rows)
+        return
+    ctx.check()
+    model = copy.deepcopy(res.hourly)
+    model.partial_update(rows.X, rows.y)
+    name = res.server.cfg.hourly_model
+    version = res.publish(model, name)
+    res.hourly = model
+    res.commit(rows)
+    logger.info("Registered %s version %s", name, version)
 
 
-@sched.scheduled_job("cron", day_of_week="mon-fri", hour=8, minute=0)
-def morning_setup() -> None:
-    logger.info("Morning setup: refresh symbols, warm models")
+def store_maintenance(ctx: JobContext) -> None:
+    stats = ctx.resources.store.run_maintenance(RETENTION)
+    logger.info("Store maintenance: %s", stats)
 
 
-@sched.scheduled_job("cron", day_of_week="mon-fri", hour=16, minute=5)
-def daily_report() -> None:
-    logger.info("Generating daily report PDF and emailing...")
+def build_executor(resources: JobResources | None = None, workers: int = JOB_WORKERS) -> JobExecutor:
+    executor = JobExecutor(resources or JobResources(), workers)
+    executor.register("morning_setup", morning_setup, JobPolicy(misfire_grace_seconds=3600, timeout_seconds=600))
+    executor.register("daily_report", daily_report, JobPolicy(misfire_grace_seconds=3600, timeout_seconds=600))
+    # A retrain that overruns its 10-minute slot skips the next trigger rather than queueing behind it.
+    executor.register("update_hourly_model", update_hourly_model, JobPolicy(misfire_grace_seconds=120,
+                                                                            timeout_seconds=540))
+    executor.register("store_maintenance", store_maintenance, JobPolicy(misfire_grace_seconds=600))
+    return executor
 
 
-@sched.scheduled_job("interval", minutes=10)
-def update_hourly_model() -> None:
-    logger.info("Updating online LightGBM on the last 10k bars...")
+def build_scheduler(executor: JobExecutor) -> BlockingScheduler:
+    sched = BlockingScheduler(timezone="US/Eastern")
+    executor.schedule(sched, "morning_setup", "cron", day_of_week="mon-fri", hour=8, minute=0)
+    executor.schedule(sched, "daily_report", "cron", day_of_week="mon-fri", hour=16, minute=5)
+    executor.schedule(sched, "update_hourly_model", "interval", minutes=10)
+    executor.schedule(sched, "store_maintenance", "interval", minutes=MAINTENANCE_MINUTES)
+    return sched
 
 
 if __name__ == "__main__":
+    executor = build_executor()
+    sched = build_scheduler(executor)
+    executor.submit("morning_setup")  # warm resources now rather than at the next 8:00
     logger.info("Starting scheduler...")
-    sched.start()
\ No newline at end of file
+    try:
+        sched.start()
+    finally:
+        executor.shutdown()
+        executor.resources.close()
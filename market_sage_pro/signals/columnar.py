@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .generator import (
+    ACTIONS,
+    RATIONALE_TEXT,
+    SignalBatch,
+    SignalConfig,
+    generate_signals_batch,
+    rationale_text,
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except Exception:  # pragma: no cover - Arrow payloads need pyarrow
+    pa = None
+    ipc = None
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+# Column names expected by ``signals_from_columns``, in ``generate_signals_batch`` order.
+SIGNAL_INPUTS: tuple[str, ...] = (
+    "ensemble_up_prob",
+    "ensemble_down_prob",
+    "predicted_move_pct",
+    "rsi",
+    "price_vs_ema21",
+    "ivr",
+    "prob_big_move",
+)
+
+# Every rationale bitmask -> text, so a batch is decoded with one take.
+RATIONALES = np.array([rationale_text(m) for m in range(1 << len(RATIONALE_TEXT))], dtype=object)
+_ACTION_NAMES = np.asarray(ACTIONS, dtype=object)
+
+
+def signals_from_columns(columns: Mapping[str, ArrayLike], cfg: SignalConfig) -> SignalBatch:
+    """Evaluate a columnar batch; raises ``ValueError`` on missing or ragged columns."""
+    missing = [c for c in SIGNAL_INPUTS if c not in columns]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(missing)}")
+    arrays = [np.asarray(columns[c], dtype=float) for c in SIGNAL_INPUTS]
+    if any(a.ndim != 1 or len(a) != len(arrays[0]) for a in arrays):
+        raise ValueError("columns must be 1-d and of equal length")
+    up, down, move, rsi, px_vs_ema, ivr, big_move = arrays
+    return generate_signals_batch(up, down, move, rsi, px_vs_ema, ivr, big_move, cfg)
+
+
+def batch_to_json_columns(sig: SignalBatch) -> dict[str, object]:
+    """Columns ready for ``orjson.dumps(..., option=OPT_SERIALIZE_NUMPY)``."""
+    return {
+        "action": _ACTION_NAMES[sig.action].tolist(),
+        "probability": sig.probability,
+        "predicted_move_pct": sig.predicted_move_pct,
+        "confidence": sig.confidence,
+        "size_fraction": sig.size_fraction,
+        "stop_loss_pct": sig.stop_loss_pct,
+        "target_pct": sig.target_pct,
+        "rationale": RATIONALES[sig.rationale].tolist(),
+    }
+
+
+def read_arrow(payload: bytes) -> dict[str, np.ndarray]:
+    if ipc is None:
+        raise RuntimeError("pyarrow is required for Arrow payloads")
+    table = ipc.open_stream(payload).read_all()
+    return {name: table.column(name).to_numpy() for name in table.column_names}
+
+
+def batch_to_arrow(sig: SignalBatch) -> bytes:
+    """Arrow IPC stream; ``action`` and ``rationale`` are dictionary-encoded."""
+    if pa is None:
+        raise RuntimeError("pyarrow is required for Arrow payloads")
+    table = pa.table({
+        "action": pa.DictionaryArray.from_arrays(sig.action, pa.array(ACTIONS)),
+        "probability": sig.probability,
+        "predicted_move_pct": sig.predicted_move_pct,
+        "confidence": sig.confidence,
+        "size_fraction": sig.size_fraction,
+        "stop_loss_pct": sig.stop_loss_pct,
+        "target_pct": sig.target_pct,
+        "rationale": pa.DictionaryArray.from_arrays(sig.rationale, pa.array(RATIONALES.tolist())),
+    })
+    sink = pa.BufferOutputStream()
+    with ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return bytes(sink.getvalue().to_pybytes())
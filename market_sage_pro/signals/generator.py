@@ -4,12 +4,28 @@ from dataclasses import dataclass
 from typing import Literal
 
 import numpy as np
+from numpy.typing import ArrayLike
 
-from ..utils.kelly import kelly_fraction
-
+from ..utils.kelly import kelly_fraction_array
 
 TradeAction = Literal["BUY", "SHORT", "HOLD", "OPTION_SELL_STRADDLE", "OPTION_BUY_ATM"]
 
+# Integer action codes used by the batch API; ``ACTIONS[code]`` gives the name.
+ACTIONS: tuple[TradeAction, ...] = ("HOLD", "BUY", "SHORT", "OPTION_SELL_STRADDLE", "OPTION_BUY_ATM")
+HOLD, BUY, SHORT, OPTION_SELL_STRADDLE, OPTION_BUY_ATM = range(len(ACTIONS))
+
+# Rationale bitmask flags, in the order their text is joined.
+RATIONALE_UP = 1
+RATIONALE_DOWN = 2
+RATIONALE_STRADDLE = 4
+RATIONALE_BUY_ATM = 8
+RATIONALE_TEXT: dict[int, str] = {
+    RATIONALE_UP: "Up prob >=0.70, RSI<65, above EMA21",
+    RATIONALE_DOWN: "Down prob >=0.70, RSI>35, below EMA21",
+    RATIONALE_STRADDLE: "IVR<0.3 and P(|move|>1%)>=0.6 -> 1SD straddle",
+    RATIONALE_BUY_ATM: "Directional + buy 7DTE ATM option",
+}
+
 
 @dataclass
 class Signal:
@@ -26,56 +42,137 @@ class Signal:
 @dataclass
 class SignalConfig:
     kelly_fraction_cap: float
+    min_prob: float = 0.70
+    min_move_pct: float = 0.25
+    rsi_overbought: float = 65.0
+    rsi_oversold: float = 35.0
+    max_ivr: float = 0.3
+    big_move_prob: float = 0.6
 
 
-def generate_signal(
-    ensemble_up_prob: float,
-    ensemble_down_prob: float,
-    predicted_move_pct: float,
-    rsi: float,
-    price_vs_ema21: float,
-    ivr: float,
-    prob_big_move: float,
+@dataclass
+class SignalBatch:
+    action: np.ndarray  # int8 codes into ACTIONS
+    probability: np.ndarray
+    predicted_move_pct: np.ndarray
+    confidence: np.ndarray
+    size_fraction: np.ndarray
+    stop_loss_pct: np.ndarray
+    target_pct: np.ndarray
+    rationale: np.ndarray  # uint8 bitmask of RATIONALE_* flags
+
+    def __len__(self) -> int:
+        return int(self.action.shape[0])
+
+    def action_names(self) -> np.ndarray:
+        return np.take(np.asarray(ACTIONS, dtype=object), self.action)
+
+    def signal(self, i: int) -> Signal:
+        return Signal(
+            action=ACTIONS[int(self.action[i])],
+            probability=float(self.probability[i]),
+            predicted_move_pct=float(self.predicted_move_pct[i]),
+            confidence=int(self.confidence[i]),
+            size_fraction=float(self.size_fraction[i]),
+            stop_loss_pct=float(self.stop_loss_pct[i]),
+            target_pct=float(self.target_pct[i]),
+            rationale=rationale_text(int(self.rationale[i])),
+        )
+
+
+def rationale_text(mask: int) -> str:
+    parts = [text for bit, text in RATIONALE_TEXT.items() if mask & bit]
+    return "; ".join(parts) or "No edge"
+
+
+def generate_signals_batch(
+    ensemble_up_prob: ArrayLike,
+    ensemble_down_prob: ArrayLike,
+    predicted_move_pct: ArrayLike,
+    rsi: ArrayLike,
+    price_vs_ema21: ArrayLike,
+    ivr: ArrayLike,
+    prob_big_move: ArrayLike,
     cfg: SignalConfig,
-) -> Signal:
-    action: TradeAction = "HOLD"
-    rationale = []
+) -> SignalBatch:
+    up = np.asarray(ensemble_up_prob, dtype=float)
+    down = np.asarray(ensemble_down_prob, dtype=float)
+    move = np.asarray(predicted_move_pct, dtype=float)
+    rsi_ = np.asarray(rsi, dtype=float)
+    px_vs_ema = np.asarray(price_vs_ema21, dtype=float)
+    ivr_ = np.asarray(ivr, dtype=float)
+    p_big = np.asarray(prob_big_move, dtype=float)
 
     # Directional gates
-    if predicted_move_pct >= 0.25 and ensemble_up_prob >= 0.70 and rsi < 65 and price_vs_ema21 >= 0:
-        action = "BUY"
-        rationale.append("Up prob >=0.70, RSI<65, above EMA21")
-    elif predicted_move_pct <= -0.25 and ensemble_down_prob >= 0.70 and rsi > 35 and price_vs_ema21 <= 0:
-        action = "SHORT"
-        rationale.append("Down prob >=0.70, RSI>35, below EMA21")
+    buy = (move >= cfg.min_move_pct) & (up >= cfg.min_prob) & (rsi_ < cfg.rsi_overbought) & (px_vs_ema >= 0)
+    short = (
+        ~buy
+        & (move <= -cfg.min_move_pct)
+        & (down >= cfg.min_prob)
+        & (rsi_ > cfg.rsi_oversold)
+        & (px_vs_ema <= 0)
+    )
+    directional = buy | short
 
     # Options play
-    if ivr < 0.3 and prob_big_move >= 0.6:
-        action = "OPTION_SELL_STRADDLE"
-        rationale.append("IVR<0.3 and P(|move|>1%)>=0.6 -> 1SD straddle")
-    elif action in ("BUY", "SHORT") and prob_big_move < 0.6:
-        action = "OPTION_BUY_ATM"
-        rationale.append("Directional + buy 7DTE ATM option")
-
-    # Sizing via Kelly
-    win_prob = max(ensemble_up_prob, ensemble_down_prob)
-    win_loss_ratio = max(1.0, abs(predicted_move_pct) / 0.5)
-    kelly = kelly_fraction(win_prob, win_loss_ratio)
-    size_frac = min(kelly * win_prob, cfg.kelly_fraction_cap)
+    straddle = (ivr_ < cfg.max_ivr) & (p_big >= cfg.big_move_prob)
+    buy_atm = ~straddle & directional & (p_big < cfg.big_move_prob)
+
+    action = np.full(up.shape, HOLD, dtype=np.int8)
+    action[buy] = BUY
+    action[short] = SHORT
+    action[straddle] = OPTION_SELL_STRADDLE
+    action[buy_atm] = OPTION_BUY_ATM
+
+    rationale = (
+        buy * RATIONALE_UP
+        | short * RATIONALE_DOWN
+        | straddle * RATIONALE_STRADDLE
+        | buy_atm * RATIONALE_BUY_ATM
+    ).astype(np.uint8)
+
+    # Sizing via Kelly; fmax skips a NaN operand, as the scalar max() did.
+    win_prob = np.fmax(up, down)
+    win_loss_ratio = np.fmax(1.0, np.abs(move) / 0.5)
+    kelly = kelly_fraction_array(win_prob, win_loss_ratio)
+    size_frac = np.minimum(kelly * win_prob, cfg.kelly_fraction_cap)
 
     # Stops/targets simple
-    stop = -abs(predicted_move_pct) * 0.8
-    target = abs(predicted_move_pct) * 1.5
+    stop = -np.abs(move) * 0.8
+    target = np.abs(move) * 1.5
 
-    confidence = int(round(win_prob * 100))
+    confidence = np.rint(np.nan_to_num(win_prob * 100)).astype(np.int64)
 
-    return Signal(
+    return SignalBatch(
         action=action,
         probability=win_prob,
-        predicted_move_pct=predicted_move_pct,
+        predicted_move_pct=move,
         confidence=confidence,
         size_fraction=size_frac,
         stop_loss_pct=stop,
         target_pct=target,
-        rationale="; ".join(rationale) or "No edge",
-    )
\ No newline at end of file
+        rationale=rationale,
+    )
+
+
+def generate_signal(
+    ensemble_up_prob: float,
+    ensemble_down_prob: float,
+    predicted_move_pct: float,
+    rsi: float,
+    price_vs_ema21: float,
+    ivr: float,
+    prob_big_move: float,
+    cfg: SignalConfig,
+) -> Signal:
+    batch = generate_signals_batch(
+        ensemble_up_prob=[ensemble_up_prob],
+        ensemble_down_prob=[ensemble_down_prob],
+        predicted_move_pct=[predicted_move_pct],
+        rsi=[rsi],
+        price_vs_ema21=[price_vs_ema21],
+        ivr=[ivr],
+        prob_big_move=[prob_big_move],
+        cfg=cfg,
+    )
+    return batch.signal(0)
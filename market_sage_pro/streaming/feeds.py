@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Protocol
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+except Exception:  # pragma: no cover - optional dependency
+    pq = None
+
+
+@dataclass(slots=True)
+class Tick:
+    symbol: str
+    ts: float  # epoch seconds
+    price: float
+    size: float = 0.0
+
+
+@dataclass
+class TickBatch:
+    """Columnar block of ticks, in arrival order."""
+
+    symbol: list[str] = field(default_factory=list)
+    ts: list[float] = field(default_factory=list)
+    price: list[float] = field(default_factory=list)
+    size: list[float] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    @classmethod
+    def from_ticks(cls, ticks: Iterable[Tick]) -> TickBatch:
+        batch = cls()
+        for t in ticks:
+            batch.symbol.append(t.symbol)
+            batch.ts.append(t.ts)
+            batch.price.append(t.price)
+            batch.size.append(t.size)
+        return batch
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> TickBatch:
+        """``symbol``, ``ts`` (epoch seconds or datetimes), ``price`` and optional ``size`` columns."""
+        ts = df["ts"]
+        if not pd.api.types.is_numeric_dtype(ts):
+            ts = pd.to_datetime(ts, utc=True).astype("int64") / 1e9
+        size = df["size"] if "size" in df.columns else np.zeros(len(df))
+        return cls(
+            df["symbol"].astype(str).tolist(),
+            np.asarray(ts, dtype=float).tolist(),
+            df["price"].to_numpy(dtype=float).tolist(),
+            np.asarray(size, dtype=float).tolist(),
+        )
+
+
+class TickFeed(Protocol):
+    def batches(self) -> AsyncIterator[TickBatch]: ...
+
+
+class IterableFeed:
+    """In-memory feed, mainly for tests and notebooks."""
+
+    def __init__(self, ticks: Iterable[Tick], chunk: int = 1000) -> None:
+        self.ticks = list(ticks)
+        self.chunk = chunk
+
+    async def batches(self) -> AsyncIterator[TickBatch]:
+        for i in range(0, len(self.ticks), self.chunk):
+            yield TickBatch.from_ticks(self.ticks[i : i + self.chunk])
+
+
+class FileFeed:
+    """Replays a CSV or Parquet tick file as fast as the consumer takes it."""
+
+    def __init__(self, path: str | Path, chunk: int = 5000) -> None:
+        self.path = Path(path)
+        self.chunk = chunk
+
+    def _frames(self) -> Iterable[pd.DataFrame]:
+        if self.path.suffix == ".parquet":
+            if pq is None:
+                yield pd.read_parquet(self.path)
+                return
+            for batch in pq.ParquetFile(self.path).iter_batches(batch_size=self.chunk):
+                yield batch.to_pandas()
+            return
+        yield from pd.read_csv(self.path, chunksize=self.chunk)
+
+    async def batches(self) -> AsyncIterator[TickBatch]:
+        for frame in self._frames():
+            yield TickBatch.from_frame(frame)
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from ..data.incremental import IncrementalFeatureSet
+from ..data.pipeline import DEFAULT_SPECS, IndicatorSpec
+from ..models.serving import ModelServer
+from ..risk.portfolio import PortfolioRiskManager
+from ..signals.generator import SignalConfig, generate_signals_batch
+from ..utils.logging import get_logger
+from .feeds import TickBatch, TickFeed
+
+logger = get_logger(__name__)
+
+Event = dict[str, Any]
+
+
+@dataclass(slots=True)
+class Bar:
+    symbol: str
+    start: float
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+class BarAggregator:
+    """Buckets ticks into fixed ``interval``-second OHLCV bars per symbol.
+
+    A bar closes when a later tick for its symbol arrives or when the feed
+    watermark passes its end (``close_until``). Ticks older than the open
+    bar are counted in ``late`` and dropped.
+    """
+
+    def __init__(self, interval: float = 60.0) -> None:
+        self.interval = interval
+        self.late = 0
+        self._open: dict[str, list[float]] = {}  # symbol -> [start, o, h, l, c, v]
+
+    def add(self, batch: TickBatch) -> list[Bar]:
+        closed: list[Bar] = []
+        interval = self.interval
+        bars = self._open
+        for sym, ts, px, size in zip(batch.symbol, batch.ts, batch.price, batch.size, strict=True):
+            start = ts - ts % interval
+            cur = bars.get(sym)
+            if cur is not None and start == cur[0]:
+                if px > cur[2]:
+                    cur[2] = px
+                elif px < cur[3]:
+                    cur[3] = px
+                cur[4] = px
+                cur[5] += size
+            elif cur is None or start > cur[0]:
+                if cur is not None:
+                    closed.append(Bar(sym, *cur))
+                bars[sym] = [start, px, px, px, px, size]
+            else:
+                self.late += 1
+        return closed
+
+    def close_until(self, watermark: float) -> list[Bar]:
+        done = [sym for sym, cur in self._open.items() if cur[0] + self.interval <= watermark]
+        return [Bar(sym, *self._open.pop(sym)) for sym in done]
+
+    def flush(self) -> list[Bar]:
+        return self.close_until(float("inf"))
+
+
+class Subscriber:
+    """Per-client mailbox that keeps only the newest event per symbol.
+
+    ``push`` never blocks; a client that falls behind sees the latest state
+    for each symbol (``conflated`` counts the events it skipped).
+    """
+
+    def __init__(self, symbols: set[str] | None = None) -> None:
+        self.symbols = symbols
+        self.conflated = 0
+        self._latest: dict[str, Event] = {}
+        self._ready = asyncio.Event()
+
+    def push(self, event: Event) -> None:
+        sym = event["symbol"]
+        if self.symbols is not None and sym not in self.symbols:
+            return
+        if sym in self._latest:
+            self.conflated += 1
+        self._latest[sym] = event
+        self._ready.set()
+
+    async def get(self) -> list[Event]:
+        await self._ready.wait()
+        self._ready.clear()
+        events, self._latest = list(self._latest.values()), {}
+        return events
+
+
+@dataclass
+class StreamConfig:
+    bar_seconds: float = 60.0
+    specs: Sequence[str | IndicatorSpec] = DEFAULT_SPECS
+    signal: SignalConfig = field(default_factory=lambda: SignalConfig(kelly_fraction_cap=0.5))
+    # Inputs the live feed does not provide yet, as in the backtest.
+    ivr: float = 0.5
+    prob_big_move: float = 0.7
+    move_ewm_alpha: float = 0.05
+
+
+@dataclass
+class StreamStats:
+    ticks: int = 0
+    bars: int = 0
+    signals: int = 0
+    errors: int = 0  # tick blocks dropped because scoring them failed
+    seconds: float = 0.0
+
+    @property
+    def ticks_per_sec(self) -> float:
+        return self.ticks / self.seconds if self.seconds else 0.0
+
+
+class StreamPipeline:
+    """Ticks -> bars -> incremental features -> model -> signals -> subscribers."""
+
+    def __init__(
+        self,
+        cfg: StreamConfig | None = None,
+        server: ModelServer | None = None,
+        risk: PortfolioRiskManager | None = None,
+    ) -> None:
+        self.cfg = cfg or StreamConfig()
+        self.server = server or ModelServer()
+        self.risk = risk  # marked to market on every tick block
+        self.bars = BarAggregator(self.cfg.bar_seconds)
+        self.stats = StreamStats()
+        self._features: dict[str, IncrementalFeatureSet] = {}
+        self._typical_move: dict[str, float] = {}
+        self._subscribers: set[Subscriber] = set()
+        columns = IncrementalFeatureSet(self.cfg.specs).columns
+        self._rsi = columns.index("rsi_14") if "rsi_14" in columns else None
+        self._px_vs_ema = columns.index("px_vs_ema_21") if "px_vs_ema_21" in columns else None
+
+    def subscribe(self, symbols: set[str] | None = None) -> Subscriber:
+        sub = Subscriber(symbols)
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        self._subscribers.discard(sub)
+
+    def state_dict(self) -> dict[str, Any]:
+        """Per-symbol feature and typical-move state, so a restart resumes without replaying history."""
+        return {
+            "features": {sym: fs.state_dict() for sym, fs in self._features.items()},
+            "typical_move": dict(self._typical_move),
+        }
+
+    def load_state(self, state: dict[str, Any]) -> None:
+        self._features = {sym: IncrementalFeatureSet.from_state(s) for sym, s in state["features"].items()}
+        self._typical_move = dict(state["typical_move"])
+
+    def _bar_features(self, bar: Bar) -> np.ndarray:
+        state = self._features.get(bar.symbol)
+        if state is None:
+            state = self._features[bar.symbol] = IncrementalFeatureSet(self.cfg.specs)
+        prev = state.prev_close
+        row = state.update(bar.close, bar.high, bar.low, bar.volume)
+        if prev == prev:  # not NaN
+            move = abs(bar.close / prev - 1) * 100
+            old = self._typical_move.get(bar.symbol)
+            a = self.cfg.move_ewm_alpha
+            self._typical_move[bar.symbol] = move if old is None else (1 - a) * old + a * move
+        return row
+
+    def _featurize(self, bars: list[Bar]) -> tuple[list[Event], np.ndarray, np.ndarray]:
+        """Bar events, feature rows, and the indices of rows warm enough to score."""
+        bars.sort(key=lambda b: (b.start, b.symbol))
+        rows = np.array([self._bar_features(b) for b in bars]).reshape(len(bars), -1)
+        events: list[Event] = [
+            {"type": "bar", "symbol": b.symbol, "ts": b.start, "open": b.open, "high": b.high, "low": b.low,
+             "close": b.close, "volume": b.volume}
+            for b in bars
+        ]
+        return events, rows, np.flatnonzero(np.isfinite(rows).all(axis=1))
+
+    def _events(self, bars: list[Bar]) -> list[Event]:
+        events, rows, ready = self._featurize(bars)
+        if not len(ready):
+            return events
+        return self._signals(events, rows, ready, self.server.predict_batch(rows[ready]))
+
+    async def _events_async(self, bars: list[Bar]) -> list[Event]:
+        """``_events`` with scoring off the event loop, through the server's micro-batcher."""
+        events, rows, ready = self._featurize(bars)
+        if not len(ready):
+            return events
+        return self._signals(events, rows, ready, await self.server.predict(rows[ready]))
+
+    def _signals(self, events: list[Event], rows: np.ndarray, ready: np.ndarray, p_up: np.ndarray) -> list[Event]:
+        n = len(ready)
+        typical = np.array([self._typical_move.get(events[i]["symbol"], 0.0) for i in ready])
+        rsi = rows[ready, self._rsi] if self._rsi is not None else np.full(n, 50.0)
+        px = rows[ready, self._px_vs_ema] if self._px_vs_ema is not None else np.zeros(n)
+        sig = generate_signals_batch(
+            p_up, 1 - p_up, (2 * p_up - 1) * typical, rsi, px,
+            np.full(n, self.cfg.ivr), np.full(n, self.cfg.prob_big_move), self.cfg.signal,
+        )
+        for j, i in enumerate(ready.tolist()):
+            events[i].update(type="signal", p_up=float(p_up[j]), **sig.signal(j).__dict__)
+        self.stats.signals += n
+        return events
+
+    def _ingest(self, batch: TickBatch) -> list[Bar]:
+        closed = self.bars.add(batch)
+        if self.risk is not None:
+            self.risk.update_marks(batch.symbol, batch.price)
+        if len(batch):
+            closed += self.bars.close_until(max(batch.ts))
+        self.stats.ticks += len(batch)
+        self.stats.bars += len(closed)
+        return closed
+
+    def process(self, batch: TickBatch) -> list[Event]:
+        """Run one block of ticks through the pipeline and publish what closed."""
+        t0 = time.perf_counter()
+        closed = self._ingest(batch)
+        events = self._events(closed) if closed else []
+        self._publish(events)
+        self.stats.seconds += time.perf_counter() - t0
+        return events
+
+    async def process_async(self, batch: TickBatch) -> list[Event]:
+        """``process`` for use on the event loop: model scoring does not block it."""
+        t0 = time.perf_counter()
+        closed = self._ingest(batch)
+        events = await self._events_async(closed) if closed else []
+        self._publish(events)
+        self.stats.seconds += time.perf_counter() - t0
+        return events
+
+    def _publish(self, events: list[Event]) -> None:
+        for sub in self._subscribers:
+            for event in events:
+                sub.push(event)
+
+    async def run(self, feed: TickFeed) -> StreamStats:
+        """Consume ``feed`` until it ends. A block whose scoring fails is logged and dropped."""
+        async for batch in feed.batches():
+            try:
+                await self.process_async(batch)
+            except Exception:
+                self.stats.errors += 1
+                logger.exception("Stream block of %d ticks failed; skipping it", len(batch))
+            await asyncio.sleep(0)  # let subscriber tasks drain between blocks
+        closed = self.bars.flush()
+        self.stats.bars += len(closed)
+        try:
+            self._publish(await self._events_async(closed) if closed else [])
+        except Exception:
+            self.stats.errors += 1
+            logger.exception("Scoring the final %d bars failed", len(closed))
+        logger.info(
+            "Stream done: %d ticks, %d bars, %d signals, %d failed blocks, %.0f ticks/s",
+            self.stats.ticks,
+            self.stats.bars,
+            self.stats.signals,
+            self.stats.errors,
+            self.stats.ticks_per_sec,
+        )
+        return self.stats
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ..data.store import DuckDBStore
+from ..utils.logging import get_logger
+from .feeds import TickBatch
+
+try:
+    import pyarrow.dataset as ds
+except Exception:  # pragma: no cover - Parquet replay needs pyarrow
+    ds = None
+
+logger = get_logger(__name__)
+
+# Deterministic replay of stored bars/ticks. Each symbol is a chunked,
+# ts-ordered cursor and events are merged on (ts, symbol rank), so the
+# order is identical on every run while memory stays at about one chunk
+# per symbol.
+
+
+@dataclass
+class EventChunk:
+    ts: np.ndarray  # epoch seconds, non-decreasing
+    price: np.ndarray
+    size: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+
+def _epoch_seconds(ts: pd.Series) -> np.ndarray:
+    if pd.api.types.is_numeric_dtype(ts):
+        return np.asarray(ts.to_numpy(dtype=float))
+    return np.asarray(pd.to_datetime(ts, utc=True).to_numpy(dtype="datetime64[ns]").astype(np.int64) / 1e9)
+
+
+def frame_to_events(df: pd.DataFrame, bar_seconds: float = 60.0, ohlc: bool = True) -> EventChunk:
+    """Ticks (``price`` column) pass through; bars become events.
+
+    With ``ohlc`` each bar becomes four ticks spread over the bar, open ->
+    low -> high -> close for up bars and open -> high -> low -> close for
+    down bars, with the volume on the close; otherwise one close tick.
+    """
+    ts = _epoch_seconds(df["ts"])
+    if "price" in df.columns:
+        size = df["size"].to_numpy(dtype=float) if "size" in df.columns else np.zeros(len(df))
+        return EventChunk(ts, df["price"].to_numpy(dtype=float), size)
+    close = df["close"].to_numpy(dtype=float)
+    volume = df["volume"].to_numpy(dtype=float) if "volume" in df.columns else np.zeros(len(df))
+    if not ohlc:
+        return EventChunk(ts, close, volume)
+    o, h, lo = (df[c].to_numpy(dtype=float) for c in ("open", "high", "low"))
+    up = close >= o
+    prices = np.column_stack([o, np.where(up, lo, h), np.where(up, h, lo), close])
+    offsets = np.array([0.0, 0.25, 0.5, 0.75]) * bar_seconds
+    sizes = np.zeros_like(prices)
+    sizes[:, 3] = volume
+    return EventChunk((ts[:, None] + offsets).ravel(), prices.ravel(), sizes.ravel())
+
+
+def store_source(
+    store: DuckDBStore,
+    symbols: Sequence[str],
+    start: datetime | None = None,
+    end: datetime | None = None,
+    chunk: int = 50_000,
+    bar_seconds: float = 60.0,
+    ohlc: bool = True,
+) -> dict[str, Iterator[EventChunk]]:
+    return {
+        sym.upper(): (frame_to_events(df, bar_seconds, ohlc) for df in store.iter_bars(sym, start, end, chunk))
+        for sym in symbols
+    }
+
+
+def parquet_source(
+    path: str | Path,
+    symbols: Sequence[str] | None = None,
+    chunk: int = 50_000,
+    bar_seconds: float = 60.0,
+    ohlc: bool = True,
+) -> dict[str, Iterator[EventChunk]]:
+    """Per-symbol cursors over a Parquet file/dataset with a ``symbol`` column.
+
+    Rows must be in ts order within each symbol (as ``DuckDBStore`` exports them).
+    """
+    if ds is None:
+        raise RuntimeError("pyarrow is required for Parquet replay")
+    dataset = ds.dataset(str(path))
+    if symbols is None:
+        symbols = sorted(set(dataset.to_table(columns=["symbol"]).column("symbol").to_pylist()))
+
+    def chunks(sym: str) -> Iterator[EventChunk]:
+        for batch in dataset.to_batches(filter=ds.field("symbol") == sym, batch_size=chunk):
+            if batch.num_rows:
+                yield frame_to_events(batch.to_pandas(), bar_seconds, ohlc)
+
+    return {sym: chunks(sym) for sym in symbols}
+
+
+class _Cursor:
+    """Unconsumed events of one symbol: the rest of its current chunk, extended on demand."""
+
+    def __init__(self, rank: int, chunks: Iterator[EventChunk]) -> None:
+        self.rank = rank
+        self._chunks = chunks
+        self.ts = self.price = self.size = np.empty(0)
+        self.done = False
+        self.extend()
+
+    def extend(self) -> None:
+        for chunk in self._chunks:
+            if len(chunk):
+                self.ts = np.concatenate([self.ts, chunk.ts])
+                self.price = np.concatenate([self.price, chunk.price])
+                self.size = np.concatenate([self.size, chunk.size])
+                return
+        self.done = True
+
+    @property
+    def key(self) -> float:
+        """Up to (not including) this ts every event of the symbol is loaded."""
+        return float("inf") if self.done else float(self.ts[-1])
+
+    def take_before(self, watermark: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        end = int(np.searchsorted(self.ts, watermark, side="left"))
+        out = self.ts[:end], self.price[:end], self.size[:end]
+        self.ts, self.price, self.size = self.ts[end:], self.price[end:], self.size[end:]
+        return out
+
+
+def _split(ts: np.ndarray, batch_size: int, max_span: float) -> Iterator[slice]:
+    i = 0
+    while i < len(ts):
+        end = min(i + batch_size, len(ts))
+        if max_span != float("inf"):
+            end = min(end, int(np.searchsorted(ts, ts[i] + max_span, side="right")))
+        yield slice(i, end)
+        i = end
+
+
+def merge_events(
+    sources: Mapping[str, Iterable[EventChunk]],
+    batch_size: int = 5000,
+    max_span: float = float("inf"),
+) -> Iterator[TickBatch]:
+    """Yield all events in (ts, symbol) order as ``TickBatch`` blocks.
+
+    A heap on each cursor's last loaded ts gives the watermark before which
+    every symbol's events are known; those are merged with one stable sort,
+    the cursors at the watermark load their next chunk, and the loop
+    repeats. A block holds at most ``batch_size`` events spanning at most ``max_span``
+    seconds of market time.
+    """
+    names = sorted(sources)
+    cursors = [_Cursor(rank, iter(sources[sym])) for rank, sym in enumerate(names)]
+    heap = [(c.key, c.rank) for c in cursors if len(c.ts)]
+    heapq.heapify(heap)
+    symbols = np.array(names, dtype=object)
+    while heap:
+        # Events before the smallest chunk-end ts are complete for every symbol.
+        watermark = heap[0][0]
+        parts = [(c.rank, *c.take_before(watermark)) for c in cursors if len(c.ts)]
+        ranks = np.concatenate([np.full(len(p[1]), p[0]) for p in parts])
+        ts = np.concatenate([p[1] for p in parts])
+        order = np.lexsort((ranks, ts))
+        ts, ranks = ts[order], ranks[order]
+        price = np.concatenate([p[2] for p in parts])[order]
+        size = np.concatenate([p[3] for p in parts])[order]
+        while heap and heap[0][0] <= watermark:
+            _, rank = heapq.heappop(heap)
+            cur = cursors[rank]
+            if not cur.done:
+                cur.extend()
+            if len(cur.ts):
+                heapq.heappush(heap, (cur.key, rank))
+        for sl in _split(ts, batch_size, max_span):
+            yield TickBatch(symbols[ranks[sl]].tolist(), ts[sl].tolist(), price[sl].tolist(), size[sl].tolist())
+
+
+@dataclass
+class ReplayStats:
+    events: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    max_lag: float = 0.0  # how far (wall seconds) paced replay fell behind schedule
+
+    @property
+    def events_per_sec(self) -> float:
+        return self.events / self.seconds if self.seconds else 0.0
+
+
+class ReplayFeed:
+    """``TickFeed`` over stored history at wall-clock (``speed=1``), N x, or full speed (``None``).
+
+    Usable anywhere a live feed is, e.g. ``StreamPipeline.run(ReplayFeed(...))``,
+    which makes it the load generator for the streaming and signal path.
+    """
+
+    def __init__(
+        self,
+        sources: Mapping[str, Iterable[EventChunk]],
+        speed: float | None = None,
+        batch_size: int = 5000,
+        resolution: float = 0.01,
+    ) -> None:
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive or None")
+        self.sources = sources
+        self.speed = speed
+        self.batch_size = batch_size
+        # Paced blocks cover at most ``resolution`` wall seconds of market time.
+        self.resolution = resolution
+        self.stats = ReplayStats()
+
+    def events(self) -> Iterator[TickBatch]:
+        span = float("inf") if self.speed is None else self.resolution * self.speed
+        return merge_events(self.sources, self.batch_size, span)
+
+    async def batches(self) -> AsyncIterator[TickBatch]:
+        t0 = time.perf_counter()
+        sim0: float | None = None
+        for batch in self.events():
+            if self.speed is not None:
+                sim0 = batch.ts[0] if sim0 is None else sim0
+                delay = t0 + (batch.ts[0] - sim0) / self.speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.stats.max_lag = max(self.stats.max_lag, -delay)
+            self.stats.events += len(batch)
+            self.stats.batches += 1
+            yield batch
+        self.stats.seconds = time.perf_counter() - t0
+        logger.info(
+            "Replayed %d events in %d batches, %.2fs (%.0f events/s), max lag %.3fs",
+            self.stats.events,
+            self.stats.batches,
+            self.stats.seconds,
+            self.stats.events_per_sec,
+            self.stats.max_lag,
+        )
@@ -1,8 +1,17 @@
 from __future__ import annotations
 
+import numpy as np
+
 
 def kelly_fraction(win_prob: float, win_loss_ratio: float) -> float:
     p = max(0.0, min(1.0, win_prob))
     b = max(1e-9, win_loss_ratio)
     f = (p * (b + 1) - 1) / b
-    return max(0.0, f)
\ No newline at end of file
+    return max(0.0, f)
+
+
+def kelly_fraction_array(win_prob: np.ndarray, win_loss_ratio: np.ndarray) -> np.ndarray:
+    p = np.clip(win_prob, 0.0, 1.0)
+    b = np.maximum(1e-9, win_loss_ratio)
+    f = (p * (b + 1) - 1) / b
+    return np.asarray(np.maximum(0.0, f))
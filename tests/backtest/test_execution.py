@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from market_sage_pro.backtest.engine import backtest, backtest_detailed
+from market_sage_pro.backtest.execution import (
+    EXIT_CLOSE,
+    EXIT_STOP,
+    EXIT_TARGET,
+    ExecutionConfig,
+    simulate_fills,
+)
+from market_sage_pro.signals.generator import SignalConfig
+
+
+def _bars(rows: list[tuple[float, float, float, float]]) -> pd.DataFrame:
+    """(open, high, low, close) rows, each entered from a previous close of 100."""
+    df = pd.DataFrame(rows, columns=['open', 'high', 'low', 'close'])
+    df['actual_move'] = (df['close'] / 100 - 1) * 100
+    df['ts'] = pd.date_range('2024-01-02 10:00', periods=len(df), freq='h')
+    return df
+
+
+def test_long_and_short_exits() -> None:
+    bars = _bars([
+        (100, 101, 98, 100.5),   # long: stop at -1%
+        (100, 102.5, 99.5, 101), # long: target at +2%
+        (100, 100.8, 99.6, 100.3),  # long: held to close
+        (97, 100, 96, 99),       # long: gapped through the stop, filled at the open
+        (100, 100.2, 97.5, 98),  # short: target at +2% when price falls 2%
+    ])
+    side = np.array([1, 1, 1, 1, -1])
+    fills = simulate_fills(bars, side, np.full(5, -1.0), np.full(5, 2.0), ExecutionConfig())
+
+    assert fills.exit_reason.tolist() == [EXIT_STOP, EXIT_TARGET, EXIT_CLOSE, EXIT_STOP, EXIT_TARGET]
+    np.testing.assert_allclose(fills.returns, [-0.01, 0.02, 0.003, -0.03, 0.02])
+
+
+def test_costs_and_no_levels() -> None:
+    bars = _bars([(100, 101, 98, 100.5), (100, 103, 99.5, 101)])
+    fills = simulate_fills(bars, np.array([1, 1]), np.array([-1.0, 0.0]), np.array([2.0, 2.0]),
+                           ExecutionConfig(slippage_bps=5, commission_bps=1))
+    # stop: 2 market fills + 2 commissions; target: entry slippage only + 2 commissions
+    np.testing.assert_allclose(fills.returns, [-0.01 - 12e-4, 0.02 - 7e-4])
+
+    fills = simulate_fills(bars, np.array([1, 1]), np.zeros(2), np.zeros(2), ExecutionConfig())
+    assert fills.exit_reason.tolist() == [EXIT_CLOSE, EXIT_CLOSE]
+
+
+def test_fine_bars_decide_when_both_levels_hit() -> None:
+    bars = _bars([(100, 103, 98, 100), (100, 103, 98, 100)])
+    fine = pd.DataFrame({
+        'ts': pd.date_range('2024-01-02 10:00', periods=120, freq='min'),
+        'high': 100.5, 'low': 99.5,
+    })
+    fine.loc[10, 'high'] = 102.5   # first hour: target first
+    fine.loc[20, 'low'] = 98.5
+    fine.loc[70, 'low'] = 98.5     # second hour: stop first
+    fine.loc[80, 'high'] = 102.5
+    args = (np.array([1, 1]), np.full(2, -1.0), np.full(2, 2.0), ExecutionConfig())
+
+    assert simulate_fills(bars, *args).exit_reason.tolist() == [EXIT_STOP, EXIT_STOP]
+    assert simulate_fills(bars, *args, fine=fine).exit_reason.tolist() == [EXIT_TARGET, EXIT_STOP]
+
+
+def test_backtest_with_execution_ledger() -> None:
+    rng = np.random.default_rng(3)
+    n = 400
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    prev = np.r_[100.0, close[:-1]]
+    df = pd.DataFrame({
+        'ts': pd.date_range('2024-01-01', periods=n, freq='h'),
+        'open': prev, 'close': close,
+        'high': np.maximum(prev, close) * (1 + rng.uniform(0, 0.01, n)),
+        'low': np.minimum(prev, close) * (1 - rng.uniform(0, 0.01, n)),
+        'actual_move': (close / prev - 1) * 100,
+        'pred_move': rng.normal(0, 0.8, n),
+        'p_up': rng.uniform(0.1, 0.9, n),
+        'rsi': 50.0, 'ivr': 0.5, 'p_big': 0.5,
+    })
+    df['p_down'] = 1 - df['p_up']
+    df['px_vs_ema21'] = np.sign(df['pred_move'])
+    cfg = SignalConfig(kelly_fraction_cap=0.5)
+    exe = ExecutionConfig(slippage_bps=2)
+
+    res = backtest_detailed(df, cfg, 'AAA', execution=exe)
+    assert res.metrics == backtest(df, cfg, execution=exe)
+    assert {'stop', 'target', 'close'} <= set(res.trades['exit_reason'])
+    assert set(res.trades['side']) == {1.0, -1.0}
+    assert np.prod(1 + res.trades['pnl_pct'] / 100) == pytest.approx(res.metrics['equity'])
+
+
+def test_short_pnl_sign_matches_across_modes() -> None:
+    # One short signal on a bar that drifts down without reaching its stop or target.
+    df = _bars([(100, 100.05, 99.65, 99.7)])
+    df = df.assign(p_up=0.2, p_down=0.8, pred_move=-0.5, rsi=50, px_vs_ema21=-0.1, ivr=0.5, p_big=0.7)
+    cfg = SignalConfig(kelly_fraction_cap=0.5)
+    close = backtest_detailed(df, cfg)
+    intrabar = backtest_detailed(df, cfg, execution=ExecutionConfig())
+    assert close.trades['side'].tolist() == intrabar.trades['side'].tolist() == [-1.0]
+    assert close.trades['pnl_pct'].iloc[0] > 0
+    assert close.trades['pnl_pct'].iloc[0] == pytest.approx(intrabar.trades['pnl_pct'].iloc[0])
+
+
+def test_cli_rejects_intrabar_with_portfolio(monkeypatch) -> None:
+    from market_sage_pro.backtest import engine
+
+    argv = ['engine', '--from', '2024-01-01', '--to', '2024-02-01', '--symbols', 'AAPL', '--portfolio', '--intrabar']
+    monkeypatch.setattr('sys.argv', argv)
+    with pytest.raises(SystemExit):
+        engine.main()
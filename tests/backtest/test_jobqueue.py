@@ -0,0 +1,211 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from market_sage_pro.api import main
+from market_sage_pro.backtest.jobqueue import BacktestSpec, LocalJobQueue, RedisJobQueue, TTLCache
+from market_sage_pro.signals.generator import SignalConfig
+
+START, END = datetime(2024, 1, 1), datetime(2024, 6, 1)
+
+
+def _wait(queue: LocalJobQueue, job_id: str) -> str:
+    for _ in range(200):
+        job = queue.get(job_id)
+        assert job is not None
+        if job.status in ('done', 'failed'):
+            return job.status
+        time.sleep(0.01)
+    raise AssertionError('job did not finish')
+
+
+def test_spec_key_normalises_symbols_and_tracks_config() -> None:
+    a = BacktestSpec.create(['msft', ' AAPL'], START, END)
+    b = BacktestSpec.create(['AAPL', 'MSFT'], START, END, SignalConfig(kelly_fraction_cap=0.5))
+    c = BacktestSpec.create(['AAPL', 'MSFT'], START, END, SignalConfig(kelly_fraction_cap=0.25))
+    assert a.key() == b.key() != c.key()
+    assert BacktestSpec.from_dict(orjson.loads(orjson.dumps(a.to_dict()))) == a
+
+
+def test_ttl_cache_evicts_lru_and_expired() -> None:
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)  # 'b' is least recently used
+    assert cache.get('b') is None and cache.get('a') == 1 and cache.get('c') == 3
+
+    expiring = TTLCache(ttl=0.0)
+    expiring.set('a', 1)
+    assert expiring.get('a') is None and len(expiring) == 0
+
+
+def test_local_queue_dedupes_and_caches() -> None:
+    release = threading.Event()
+    calls: list[tuple[str, ...]] = []
+
+    def runner(spec: BacktestSpec) -> dict[str, dict[str, float]]:
+        calls.append(spec.symbols)
+        release.wait(5)
+        return {s: {'trades': 1.0} for s in spec.symbols}
+
+    queue = LocalJobQueue(executor=ThreadPoolExecutor(2), runner=runner)
+    spec = BacktestSpec.create(['AAPL'], START, END)
+    first = queue.submit(spec)
+    assert queue.submit(spec).id == first.id  # joins the in-flight job
+    release.set()
+    assert _wait(queue, first.id) == 'done'
+
+    again = queue.submit(BacktestSpec.create(['aapl'], START, END))
+    assert again.cached and again.status == 'done' and again.id != first.id
+    assert again.result == {'AAPL': {'trades': 1.0}}
+    assert calls == [('AAPL',)]
+
+
+def test_local_queue_records_failures() -> None:
+    def runner(spec: BacktestSpec) -> dict[str, dict[str, float]]:
+        raise RuntimeError('no data')
+
+    queue = LocalJobQueue(executor=ThreadPoolExecutor(1), runner=runner)
+    job = queue.submit(BacktestSpec.create(['AAPL'], START, END))
+    assert _wait(queue, job.id) == 'failed'
+    assert 'no data' in (queue.get(job.id).error or '')
+    assert len(queue.cache) == 0
+
+
+def test_local_queue_loads_bars_in_parent() -> None:
+    loaded: list[tuple[str, ...]] = []
+
+    def loader(spec: BacktestSpec) -> dict[str, list[float]]:
+        loaded.append(spec.symbols)
+        return {s: [1.0] for s in spec.symbols}
+
+    queue = LocalJobQueue(executor=ThreadPoolExecutor(1), runner=lambda spec, bars: {'n': len(bars)}, loader=loader)
+    job = queue.submit(BacktestSpec.create(['AAPL', 'MSFT'], START, END))
+    assert _wait(queue, job.id) == 'done'
+    assert job.result == {'n': 2} and loaded == [('AAPL', 'MSFT')]
+
+
+def test_local_queue_submit_does_not_wait_for_bar_load() -> None:
+    release = threading.Event()
+
+    def loader(spec: BacktestSpec) -> dict[str, list[float]]:
+        release.wait(5)
+        return {s: [1.0] for s in spec.symbols}
+
+    queue = LocalJobQueue(executor=ThreadPoolExecutor(1), runner=lambda spec, bars: {'n': len(bars)}, loader=loader)
+    job = queue.submit(BacktestSpec.create(['AAPL'], START, END))
+    assert job.status == 'queued'
+    release.set()
+    assert _wait(queue, job.id) == 'done'
+
+
+def test_local_queue_never_forgets_in_flight_jobs() -> None:
+    release = threading.Event()
+
+    def runner(spec: BacktestSpec) -> dict[str, dict[str, float]]:
+        release.wait(5)
+        return {}
+
+    queue = LocalJobQueue(executor=ThreadPoolExecutor(4), runner=runner, max_jobs=1)
+    jobs = [queue.submit(BacktestSpec.create([s], START, END)) for s in ('AAA', 'BBB', 'CCC')]
+    assert all(queue.get(j.id) is not None for j in jobs)
+    release.set()
+    assert all(_wait(queue, j.id) == 'done' for j in jobs)
+
+    latest = queue.submit(BacktestSpec.create(['DDD'], START, END))
+    assert queue.get(latest.id) is not None
+    assert [queue.get(j.id) for j in jobs] == [None, None, None]
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.data: dict[str, object] = {}
+        self.queue: list[bytes] = []
+
+    def pipeline(self) -> 'FakeRedis':
+        return self
+
+    def execute(self) -> None:
+        pass
+
+    def expire(self, key: str, ttl: int) -> None:
+        pass
+
+    def exists(self, key: str) -> bool:
+        return key in self.data
+
+    def set(self, key: str, value: object, nx: bool = False, ex: int | None = None) -> bool:
+        if nx and key in self.data:
+            return False
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    def get(self, key: str) -> object:
+        return self.data.get(key)
+
+    def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+
+    def hset(self, key: str, field: str | None = None, value: object = None, mapping: dict | None = None) -> None:
+        h = self.data.setdefault(key, {})
+        for k, v in (mapping or {field: value}).items():
+            h[k.encode()] = v if isinstance(v, bytes) else str(v).encode()
+
+    def hget(self, key: str, field: str) -> object:
+        return self.data.get(key, {}).get(field.encode())
+
+    def hgetall(self, key: str) -> dict:
+        return dict(self.data.get(key, {}))
+
+    def lpush(self, key: str, value: str) -> None:
+        self.queue.insert(0, value.encode())
+
+
+def test_redis_queue_dedupes_in_flight_specs() -> None:
+    client = FakeRedis()
+    queue = RedisJobQueue(client)
+    spec = BacktestSpec.create(['AAPL'], START, END)
+    first = queue.submit(spec)
+    assert queue.submit(BacktestSpec.create(['aapl'], START, END)).id == first.id
+    assert len(client.queue) == 1
+
+    def brpop(name: str, timeout: int) -> tuple[str, bytes]:
+        if not client.queue:
+            raise InterruptedError  # stop the worker loop
+        return name, client.queue.pop()
+
+    client.brpop = brpop
+    with pytest.raises(InterruptedError):
+        queue.work(lambda s: {'AAPL': {'trades': 1.0}})
+    assert queue.get(first.id).status == 'done'
+    assert queue.submit(spec).cached  # claim released, result cached
+    client.delete(queue._result_key(spec.key()))
+    assert queue.submit(spec).id != first.id
+
+
+def test_backtest_endpoints(monkeypatch) -> None:
+    queue = LocalJobQueue(
+        executor=ThreadPoolExecutor(1),
+        runner=lambda spec: {s: {'total_return': spec.cfg.kelly_fraction_cap} for s in spec.symbols},
+    )
+    monkeypatch.setattr(main, 'backtest_jobs', queue)
+    client = TestClient(main.app)
+
+    r = client.post('/backtest', json={'from_date': '2024-01-01', 'to_date': '2024-06-01', 'symbols': ['AAPL'],
+                                       'config': {'kelly_fraction_cap': 0.25}})
+    job = r.json()
+    assert set(job) == {'job_id', 'status', 'cached'}
+    assert _wait(queue, job['job_id']) == 'done'
+    assert client.get(f"/backtest/{job['job_id']}").json()['status'] == 'done'
+    assert client.get(f"/backtest/{job['job_id']}/result").json() == {'AAPL': {'total_return': 0.25}}
+
+    assert client.get('/backtest/missing').status_code == 404
+    assert client.post('/backtest', json={'from_date': 'x', 'to_date': 'today', 'symbols': []}).json() == {
+        'error': 'invalid request'
+    }
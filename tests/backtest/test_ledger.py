@@ -0,0 +1,104 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from market_sage_pro.api import main
+from market_sage_pro.backtest.engine import _metrics, backtest, backtest_detailed
+from market_sage_pro.backtest.jobqueue import BacktestSpec, LocalJobQueue
+from market_sage_pro.backtest.ledger import LedgerStore
+from market_sage_pro.signals.generator import SignalConfig
+
+CFG = SignalConfig(kelly_fraction_cap=0.5)
+
+
+def _frame(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'ts': pd.date_range('2024-01-01', periods=n, freq='h'),
+        'p_up': rng.uniform(0.2, 0.9, n),
+        'p_down': rng.uniform(0.2, 0.9, n),
+        'pred_move': rng.normal(0, 0.5, n),
+        'rsi': rng.uniform(20, 80, n),
+        'px_vs_ema21': rng.normal(0, 0.01, n),
+        'ivr': rng.uniform(0, 1, n),
+        'p_big': rng.uniform(0, 1, n),
+        'actual_move': rng.normal(0, 1, n),
+    })
+
+
+def test_max_drawdown_is_running_not_final() -> None:
+    arr = np.array([0.1, -0.5, 1.5, 0.0])  # 1.1 -> 0.55 -> 1.375: recovered by the end
+    traded = np.ones(4, dtype=bool)
+    assert _metrics(arr, traded, arr > 0)['max_drawdown'] == pytest.approx(0.5)
+
+
+def test_detailed_backtest_ledger_matches_metrics() -> None:
+    df = _frame(500, 1)
+    res = backtest_detailed(df, CFG, 'AAA')
+
+    assert res.metrics == backtest(df, CFG)
+    assert len(res.trades) == res.metrics['trades'] and len(res.equity) == len(df)
+    assert np.prod(1 + res.trades['pnl_pct'] / 100) == pytest.approx(res.metrics['equity'])
+    assert res.equity['drawdown'].max() == pytest.approx(res.metrics['max_drawdown'])
+    prev = dict(zip(df['ts'].iloc[1:], df['ts'].iloc[:-1], strict=True))
+    later = res.trades[res.trades['exit_ts'] > df['ts'].iloc[0]]
+    assert (later['entry_ts'] == later['exit_ts'].map(prev)).all()
+    assert set(res.trades['exit_reason']) == {'close'}
+
+
+def test_ledger_store_pages_trades(tmp_path) -> None:
+    store = LedgerStore(tmp_path, row_group_size=64)
+    results = {sym: backtest_detailed(_frame(400, i), CFG, sym) for i, sym in enumerate(['BBB', 'AAA'])}
+    total = store.save('run1', results)
+    assert total == sum(len(r.trades) for r in results.values())
+
+    pages, after = [], -1
+    while True:
+        page = store.read_trades('run1', after=after, limit=100)
+        if page.empty:
+            break
+        pages.append(page)
+        after = int(page['trade_id'].iloc[-1])
+    trades = pd.concat(pages, ignore_index=True)
+    assert trades['trade_id'].tolist() == list(range(total))
+    assert trades['symbol'].is_monotonic_increasing
+    assert store.read_trades('run1', symbol='bbb', limit=10_000)['symbol'].eq('BBB').sum() == len(results['BBB'].trades)
+    assert len(store.read_equity('run1', 'AAA')) == 400
+
+    with pytest.raises(ValueError):
+        store.read_trades('../etc')
+    with pytest.raises(FileNotFoundError):
+        store.read_trades('missing')
+
+
+def test_trades_endpoint(tmp_path, monkeypatch) -> None:
+    store = LedgerStore(tmp_path)
+
+    def runner(spec: BacktestSpec) -> dict:
+        res = {s: backtest_detailed(_frame(300, i), CFG, s) for i, s in enumerate(spec.symbols)}
+        store.save(spec.key(), res)
+        return {s: r.metrics for s, r in res.items()}
+
+    queue = LocalJobQueue(executor=ThreadPoolExecutor(1), runner=runner)
+    monkeypatch.setattr(main, 'backtest_jobs', queue)
+    monkeypatch.setattr(main, 'ledgers', store)
+    client = TestClient(main.app)
+    job = queue.submit(BacktestSpec.create(['AAA'], datetime(2024, 1, 1), datetime(2024, 2, 1)))
+    for _ in range(200):
+        if queue.get(job.id).status == 'done':
+            break
+        time.sleep(0.01)
+
+    r = client.get(f'/backtest/{job.id}/trades', params={'limit': 5})
+    body = r.json()
+    assert r.status_code == 200 and body['next_after'] == 4
+    assert body['trades']['trade_id'] == [0, 1, 2, 3, 4]
+    assert body['trades']['exit_ts'][0].startswith('2024-01-01T')
+    rest = client.get(f'/backtest/{job.id}/trades', params={'after': 4, 'limit': 10_000}).json()
+    assert rest['next_after'] is None
+    assert len(rest['trades']['trade_id']) + 5 == queue.get(job.id).result['AAA']['trades']
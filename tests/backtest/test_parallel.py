@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from market_sage_pro.backtest.engine import _prepare_df, backtest
+from market_sage_pro.backtest.parallel import backtest_many
+from market_sage_pro.signals.generator import SignalConfig
+
+
+def _bars(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        'ts': pd.date_range('2022-01-03', periods=n, freq='B'),
+        'open': close,
+        'high': close * 1.01,
+        'low': close * 0.99,
+        'close': close,
+        'volume': rng.uniform(1e5, 1e6, n),
+    })
+
+
+def test_parallel_matches_sequential() -> None:
+    bars = {f'SYM{i}': _bars(300 + 10 * i, seed=i) for i in range(5)}
+    bars['EMPTY'] = pd.DataFrame(columns=['ts', 'open', 'high', 'low', 'close', 'volume'])
+    cfg = SignalConfig(kelly_fraction_cap=0.5)
+
+    out = backtest_many(bars, cfg, workers=2)
+
+    expected = {sym: backtest(_prepare_df(df), cfg) for sym, df in bars.items() if not df.empty}
+    assert out.results == expected
+    assert sorted(s for t in out.worker_timings for s in t.symbols) == sorted(expected)
+    assert sum(t.bars for t in out.worker_timings) == sum(len(bars[s]) for s in expected)
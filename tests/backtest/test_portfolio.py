@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from market_sage_pro.backtest.portfolio import PortfolioConfig, backtest_portfolio
+from market_sage_pro.risk.manager import RiskConfig
+from market_sage_pro.signals.generator import SignalConfig
+
+CFG = SignalConfig(kelly_fraction_cap=0.5)
+
+
+def _frame(ts: pd.DatetimeIndex, moves: list[float], up: bool = True) -> pd.DataFrame:
+    n = len(ts)
+    return pd.DataFrame({
+        'ts': ts,
+        'p_up': [0.8 if up else 0.2] * n,
+        'p_down': [0.2 if up else 0.8] * n,
+        'pred_move': [0.5 if up else -0.5] * n,
+        'rsi': [50.0] * n,
+        'px_vs_ema21': [0.1 if up else -0.1] * n,
+        'ivr': [0.5] * n,
+        'p_big': [0.5] * n,
+        'actual_move': moves,
+    })
+
+
+def test_shared_pool_applies_caps_and_direction() -> None:
+    days = pd.date_range('2024-01-01', periods=3, freq='D')
+    frames = {
+        'LONG': _frame(days, [1.0, 2.0, -1.0]),
+        'SHORT': _frame(days[1:], [-2.0, 1.0], up=False),
+    }
+    pf = PortfolioConfig(risk=RiskConfig(max_daily_loss_pct=-50, per_symbol_cap_pct=30), max_gross_exposure=0.5)
+    res = backtest_portfolio(frames, CFG, pf)
+
+    w = res.exposure
+    assert w.loc[days[0], 'SHORT'] == 0.0  # no bar yet
+    assert w.loc[days[0], 'LONG'] == pytest.approx(0.3)
+    assert w.loc[days[1]].tolist() == pytest.approx([0.25, -0.25])  # gross 0.6 scaled to 0.5
+    assert res.gross.max() == pytest.approx(0.5)
+    expected = 100_000 * (1 + 0.003) * (1 + 0.25 * 0.02 + 0.25 * 0.02) * (1 - 0.25 * 0.01 - 0.25 * 0.01)
+    assert res.equity.iloc[-1] == pytest.approx(expected)
+    assert res.metrics['trades'] == 3 and res.metrics['blocked_bars'] == 0
+
+
+def test_daily_loss_breaker_blocks_rest_of_day() -> None:
+    bars = pd.date_range('2024-01-01 10:00', periods=3, freq='h').append(
+        pd.date_range('2024-01-02 10:00', periods=2, freq='h'))
+    frames = {'AAA': _frame(bars, [-10.0, 5.0, 5.0, 5.0, 5.0])}
+    pf = PortfolioConfig(risk=RiskConfig(max_daily_loss_pct=-2, per_symbol_cap_pct=50))
+    res = backtest_portfolio(frames, CFG, pf)
+
+    assert res.blocked.tolist() == [False, True, True, False, False]
+    assert res.exposure['AAA'].iloc[1:3].eq(0).all()
+    w = 0.48  # Kelly size for p=0.8, 1:1 payoff, under the 50% cap
+    e = 100_000 * (1 - 0.1 * w)
+    assert res.equity.iloc[2] == pytest.approx(e)
+    assert res.equity.iloc[-1] == pytest.approx(e * (1 + 0.05 * w) ** 2)
+
+
+def test_pdt_equity_floor_blocks_everything() -> None:
+    days = pd.date_range('2024-01-01', periods=4, freq='D')
+    res = backtest_portfolio({'AAA': _frame(days, [1.0] * 4)}, CFG, PortfolioConfig(initial_equity=20_000))
+    assert res.blocked.all() and res.metrics['trades'] == 0
+    assert np.allclose(res.equity, 20_000)
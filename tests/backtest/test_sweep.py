@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from market_sage_pro.backtest.engine import _prepare_df, backtest
+from market_sage_pro.backtest.sweep import optuna_search, param_grid, prepare_inputs, sweep
+from market_sage_pro.signals.generator import SignalConfig
+
+
+@pytest.fixture(scope='module')
+def bars() -> dict[str, pd.DataFrame]:
+    out = {}
+    for i in range(3):
+        rng = np.random.default_rng(i)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 400)))
+        out[f'S{i}'] = pd.DataFrame({'ts': pd.date_range('2021-01-01', periods=400, freq='B'), 'close': close})
+    return out
+
+
+def test_sweep_matches_backtest_and_ranks(bars) -> None:
+    prepared = prepare_inputs(bars)
+    space = {'kelly_fraction_cap': [0.1, 0.5], 'min_move_pct': [0.1, 0.25, 0.5]}
+    table = sweep(prepared, space)
+
+    assert len(table) == 6
+    assert table['Sharpe'].is_monotonic_decreasing
+    best = table.iloc[0]
+    cfg = SignalConfig(kelly_fraction_cap=best['kelly_fraction_cap'], min_move_pct=best['min_move_pct'])
+    per_symbol = [backtest(_prepare_df(df), cfg) for df in bars.values()]
+    assert best['Sharpe'] == pytest.approx(np.mean([m['Sharpe'] for m in per_symbol]))
+    assert best['trades'] == sum(m['trades'] for m in per_symbol)
+
+
+def test_sweep_parallel_matches_sequential(bars) -> None:
+    prepared = prepare_inputs(bars)
+    grid = param_grid({'min_prob': [0.6, 0.7, 0.8], 'rsi_overbought': [60.0, 70.0]})
+    seq = sweep(prepared, grid, workers=1)
+    par = sweep(prepared, grid, workers=2)
+    pd.testing.assert_frame_equal(seq, par)
+
+
+def test_sweep_rejects_unknown_params(bars) -> None:
+    with pytest.raises(ValueError):
+        sweep(prepare_inputs(bars), {'not_a_field': [1.0]})
+
+
+def test_optuna_search(bars) -> None:
+    pytest.importorskip('optuna')
+    table = optuna_search(prepare_inputs(bars), {'min_prob': (0.5, 0.9)}, n_trials=10, seed=0)
+    assert len(table) == 10
+    assert table['Sharpe'].is_monotonic_decreasing
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from market_sage_pro.backtest.walkforward import (
+    WalkForwardConfig,
+    build_dataset,
+    make_folds,
+    walk_forward,
+)
+from market_sage_pro.models.lightgbm_hourly import HourlyModelConfig
+from market_sage_pro.signals.generator import SignalConfig
+
+
+@pytest.fixture(scope='module')
+def bars() -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 900)))
+    return pd.DataFrame({
+        'ts': pd.date_range('2023-01-02', periods=900, freq='h'),
+        'close': close,
+        'high': close * 1.002,
+        'low': close * 0.998,
+        'volume': rng.uniform(1e3, 1e4, 900),
+    })
+
+
+def test_make_folds_rolling_and_expanding() -> None:
+    wf = WalkForwardConfig(train_bars=100, test_bars=40)
+    folds = make_folds(220, wf)
+    assert [(f.train_start, f.train_end, f.test_end) for f in folds] == [(0, 100, 140), (40, 140, 180), (80, 180, 220)]
+    wf.expanding = True
+    assert all(f.train_start == 0 for f in make_folds(220, wf))
+
+
+def test_dataset_lags_features_one_bar(bars: pd.DataFrame) -> None:
+    data = build_dataset(bars)
+    assert np.isfinite(data.X).all()
+    assert len(data.X) == len(data.y) == len(data.move_pct) == len(data.ts)
+    # Target at row t is the move into bar t; the row's timestamp is bar t.
+    i = 10
+    t = bars.index[bars['ts'] == data.ts[i]][0]
+    expected = (bars['close'][t] / bars['close'][t - 1] - 1) * 100
+    assert data.move_pct[i] == pytest.approx(expected)
+
+
+def test_walk_forward_parallel_matches_sequential(bars: pd.DataFrame) -> None:
+    cfg = SignalConfig(kelly_fraction_cap=0.5, min_prob=0.55)
+    wf = WalkForwardConfig(train_bars=300, test_bars=150, model=HourlyModelConfig(n_estimators=20))
+    seq = walk_forward(bars, cfg, wf, workers=1)
+    par = walk_forward(bars, cfg, wf, workers=2)
+
+    assert len(seq.folds) == 4
+    assert len(seq.predictions) == sum(f.fold.test_end - f.fold.test_start for f in seq.folds)
+    np.testing.assert_allclose(par.predictions['p_up'], seq.predictions['p_up'])
+    assert par.metrics['trades'] == seq.metrics['trades']
+
+
+def test_walk_forward_warm_start(bars: pd.DataFrame) -> None:
+    wf = WalkForwardConfig(
+        train_bars=300, test_bars=150, expanding=True, warm_start=True,
+        warm_start_rounds=5, model=HourlyModelConfig(n_estimators=20),
+    )
+    res = walk_forward(bars, SignalConfig(kelly_fraction_cap=0.5), wf)
+    assert len(res.folds) == 4
+    assert res.predictions['p_up'].between(0, 1).all()
+
+
+def test_walk_forward_warm_start_refits_at_tree_cap(bars: pd.DataFrame) -> None:
+    wf = WalkForwardConfig(
+        train_bars=300, test_bars=100, expanding=True, warm_start=True,
+        warm_start_rounds=5, model=HourlyModelConfig(n_estimators=20, max_trees=30),
+    )
+    res = walk_forward(bars, SignalConfig(kelly_fraction_cap=0.5), wf)
+    # 20 -> 25 -> 30, then the next warm start would pass the cap and refits.
+    assert [f.trees for f in res.folds] == [20, 25, 30, 20, 25, 30]
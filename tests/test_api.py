@@ -1,6 +1,11 @@
+import numpy as np
+import orjson
+import pyarrow as pa
 from fastapi.testclient import TestClient
+from pyarrow import ipc
 
 from market_sage_pro.api.main import app
+from market_sage_pro.signals.columnar import ARROW_STREAM
 
 
 def test_health() -> None:
@@ -24,3 +29,45 @@ def test_signal_endpoint() -> None:
     assert r.status_code == 200
     data = r.json()
     assert 'action' in data
+
+
+def _signal_columns(n: int) -> dict[str, list[float]]:
+    rng = np.random.default_rng(0)
+    up = rng.uniform(0, 1, n)
+    return {
+        'ensemble_up_prob': up.tolist(),
+        'ensemble_down_prob': (1 - up).tolist(),
+        'predicted_move_pct': rng.normal(0, 0.5, n).tolist(),
+        'rsi': rng.uniform(20, 80, n).tolist(),
+        'price_vs_ema21': rng.normal(0, 1, n).tolist(),
+        'ivr': rng.uniform(0, 1, n).tolist(),
+        'prob_big_move': rng.uniform(0, 1, n).tolist(),
+    }
+
+
+def test_signals_batch_matches_single_row() -> None:
+    client = TestClient(app)
+    cols = _signal_columns(50)
+    out = client.post('/signals', content=orjson.dumps(cols)).json()
+    assert len(out['action']) == 50
+    for i in (0, 17, 49):
+        single = client.post('/signal', json={k: v[i] for k, v in cols.items()}).json()
+        assert {k: out[k][i] for k in single} == single
+
+
+def test_signals_batch_arrow_roundtrip() -> None:
+    client = TestClient(app)
+    cols = _signal_columns(20)
+    sink = pa.BufferOutputStream()
+    table = pa.table(cols)
+    with ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    r = client.post('/signals', content=sink.getvalue().to_pybytes(),
+                    headers={'content-type': ARROW_STREAM})
+    assert r.headers['content-type'] == ARROW_STREAM
+    arrow = ipc.open_stream(r.content).read_all().to_pydict()
+    as_json = client.post('/signals', content=orjson.dumps(cols)).json()
+    assert arrow == as_json
+
+    r = client.post('/signals', content=orjson.dumps({'rsi': [1.0]}))
+    assert r.status_code == 422 and 'missing columns' in r.json()['detail']
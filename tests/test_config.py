@@ -1,9 +1,10 @@
+import asyncio
 import os
 import tempfile
 
 import pytest
 
-from market_sage_pro.config import AppConfig, ensure_encrypted_secrets, decrypt_secrets
+from market_sage_pro.config import AppConfig, ConfigService, ensure_encrypted_secrets, decrypt_secrets
 
 
 def test_app_config_validation():
@@ -40,4 +41,81 @@ def test_secrets_encrypt_decrypt(tmp_path):
     ensure_encrypted_secrets(cfg, passphrase="pass", secrets_path=str(secrets_path))
     out = decrypt_secrets(passphrase="pass", cfg=cfg, secrets_path=str(secrets_path))
     assert out["alpaca_key"] == "k"
-    assert out["alpaca_secret"] == "s"
\ No newline at end of file
+    assert out["alpaca_secret"] == "s"
+
+def _write_config(path, kelly, mtime_ns):
+    path.write_text(
+        f"alpaca_key: k\nalpaca_secret: s\nmax_daily_loss_pct: -2\nkelly_fraction_cap: {kelly}\n",
+        encoding="utf-8",
+    )
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_config_service_reloads_on_change(tmp_path):
+    path = tmp_path / "config.yaml"
+    _write_config(path, 0.5, 1_000_000_000)
+    service = ConfigService(str(tmp_path / "missing.yaml"), str(path), poll_seconds=0)
+
+    first = service.get()
+    assert first.kelly_fraction_cap == 0.5
+    assert service.get() is first  # cached snapshot
+    assert not service.reload_if_changed()
+
+    _write_config(path, 0.25, 2_000_000_000)
+    assert service.reload_if_changed()
+    assert service.get().kelly_fraction_cap == 0.25
+    assert first.kelly_fraction_cap == 0.5  # old snapshot untouched
+
+    # An invalid edit keeps the last good config.
+    _write_config(path, 5, 3_000_000_000)
+    assert not service.reload_if_changed()
+    assert service.get().kelly_fraction_cap == 0.25
+    assert service.reloads == 2
+
+
+def test_config_service_polls(tmp_path):
+    path = tmp_path / "config.yaml"
+    _write_config(path, 0.5, 1_000_000_000)
+    service = ConfigService(str(path), poll_seconds=0.01)
+
+    async def scenario():
+        await service.start()
+        _write_config(path, 0.3, 2_000_000_000)
+        for _ in range(200):
+            if service.get().kelly_fraction_cap == 0.3:
+                break
+            await asyncio.sleep(0.01)
+        await service.stop()
+
+    asyncio.run(scenario())
+    assert service.get().kelly_fraction_cap == 0.3
+
+
+@pytest.mark.parametrize("text", ["kelly_fraction_cap: [0.5\n", "- a\n- b\n"])
+def test_config_service_keeps_config_on_unparseable_edit(tmp_path, text):
+    path = tmp_path / "config.yaml"
+    _write_config(path, 0.5, 1_000_000_000)
+    service = ConfigService(str(path), poll_seconds=0)
+    assert service.get().kelly_fraction_cap == 0.5
+
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    assert not service.reload_if_changed()
+    assert service._stamp[1] == 2_000_000_000  # not retried on every poll
+    assert service.get().kelly_fraction_cap == 0.5
+
+
+def test_config_service_keeps_config_when_file_is_deleted(tmp_path):
+    path = tmp_path / "config.yaml"
+    _write_config(path, 0.5, 1_000_000_000)
+    service = ConfigService(str(path), poll_seconds=0)
+    service.get()
+
+    path.unlink()
+    assert not service.reload_if_changed()
+    assert not service.reload_if_changed()
+    assert service.get().kelly_fraction_cap == 0.5
+
+    _write_config(path, 0.25, 2_000_000_000)
+    assert service.reload_if_changed()
+    assert service.get().kelly_fraction_cap == 0.25
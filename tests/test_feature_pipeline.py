@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from market_sage_pro.data import features
+from market_sage_pro.data.pipeline import IndicatorSpec, build_feature_matrix
+from market_sage_pro.models.lightgbm_hourly import HourlyLightGBM
+
+
+@pytest.fixture
+def bars() -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.01, 300)))
+    return pd.DataFrame({
+        'close': close,
+        'high': close + 0.5,
+        'low': close - 0.5,
+        'volume': rng.uniform(100, 1000, 300),
+    })
+
+
+SPECS = ['ema:21', 'px_vs_ema:21', 'rsi', 'macd', 'macd_hist', 'atr', 'vwap', 'zscore', 'pct_change']
+
+
+def test_feature_matrix_matches_batch_functions(bars: pd.DataFrame) -> None:
+    fm = build_feature_matrix(SPECS, bars['close'], bars['high'], bars['low'], bars['volume'])
+    assert fm.values.shape == (300, len(SPECS))
+    assert fm.values.flags['C_CONTIGUOUS']
+    assert fm.columns == [
+        'ema_21', 'px_vs_ema_21', 'rsi_14', 'macd_12_26_9', 'macd_hist_12_26_9',
+        'atr_14', 'vwap', 'zscore_20', 'pct_change',
+    ]
+
+    close = bars['close']
+    ema21 = features.ema(close, 21)
+    macd_line, hist = features.macd(close)
+    expected = {
+        'ema_21': ema21,
+        'px_vs_ema_21': (close - ema21) / ema21,
+        'rsi_14': features.rsi(close),
+        'macd_12_26_9': macd_line,
+        'macd_hist_12_26_9': hist,
+        'atr_14': features.atr(bars),
+        'vwap': features.vwap(bars),
+        'zscore_20': features.rolling_zscore(close),
+        'pct_change': close.pct_change(),
+    }
+    for name, series in expected.items():
+        np.testing.assert_allclose(fm.column(name), series.to_numpy(), rtol=1e-12, equal_nan=True)
+
+
+def test_feature_matrix_float32_feeds_hourly_model(bars: pd.DataFrame) -> None:
+    fm = build_feature_matrix(
+        [IndicatorSpec('rsi'), IndicatorSpec('zscore', 10), IndicatorSpec('pct_change')],
+        bars['close'],
+        dtype=np.float32,
+    )
+    assert fm.values.dtype == np.float32
+    X = fm.values[30:]
+    y = (np.diff(bars['close'].to_numpy())[29:] > 0).astype(int)
+    model = HourlyLightGBM()
+    model.fit(X, y)
+    assert model.predict_proba(X).shape == (len(X), 2)
+
+
+def test_indicator_spec_parse_and_validation() -> None:
+    assert IndicatorSpec.parse('ema:50') == IndicatorSpec('ema', 50)
+    assert IndicatorSpec.parse('rsi').window == 14
+    assert IndicatorSpec.parse('macd:5:10:3').name == 'macd_5_10_3'
+    with pytest.raises(ValueError):
+        IndicatorSpec('nope')
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from market_sage_pro.models.lightgbm_hourly import HourlyLightGBM, HourlyModelConfig
+
+pytest.importorskip('lightgbm')
+
+
+def _batch(rng: np.random.Generator, n: int, flip: bool = False) -> tuple[np.ndarray, np.ndarray]:
+    X = rng.normal(size=(n, 4))
+    y = (X[:, 0] + 0.3 * rng.normal(size=n) > 0).astype(int)
+    return X, (1 - y) if flip else y
+
+
+def test_partial_update_adds_rounds_on_new_bars_only() -> None:
+    rng = np.random.default_rng(0)
+    cfg = HourlyModelConfig(n_estimators=30, update_rounds=5, refit_every=100, drift_tolerance=1.0)
+    model = HourlyLightGBM(cfg)
+    model.fit(*_batch(rng, 2000))
+    assert model.num_trees == 30
+
+    for i in range(3):
+        stats = model.partial_update(*_batch(rng, 200))
+        assert stats.mode == 'incremental'
+        assert model.num_trees == 30 + 5 * (i + 1)
+    X, y = _batch(rng, 500)
+    assert ((model.predict_proba(X)[:, 1] > 0.5) == y).mean() > 0.8
+
+
+def test_partial_update_full_refit_triggers() -> None:
+    rng = np.random.default_rng(1)
+    cfg = HourlyModelConfig(n_estimators=20, update_rounds=5, max_trees=30, refit_every=100, window_bars=1000)
+    model = HourlyLightGBM(cfg)
+    assert model.partial_update(*_batch(rng, 300)).reason == 'no model'
+
+    assert model.partial_update(*_batch(rng, 100)).mode == 'incremental'
+    assert model.partial_update(*_batch(rng, 100)).mode == 'incremental'
+    stats = model.partial_update(*_batch(rng, 100))
+    assert (stats.mode, stats.reason, stats.trees) == ('full', 'tree budget', 20)
+
+    # Labels flip: the log loss on the new bars jumps past the reference.
+    model.partial_update(*_batch(rng, 100))
+    stats = model.partial_update(*_batch(rng, 100, flip=True))
+    assert (stats.mode, stats.reason) == ('full', 'drift')
+
+
+def test_partial_update_keeps_single_class_batches_pending() -> None:
+    rng = np.random.default_rng(2)
+    model = HourlyLightGBM(HourlyModelConfig(n_estimators=10, update_rounds=3, drift_tolerance=10.0))
+    model.fit(*_batch(rng, 500))
+    X = rng.normal(size=(5, 4))
+    stats = model.partial_update(X, np.ones(5, dtype=int))
+    assert stats.mode == 'pending' and model.num_trees == 10
+    assert model.partial_update(*_batch(rng, 50)).mode == 'incremental'
+    assert model.num_trees == 13
+
+
+def test_partial_update_without_new_bars_is_a_no_op() -> None:
+    rng = np.random.default_rng(4)
+    model = HourlyLightGBM(HourlyModelConfig(n_estimators=10, update_rounds=3, drift_tolerance=10.0))
+    model.fit(*_batch(rng, 500))
+    assert model.partial_update(*_batch(rng, 50)).mode == 'incremental'
+    stats = model.partial_update(np.empty((0, 4)), np.empty(0))
+    assert (stats.mode, stats.bars, model.num_trees) == ('none', 0, 13)
+
+
+def test_fast_inference_matches_sklearn_wrapper() -> None:
+    import pickle
+
+    rng = np.random.default_rng(3)
+    X, y = _batch(rng, 2000)
+    X[::7, 1] = np.nan
+    X[::5, 2] = 0.0
+    slow = HourlyLightGBM(HourlyModelConfig(n_estimators=50))
+    fast = HourlyLightGBM(HourlyModelConfig(n_estimators=50, fast_inference=True))
+    slow.fit(X, y)
+    fast.fit(X, y)
+
+    np.testing.assert_array_equal(fast.predict_proba(X), slow.predict_proba(X))
+    for i in range(20):
+        np.testing.assert_array_equal(fast.predict_proba(X[i : i + 1]), slow.predict_proba(X[i : i + 1]))
+    with pytest.raises(ValueError):
+        fast.predict_proba(X[:1, :3])
+
+    # Continued boosting invalidates the compiled predictor.
+    fast.partial_update(*_batch(rng, 100))
+    restored = pickle.loads(pickle.dumps(fast))
+    np.testing.assert_array_equal(restored.predict_proba(X[:1]), fast.model.predict_proba(X[:1]))
+
+
+def test_fast_inference_falls_back_without_private_api(monkeypatch) -> None:
+    from market_sage_pro.models import fast_inference
+
+    rng = np.random.default_rng(5)
+    X, y = _batch(rng, 500)
+    slow = HourlyLightGBM(HourlyModelConfig(n_estimators=20))
+    slow.fit(X, y)
+    monkeypatch.setattr(fast_inference.lightgbm, '__version__', '99.0.0')
+    predictor = fast_inference.FastBoosterPredictor(slow.model.booster_)
+    assert predictor._config is None
+    np.testing.assert_allclose(predictor.predict_proba(X[:1]), slow.predict_proba(X[:1]))
+    np.testing.assert_allclose(predictor.predict_proba(X[:5]), slow.predict_proba(X[:5]))
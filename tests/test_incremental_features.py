@@ -0,0 +1,92 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from market_sage_pro.data import features
+from market_sage_pro.data.incremental import (
+    IncrementalATR,
+    IncrementalEMA,
+    IncrementalFeatureSet,
+    IncrementalIVRank,
+    IncrementalMACD,
+    IncrementalRSI,
+    IncrementalVWAP,
+    IncrementalZScore,
+)
+from market_sage_pro.data.pipeline import build_feature_matrix
+
+
+@pytest.fixture
+def bars() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 400)))
+    spread = rng.uniform(0.1, 1.0, 400)
+    return pd.DataFrame({
+        'close': close,
+        'high': close + spread,
+        'low': close - spread,
+        'volume': rng.uniform(1e3, 1e4, 400),
+    })
+
+
+def _close_enough(stream: np.ndarray, batch: pd.Series) -> None:
+    np.testing.assert_allclose(stream, batch.to_numpy(), rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_incremental_matches_batch(bars: pd.DataFrame) -> None:
+    close = bars['close']
+    _close_enough(IncrementalEMA(21).update_many(close), features.ema(close, 21))
+    _close_enough(IncrementalRSI(14).update_many(close), features.rsi(close, 14))
+    macd_line, hist = features.macd(close)
+    out = IncrementalMACD().update_many(close)
+    _close_enough(out[:, 0], macd_line)
+    _close_enough(out[:, 1], hist)
+    _close_enough(IncrementalATR(14).update_many(bars['high'], bars['low'], close), features.atr(bars, 14))
+    _close_enough(IncrementalVWAP().update_many(close, bars['volume']), features.vwap(bars))
+    _close_enough(IncrementalZScore(20).update_many(close), features.rolling_zscore(close, 20))
+    _close_enough(IncrementalIVRank(60).update_many(close), features.implied_vol_rank(close, 60))
+
+
+@pytest.mark.parametrize('make, args', [
+    (lambda: IncrementalRSI(14), ('close',)),
+    (lambda: IncrementalMACD(), ('close',)),
+    (lambda: IncrementalATR(14), ('high', 'low', 'close')),
+    (lambda: IncrementalIVRank(30), ('close',)),
+    (lambda: IncrementalZScore(20), ('close',)),
+])
+def test_checkpoint_restore_resumes_stream(bars: pd.DataFrame, make, args) -> None:
+    cols = [bars[a].to_numpy() for a in args]
+    full = make().update_many(*cols)
+
+    head = make()
+    first = head.update_many(*[c[:150] for c in cols])
+    restored = type(head).from_state(json.loads(json.dumps(head.state_dict())))
+    rest = restored.update_many(*[c[150:] for c in cols])
+    np.testing.assert_array_equal(np.concatenate([first, rest]), full)
+
+
+def test_incremental_feature_set_matches_feature_matrix(bars: pd.DataFrame) -> None:
+    specs = ['rsi:14', 'px_vs_ema:21', 'ema:21', 'macd', 'macd_hist', 'atr:14', 'vwap', 'zscore:20', 'pct_change']
+    state = IncrementalFeatureSet(specs)
+    cols = [bars[c].to_numpy() for c in ('close', 'high', 'low', 'volume')]
+    rows = np.array([state.update(*r) for r in zip(*cols, strict=True)])
+    fm = build_feature_matrix(specs, *cols)
+    assert state.columns == fm.columns
+    np.testing.assert_allclose(rows, fm.values, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_feature_set_checkpoint_matches_continuous(bars: pd.DataFrame) -> None:
+    specs = ['rsi:14', 'px_vs_ema:21', 'macd_hist', 'atr:14', 'vwap', 'zscore:20', 'pct_change']
+    cols = [bars[c].to_numpy() for c in ('close', 'high', 'low', 'volume')]
+    rows = list(zip(*cols, strict=True))
+    continuous = IncrementalFeatureSet(specs)
+    full = np.array([continuous.update(*r) for r in rows])
+
+    head = IncrementalFeatureSet(specs)
+    first = [head.update(*r) for r in rows[:150]]
+    restored = IncrementalFeatureSet.from_state(json.loads(json.dumps(head.state_dict())))
+    assert restored.columns == head.columns
+    rest = [restored.update(*r) for r in rows[150:]]
+    np.testing.assert_array_equal(np.array(first + rest), full)
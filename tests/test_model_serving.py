@@ -0,0 +1,98 @@
+import asyncio
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from market_sage_pro.api.main import app
+from market_sage_pro.models.lightgbm_hourly import HourlyLightGBM, HourlyModelConfig
+from market_sage_pro.models.serving import ModelServer, ModelSet, ServingConfig
+from market_sage_pro.models.tft_daily import DailyTFT
+
+
+class FakeRegistry:
+    def __init__(self) -> None:
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(400, 3))
+        self.models = {}
+        for version, sign in (('1', 1), ('2', -1)):
+            model = HourlyLightGBM(HourlyModelConfig(n_estimators=10))
+            model.fit(X, (sign * X[:, 0] > 0).astype(int))
+            self.models[('hourly_lightgbm', version)] = model
+        self.models[('daily_tft', '1')] = DailyTFT()
+        self.latest = {'hourly_lightgbm': '1', 'daily_tft': '1'}
+        self.loads: list[tuple[str, str]] = []
+
+    def lookup(self, name: str) -> str | None:
+        return self.latest.get(name)
+
+    def load(self, name: str, version: str) -> object:
+        self.loads.append((name, version))
+        return self.models[(name, version)]
+
+
+def _server(registry: FakeRegistry, **kwargs: float) -> ModelServer:
+    return ModelServer(ServingConfig(poll_seconds=0, **kwargs), registry.lookup, registry.load)
+
+
+async def test_concurrent_predicts_share_batches() -> None:
+    registry = FakeRegistry()
+    server = _server(registry, max_wait_ms=20)
+    await server.start()
+    try:
+        X = np.random.default_rng(1).normal(size=(64, 3))
+        out = await asyncio.gather(*(server.predict(row) for row in X))
+    finally:
+        await server.stop()
+
+    np.testing.assert_allclose(np.concatenate(out), server.predict_batch(X))
+    metrics = server.metrics()
+    assert metrics['count'] == 64
+    assert metrics['batches'] < 64
+    assert metrics['p99_ms'] >= metrics['p50_ms'] > 0
+
+
+def test_load_hot_swaps_only_changed_versions() -> None:
+    registry = FakeRegistry()
+    server = _server(registry)
+    assert server.load()
+    assert not server.load()
+    X = np.array([[2.0, 0.0, 0.0]])
+    before = server.predict_batch(X)[0]
+
+    registry.latest['hourly_lightgbm'] = '2'
+    assert server.load()
+    assert registry.loads == [('hourly_lightgbm', '1'), ('daily_tft', '1'), ('hourly_lightgbm', '2')]
+    assert server.predict_batch(X)[0] < 0.5 < before
+
+
+def test_predict_endpoint_without_registry() -> None:
+    with TestClient(app) as client:
+        r = client.post('/predict', json={'features': [[0.1, 0.2], [0.3, 0.4]]})
+        assert r.status_code == 200
+        assert r.json()['ensemble_up_prob'] == [0.5, 0.5]
+        metrics = client.get('/metrics/models').json()
+        assert metrics['count'] >= 1 and 'p99_ms' in metrics
+
+
+async def test_bad_widths_fail_alone_and_batcher_survives() -> None:
+    registry = FakeRegistry()
+    server = _server(registry, max_wait_ms=20)
+    await server.start()
+    try:
+        with pytest.raises(ValueError):
+            await server.predict(np.zeros((1, 5)))
+        # Before any model is loaded the width is unknown; mixed widths in one
+        # batch are scored request by request.
+        server.models = ModelSet(HourlyLightGBM(), DailyTFT(), {})
+        out = await asyncio.gather(server.predict(np.zeros((2, 3))), server.predict(np.zeros((1, 4))))
+        assert [len(o) for o in out] == [2, 1]
+        assert len(await server.predict(np.zeros((1, 3)))) == 1
+    finally:
+        await server.stop()
+
+
+def test_predict_endpoint_rejects_ragged_rows() -> None:
+    with TestClient(app) as client:
+        r = client.post('/predict', json={'features': [[0.1, 0.2], [0.3]]})
+        assert r.status_code == 422
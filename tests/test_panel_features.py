@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from market_sage_pro.data import features
+from market_sage_pro.data.panel import (
+    atr_panel,
+    ema_panel,
+    implied_vol_rank_panel,
+    macd_panel,
+    panel_features,
+    rolling_zscore_panel,
+    rsi_panel,
+    vwap_panel,
+)
+from market_sage_pro.data.pipeline import build_feature_matrix
+
+
+@pytest.fixture
+def long_bars() -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    ts = pd.date_range('2024-01-01', periods=120, freq='h')
+    frames = []
+    # Staggered listings: each symbol starts later than the previous one.
+    for i, start in enumerate([0, 7, 30, 90]):
+        n = len(ts) - start
+        close = 20 * (i + 1) * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+        frames.append(pd.DataFrame({
+            'symbol': f'S{i}', 'ts': ts[start:], 'close': close,
+            'high': close + 0.2, 'low': close - 0.2, 'volume': rng.uniform(10, 100, n),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_panel_matches_per_symbol_loop(long_bars: pd.DataFrame) -> None:
+    wide = long_bars.pivot(index='ts', columns='symbol')
+    close, high, low, volume = (wide[f].to_numpy() for f in ('close', 'high', 'low', 'volume'))
+    macd_line, hist = macd_panel(close)
+    results = {
+        'ema': ema_panel(close, 21),
+        'rsi': rsi_panel(close),
+        'macd': macd_line,
+        'hist': hist,
+        'atr': atr_panel(high, low, close),
+        'vwap': vwap_panel(close, volume),
+        'z': rolling_zscore_panel(close),
+        'ivr': implied_vol_rank_panel(close, 40),
+    }
+    for j, (_sym, g) in enumerate(long_bars.groupby('symbol')):
+        rows = wide.index.get_indexer(g['ts'])
+        c = g['close'].reset_index(drop=True)
+        bars = g.reset_index(drop=True)
+        m_line, m_hist = features.macd(c)
+        expected = {
+            'ema': features.ema(c, 21),
+            'rsi': features.rsi(c),
+            'macd': m_line,
+            'hist': m_hist,
+            'atr': features.atr(bars),
+            'vwap': features.vwap(bars),
+            'z': features.rolling_zscore(c),
+            'ivr': features.implied_vol_rank(c, 40),
+        }
+        for name, series in expected.items():
+            got = results[name][rows, j]
+            np.testing.assert_allclose(got, series.to_numpy(), rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=name)
+        assert np.isnan(results['ema'][: rows[0], j]).all()
+
+
+def test_panel_features_long_format(long_bars: pd.DataFrame) -> None:
+    out = panel_features(long_bars, ['rsi', 'ema:10', 'atr'])
+    assert len(out) == len(long_bars)
+    assert list(out.columns) == ['symbol', 'ts', 'rsi_14', 'ema_10', 'atr_14']
+    s2 = long_bars[long_bars['symbol'] == 'S2'].reset_index(drop=True)
+    got = out[out['symbol'] == 'S2'].reset_index(drop=True)
+    np.testing.assert_allclose(got['rsi_14'], features.rsi(s2['close']), equal_nan=True)
+    np.testing.assert_allclose(got['atr_14'], features.atr(s2), equal_nan=True)
+
+
+def test_panel_features_gapped_and_unaligned_symbols(long_bars: pd.DataFrame) -> None:
+    bars = long_bars.copy()
+    # S1 misses an interior bar; S3 trades on its own half-hour clock.
+    bars = bars.drop(bars.index[(bars['symbol'] == 'S1')][40])
+    bars.loc[bars['symbol'] == 'S3', 'ts'] += pd.Timedelta(minutes=30)
+    specs = ['rsi', 'zscore', 'ema:10', 'atr', 'vwap', 'macd_hist', 'pct_change']
+    out = panel_features(bars.sample(frac=1, random_state=0), specs)
+    assert len(out) == len(bars)
+    for sym, g in bars.groupby('symbol'):
+        g = g.sort_values('ts')
+        expected = build_feature_matrix(specs, g['close'], g['high'], g['low'], g['volume'])
+        got = out[out['symbol'] == sym]
+        np.testing.assert_array_equal(got['ts'].to_numpy(), g['ts'].to_numpy())
+        np.testing.assert_allclose(got[expected.columns].to_numpy(), expected.values, equal_nan=True, err_msg=sym)
@@ -0,0 +1,90 @@
+import asyncio
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from market_sage_pro.data.store import DuckDBStore
+from market_sage_pro.streaming.pipeline import StreamConfig, StreamPipeline
+from market_sage_pro.streaming.replay import (
+    EventChunk,
+    ReplayFeed,
+    frame_to_events,
+    merge_events,
+    parquet_source,
+    store_source,
+)
+
+
+def _chunks(ts: np.ndarray, size: int) -> list[EventChunk]:
+    return [EventChunk(ts[i : i + size], ts[i : i + size] * 0 + i, np.arange(len(ts[i : i + size]), dtype=float))
+            for i in range(0, len(ts), size)]
+
+
+def test_merge_is_time_ordered_and_deterministic() -> None:
+    rng = np.random.default_rng(0)
+    streams = {sym: np.sort(rng.integers(0, 200, 300)).astype(float) for sym in ('C', 'A', 'B')}
+    sources = lambda: {sym: _chunks(ts, 7) for sym, ts in streams.items()}  # noqa: E731
+
+    out = list(merge_events(sources(), batch_size=50))
+    assert all(len(b) <= 50 for b in out)
+    got = [(t, s) for b in out for s, t in zip(b.symbol, b.ts, strict=True)]
+    ref = sorted(((t, s, i) for s, ts in streams.items() for i, t in enumerate(ts)))
+    assert got == [(t, s) for t, s, _ in ref]
+
+    again = [(t, s) for b in merge_events(sources(), batch_size=13) for s, t in zip(b.symbol, b.ts, strict=True)]
+    assert again == got
+
+
+def test_merge_respects_max_span() -> None:
+    ts = np.arange(0, 100, 0.5)
+    for batch in merge_events({'A': _chunks(ts, 16), 'B': _chunks(ts + 0.25, 16)}, max_span=2.0):
+        assert batch.ts[-1] - batch.ts[0] <= 2.0
+
+
+def test_frame_to_events_spreads_ohlc() -> None:
+    df = pd.DataFrame({'ts': [0.0, 60.0], 'open': [10, 10], 'high': [12, 11], 'low': [9, 8], 'close': [11, 9],
+                       'volume': [100, 200]})
+    ev = frame_to_events(df, bar_seconds=60)
+    assert ev.ts.tolist() == [0, 15, 30, 45, 60, 75, 90, 105]
+    assert ev.price.tolist() == [10, 9, 12, 11, 10, 11, 8, 9]
+    assert ev.size.tolist() == [0, 0, 0, 100, 0, 0, 0, 200]
+
+
+@pytest.fixture
+def store(tmp_path) -> DuckDBStore:
+    store = DuckDBStore(str(tmp_path / 'm.duckdb'))
+    rng = np.random.default_rng(1)
+    ts = pd.date_range('2024-01-02 14:30', periods=400, freq='min')
+    for sym in ('AAA', 'BBB'):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 1e-3, len(ts))))
+        store.upsert_bars({sym: pd.DataFrame({'ts': ts, 'open': close, 'high': close * 1.001, 'low': close * 0.999,
+                                              'close': close, 'volume': 10.0})})
+    yield store
+    store.close()
+
+
+def test_store_and_parquet_replay_agree(tmp_path, store: DuckDBStore) -> None:
+    path = tmp_path / 'bars.parquet'
+    store.conn.execute(f"COPY (SELECT * FROM bars ORDER BY symbol, ts) TO '{path}' (FORMAT parquet)")
+    from_store = list(ReplayFeed(store_source(store, ['AAA', 'BBB'], chunk=64)).events())
+    from_parquet = list(ReplayFeed(parquet_source(path, chunk=64)).events())
+    flat = lambda bs: [(s, t, p) for b in bs for s, t, p in zip(b.symbol, b.ts, b.price, strict=True)]  # noqa: E731
+    assert flat(from_store) == flat(from_parquet)
+    assert len(flat(from_store)) == 2 * 400 * 4
+
+
+def test_paced_replay_drives_stream_pipeline(store: DuckDBStore) -> None:
+    # 100 minutes of bars at 30000x is ~0.2s of wall time.
+    end = datetime(2024, 1, 2, 16, 9)
+    feed = ReplayFeed(store_source(store, ['AAA', 'BBB'], end=end, chunk=64), speed=30_000)
+    pipe = StreamPipeline(StreamConfig(bar_seconds=60))
+
+    t0 = time.perf_counter()
+    stats = asyncio.run(pipe.run(feed))
+    elapsed = time.perf_counter() - t0
+    assert stats.bars == 2 * 100
+    assert feed.stats.events == 2 * 100 * 4
+    assert 0.15 < elapsed < 5
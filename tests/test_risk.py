@@ -1,4 +1,7 @@
+import pytest
+
 from market_sage_pro.risk.manager import RiskConfig, RiskManager
+from market_sage_pro.risk.portfolio import PortfolioRiskManager
 
 
 def test_risk_manager_circuit_breaker():
@@ -17,4 +20,39 @@ def test_risk_manager_pdt_equity_check():
     rm = RiskManager(RiskConfig(max_daily_loss_pct=-2))
     # Equity below $25k should prevent opening new positions even if the
     # caller forgets to set is_pdt_restricted.
-    assert not rm.can_open_new(24_000, 0, False)
\ No newline at end of file
+    assert not rm.can_open_new(24_000, 0, False)
+
+def test_portfolio_risk_tracks_fills_and_marks():
+    pr = PortfolioRiskManager(RiskConfig(max_daily_loss_pct=-2), start_equity=100_000)
+    pr.on_fill('AAPL', 100, 200.0)
+    pr.on_fill('MSFT', -50, 400.0)
+    pr.update_marks(['AAPL', 'MSFT', 'AAPL', 'XYZ'], [205.0, 390.0, 210.0, 1.0])
+    assert pr.equity == pytest.approx(100_000 + 100 * 10 + 50 * 10)
+    assert pr.equity == pytest.approx(pr.revalue())
+    assert pr.exposure_pct()['AAPL'] == pytest.approx(21_000 / pr.equity * 100)
+
+    pr.on_fill('AAPL', -150, 220.0)  # close 100 at +20, flip to -50
+    assert pr.realized[pr.index['AAPL']] == pytest.approx(2_000)
+    assert pr.qty[pr.index['AAPL']] == -50 and pr.avg_cost[pr.index['AAPL']] == 220.0
+    assert pr.equity == pytest.approx(pr.revalue())
+
+
+def test_portfolio_risk_batch_can_open_new():
+    pr = PortfolioRiskManager(RiskConfig(max_daily_loss_pct=-2, per_symbol_cap_pct=5), start_equity=100_000)
+    pr.on_fill('AAPL', 20, 200.0)  # 4% exposure
+    ok = pr.can_open_new(['AAPL', 'MSFT', 'MSFT', 'AAPL', 'NVDA'], [500, 3_000, 3_000, -9_000, 6_000])
+    assert ok.tolist() == [True, True, False, True, False]
+
+    pr.update_marks(['AAPL'], [50.0])  # -3,000 -> breaker trips at -3%
+    assert pr.disabled
+    assert not pr.can_open_new(['MSFT'], [100]).any()
+    pr.reset_day()
+    assert pr.can_open_new(['MSFT'], [100]).all()
+
+
+def test_portfolio_risk_pdt_and_growth():
+    pr = PortfolioRiskManager(RiskConfig(max_daily_loss_pct=-50), start_equity=20_000, capacity=2)
+    assert not pr.can_open_new(['AAPL'], [100]).any()
+    for i in range(5):
+        pr.on_fill(f'S{i}', 1, 10.0)
+    assert len(pr) == 5 and pr.equity == pytest.approx(20_000)
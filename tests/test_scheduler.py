@@ -0,0 +1,159 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from market_sage_pro.models.serving import ModelServer, ServingConfig
+from market_sage_pro.scheduler.executor import JobContext, JobExecutor, JobPolicy
+from market_sage_pro.scheduler.jobs import JobResources, build_executor
+
+
+def test_overlapping_runs_are_skipped_not_queued() -> None:
+    release = threading.Event()
+    executor = JobExecutor(workers=4)
+    executor.register('slow', lambda ctx: release.wait(5), JobPolicy(max_instances=1))
+    executor.register('fast', lambda ctx: 'done')
+    try:
+        first = executor.submit('slow')
+        assert first is not None
+        assert executor.submit('slow') is None
+        # Other jobs still get workers while 'slow' overruns.
+        fast = executor.submit('fast')
+        assert fast is not None and fast.result(timeout=5) == 'done'
+        release.set()
+        first.result(timeout=5)
+        assert executor.submit('slow') is not None
+    finally:
+        release.set()
+        executor.shutdown()
+
+    metrics = executor.metrics()['slow']
+    assert metrics['skipped'] == 1
+    assert metrics['runs'] == 2
+    assert metrics['active'] == 0
+    assert metrics['duration']['count'] == 2
+    assert metrics['queue_lag']['count'] == 2
+
+
+def test_timeout_cancels_cooperative_job() -> None:
+    steps = []
+
+    def long_job(ctx: JobContext) -> None:
+        for i in range(200):
+            ctx.check()
+            steps.append(i)
+            time.sleep(0.01)
+
+    executor = JobExecutor(workers=1)
+    executor.register('long', long_job, JobPolicy(timeout_seconds=0.1))
+    try:
+        executor.submit('long').result(timeout=5)
+    finally:
+        executor.shutdown()
+
+    assert 0 < len(steps) < 200
+    metrics = executor.metrics()['long']
+    assert metrics['timeouts'] == 1
+    assert metrics['failures'] == 0
+    assert metrics['active'] == 0
+
+
+def _bars(start: str, n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        'ts': pd.date_range(start, periods=n, freq='h'),
+        'open': close, 'high': close * 1.001, 'low': close * 0.999, 'close': close, 'volume': 1000.0,
+    })
+
+
+class FakeRegistry:
+    def __init__(self) -> None:
+        self.models: dict[tuple[str, str], object] = {}
+
+    def publish(self, model: object, name: str) -> str:
+        version = str(sum(n == name for n, _ in self.models) + 1)
+        self.models[(name, version)] = model
+        return version
+
+    def lookup(self, name: str) -> str | None:
+        return max((v for n, v in self.models if n == name), key=int, default=None)
+
+    def load(self, name: str, version: str) -> object:
+        return self.models[(name, version)]
+
+
+def test_hourly_update_reuses_store_and_reads_only_new_bars(tmp_path) -> None:
+    resources = JobResources(str(tmp_path / 'market.duckdb'), publish=FakeRegistry().publish)
+    executor = build_executor(resources, workers=2)
+    try:
+        resources.store.upsert_bars({'AAPL': _bars('2026-01-05', 300, 0), 'MSFT': _bars('2026-01-05', 300, 1)})
+        executor.submit('morning_setup').result(timeout=30)
+        store = resources.store
+        assert resources.symbols == ['AAPL', 'MSFT']
+
+        executor.submit('update_hourly_model').result(timeout=30)
+        model = resources.hourly
+        assert model.model is not None
+        assert len(model._y) == 2 * 299
+
+        resources.store.upsert_bars({'AAPL': _bars('2026-01-05', 310, 0)})
+        assert len(resources.new_training_rows().y) == 10
+        assert resources.store is store
+        assert resources.hourly is model
+    finally:
+        executor.shutdown()
+        resources.close()
+
+
+def test_hourly_update_is_registered_for_serving(tmp_path) -> None:
+    registry = FakeRegistry()
+    api_server = ModelServer(ServingConfig(poll_seconds=0), registry.lookup, registry.load)
+    resources = JobResources(str(tmp_path / 'market.duckdb'), publish=registry.publish)
+    executor = build_executor(resources, workers=1)
+    try:
+        resources.store.upsert_bars({'AAPL': _bars('2026-01-05', 300, 0)})
+        executor.submit('update_hourly_model').result(timeout=30)
+        assert api_server.load()
+        first = api_server.models.hourly
+        assert first is resources.hourly and api_server.models.versions['hourly_lightgbm'] == '1'
+
+        resources.store.upsert_bars({'AAPL': _bars('2026-01-05', 310, 0)})
+        executor.submit('update_hourly_model').result(timeout=30)
+        # The served model is left alone; the update lands as a new version.
+        assert len(first._y) == 299
+        assert api_server.load() and api_server.models.versions['hourly_lightgbm'] == '2'
+        assert len(api_server.models.hourly._y) == 309
+    finally:
+        executor.shutdown()
+        resources.close()
+
+
+def test_failed_update_keeps_rows_for_next_run(tmp_path, monkeypatch) -> None:
+    registry = FakeRegistry()
+    resources = JobResources(str(tmp_path / 'market.duckdb'), publish=registry.publish)
+    resources.hourly.cfg.window_bars = 100
+    executor = build_executor(resources, workers=1)
+    try:
+        resources.store.upsert_bars({'AAPL': _bars('2026-01-05', 300, 0), 'MSFT': _bars('2026-01-05', 300, 1)})
+        # Cold start reads only the last window_bars, split across symbols.
+        assert len(resources.new_training_rows().y) == 2 * 49
+
+        def boom(X: np.ndarray, y: np.ndarray) -> None:
+            raise RuntimeError('train failed')
+
+        monkeypatch.setattr(resources.hourly, 'partial_update', boom)
+        with pytest.raises(RuntimeError):
+            executor.submit('update_hourly_model').result(timeout=30)
+        assert resources.watermark == {} and registry.models == {}
+
+        monkeypatch.undo()
+        executor.submit('update_hourly_model').result(timeout=30)
+        assert len(resources.hourly._y) == 2 * 49
+        assert registry.models == {('hourly_lightgbm', '1'): resources.hourly}
+        assert resources.watermark['AAPL'] == pd.Timestamp('2026-01-05') + pd.Timedelta(hours=299)
+    finally:
+        executor.shutdown()
+        resources.close()
@@ -1,4 +1,15 @@
-from market_sage_pro.signals.generator import SignalConfig, generate_signal
+import numpy as np
+import pytest
+
+from market_sage_pro.signals.generator import (
+    RATIONALE_BUY_ATM,
+    RATIONALE_DOWN,
+    RATIONALE_STRADDLE,
+    RATIONALE_UP,
+    SignalConfig,
+    generate_signal,
+    generate_signals_batch,
+)
 
 
 def test_signal_buy_option():
@@ -30,4 +41,49 @@ def test_signal_hold():
         prob_big_move=0.5,
         cfg=cfg,
     )
-    assert sig.action == "HOLD"
\ No newline at end of file
+    assert sig.action == "HOLD"
+
+
+NAN = float("nan")
+UP, DOWN, STRADDLE, ATM = RATIONALE_UP, RATIONALE_DOWN, RATIONALE_STRADDLE, RATIONALE_BUY_ATM
+
+# (up, down, move, rsi, px_vs_ema21, ivr, prob_big_move) -> (action, rationale, size, confidence).
+# Expected values come from the original per-row scalar generate_signal.
+CASES = [
+    ((0.75, 0.25, 0.30, 50, 0.01, 0.5, 0.7), ("BUY", UP, 0.375, 75)),
+    ((0.70, 0.30, 0.25, 64.9, 0.0, 0.5, 0.6), ("BUY", UP, 0.28, 70)),  # every gate at its boundary
+    ((0.69, 0.31, 0.25, 50, 0.0, 0.5, 0.6), ("HOLD", 0, 0.2622, 69)),
+    ((0.75, 0.25, 0.30, 65, 0.01, 0.5, 0.7), ("HOLD", 0, 0.375, 75)),  # RSI at overbought
+    ((0.75, 0.25, 0.30, 50, 0.01, 0.5, 0.5), ("OPTION_BUY_ATM", UP | ATM, 0.375, 75)),
+    ((0.25, 0.75, -0.30, 50, -0.01, 0.5, 0.7), ("SHORT", DOWN, 0.375, 75)),
+    ((0.30, 0.70, -0.25, 35.1, 0.0, 0.5, 0.6), ("SHORT", DOWN, 0.28, 70)),
+    ((0.25, 0.75, -0.30, 35, -0.01, 0.5, 0.7), ("HOLD", 0, 0.375, 75)),  # RSI at oversold
+    ((0.20, 0.80, -0.40, 50, -0.10, 0.5, 0.5), ("OPTION_BUY_ATM", DOWN | ATM, 0.48, 80)),
+    ((0.75, 0.25, 0.30, 50, 0.01, 0.2, 0.7), ("OPTION_SELL_STRADDLE", UP | STRADDLE, 0.375, 75)),
+    ((0.50, 0.50, 0.00, 50, 0.00, 0.29, 0.6), ("OPTION_SELL_STRADDLE", STRADDLE, 0.0, 50)),
+    ((0.50, 0.50, 0.00, 50, 0.00, 0.3, 0.6), ("HOLD", 0, 0.0, 50)),  # IVR at max
+    ((0.95, 0.05, 2.00, 50, 0.02, 0.5, 0.7), ("BUY", UP, 0.5, 95)),  # Kelly capped
+    ((0.75, NAN, 0.30, 50, 0.01, 0.5, 0.7), ("BUY", UP, 0.375, 75)),
+    ((0.75, 0.25, 0.30, NAN, 0.01, 0.5, 0.7), ("HOLD", 0, 0.375, 75)),
+    ((0.75, 0.25, NAN, 50, 0.01, 0.5, 0.7), ("HOLD", 0, 0.375, 75)),
+    ((0.50, 0.50, 0.00, 50, 0.00, NAN, 0.7), ("HOLD", 0, 0.0, 50)),
+    ((0.75, 0.25, 0.30, 50, 0.01, 0.5, NAN), ("BUY", UP, 0.375, 75)),
+]
+
+
+def test_signals_batch_matches_scalar_reference():
+    cfg = SignalConfig(kelly_fraction_cap=0.5)
+    batch = generate_signals_batch(*np.array([row for row, _ in CASES], dtype=float).T, cfg=cfg)
+    assert len(batch) == len(CASES)
+    for i, (row, (action, mask, size, confidence)) in enumerate(CASES):
+        assert batch.action_names()[i] == action, row
+        assert batch.rationale[i] == mask, row
+        assert batch.size_fraction[i] == pytest.approx(size), row
+        assert batch.confidence[i] == confidence, row
+    assert batch.signal(4).rationale == "Up prob >=0.70, RSI<65, above EMA21; Directional + buy 7DTE ATM option"
+
+
+def test_signals_batch_nan_probability_is_hold():
+    # The scalar version raised here (int(round(nan))); the batch must not emit a garbage confidence.
+    sig = generate_signals_batch([NAN], [0.25], [0.3], [50], [0.01], [0.5], [0.7], SignalConfig(0.5)).signal(0)
+    assert (sig.action, sig.probability, sig.confidence, sig.size_fraction) == ("HOLD", 0.25, 25, 0.0)
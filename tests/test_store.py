@@ -0,0 +1,185 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+from market_sage_pro.data.store import (
+    BarCache,
+    DuckDBStore,
+    RetentionConfig,
+    fetch_historical_bars,
+    load_historical_bars,
+)
+
+
+def _seed_stockdata(path) -> pd.DataFrame:
+    dates = pd.date_range('2020-01-01', periods=30, freq='B')
+    raw = pd.DataFrame({
+        'Date': dates.strftime('%Y-%m-%d'),
+        'AAPL': np.linspace(100, 130, 30),
+        'MSFT': np.linspace(200, 170, 30),
+    })
+    raw.to_csv(path, index=False)
+    return pd.read_csv(path)
+
+
+def test_bar_cache_serves_symbols_from_one_snapshot(tmp_path) -> None:
+    src = tmp_path / 'stockdata.csv'
+    raw = _seed_stockdata(src)
+    cache = BarCache(str(tmp_path / 'cache.duckdb'), source=str(src))
+
+    start, end = datetime(2020, 1, 6), datetime(2020, 1, 31)
+    bars = fetch_historical_bars('aapl', start, end, cache=cache)
+    dates = pd.to_datetime(raw['Date'])
+    mask = (dates >= start) & (dates <= end)
+    assert list(bars.columns) == ['ts', 'open', 'high', 'low', 'close', 'volume']
+    np.testing.assert_array_equal(bars['close'].to_numpy(), raw.loc[mask, 'AAPL'].to_numpy())
+    np.testing.assert_array_equal(bars['ts'].to_numpy(), dates[mask].to_numpy())
+    assert fetch_historical_bars('NOPE', start, end, cache=cache).empty
+
+    # A later run reuses the on-disk snapshot without touching the source.
+    cache.conn.close()
+    src.unlink()
+    reopened = BarCache(str(tmp_path / 'cache.duckdb'), source=str(src))
+    many = load_historical_bars(['AAPL', 'MSFT'], start, end, cache=reopened)
+    assert many['AAPL'].equals(bars)
+    assert len(many['MSFT']) == mask.sum()
+    assert reopened.symbols() == ['AAPL', 'MSFT']
+
+
+def test_bar_cache_reads_long_format(tmp_path) -> None:
+    src = tmp_path / 'bars.csv'
+    pd.DataFrame({
+        'symbol': ['spy', 'spy', 'qqq'],
+        'ts': ['2021-03-01 09:30', '2021-03-01 09:31', '2021-03-01 09:30'],
+        'open': [1.0, 2.0, 3.0],
+        'high': [1.5, 2.5, 3.5],
+        'low': [0.5, 1.5, 2.5],
+        'close': [1.2, 2.2, 3.2],
+        'volume': [10.0, 20.0, 30.0],
+    }).to_csv(src, index=False)
+    cache = BarCache(str(tmp_path / 'cache.duckdb'), source=str(src))
+
+    bars = cache.bars('SPY', datetime(2021, 3, 1), datetime(2021, 3, 2))
+    assert bars['high'].tolist() == [1.5, 2.5]
+    assert bars['volume'].tolist() == [10.0, 20.0]
+
+
+def _recent_bars(n: int, start_price: float) -> pd.DataFrame:
+    ts = pd.date_range(pd.Timestamp.utcnow().floor('D') - pd.Timedelta(days=n), periods=n, freq='D')
+    close = start_price + np.arange(n, dtype=float)
+    return pd.DataFrame({
+        'ts': ts.tz_localize(None), 'open': close, 'high': close + 1,
+        'low': close - 1, 'close': close, 'volume': 100.0,
+    })
+
+
+def test_store_single_table_and_cross_symbol_reads(tmp_path) -> None:
+    store = DuckDBStore(str(tmp_path / 'market.duckdb'))
+    store.write_bars('aapl', _recent_bars(5, 100.0))
+    store.write_bars('MSFT', _recent_bars(3, 200.0))
+
+    tables = store.conn.execute(
+        "SELECT table_name FROM information_schema.tables ORDER BY table_name"
+    ).fetchall()
+    assert tables == [('bars',)]
+
+    assert store.read_bars('AAPL')['close'].tolist() == [100.0, 101.0, 102.0, 103.0, 104.0]
+    many = store.read_bars_many(['AAPL', 'MSFT'])
+    assert many.groupby('symbol').size().to_dict() == {'AAPL': 5, 'MSFT': 3}
+
+    xs = store.read_cross_section()
+    assert xs.set_index('symbol')['close'].to_dict() == {'AAPL': 104.0, 'MSFT': 202.0}
+    panel = store.read_panel(['AAPL', 'MSFT'])
+    assert list(panel.columns) == ['AAPL', 'MSFT']
+    assert panel['MSFT'].isna().sum() == 2
+
+
+def test_store_migrates_per_symbol_tables(tmp_path) -> None:
+    db = str(tmp_path / 'legacy.duckdb')
+    conn = duckdb.connect(db)
+    legacy = _recent_bars(4, 50.0)
+    conn.execute(
+        'CREATE TABLE bars_SPY (ts TIMESTAMP, open DOUBLE, high DOUBLE, low DOUBLE, close DOUBLE, volume DOUBLE)'
+    )
+    conn.register('legacy_df', legacy)
+    conn.execute('INSERT INTO bars_SPY SELECT * FROM legacy_df')
+    conn.close()
+
+    store = DuckDBStore(db)
+    assert store.read_bars('spy')['close'].tolist() == legacy['close'].tolist()
+    names = [r[0] for r in store.conn.execute('SELECT table_name FROM information_schema.tables').fetchall()]
+    assert names == ['bars']
+
+
+def test_write_is_append_only_and_maintenance_applies_retention(tmp_path) -> None:
+    store = DuckDBStore(str(tmp_path / 'market.duckdb'))
+    old = _recent_bars(5, 1.0)
+    old['ts'] = old['ts'] - pd.Timedelta(days=400)
+    store.write_bars('OLD', old)
+    store.write_bars('NEW', _recent_bars(5, 1.0))
+    assert store.conn.execute('SELECT count(*) FROM bars').fetchone()[0] == 10
+
+    skipped = store.run_maintenance(RetentionConfig(days=180, min_expired_rows=6))
+    assert skipped == {'expired': 5, 'deleted': 0, 'compacted': 0}
+
+    stats = store.run_maintenance(RetentionConfig(days=180, min_expired_rows=1, compact_after_deleted=5))
+    assert stats == {'expired': 5, 'deleted': 5, 'compacted': 1}
+    assert store.read_bars_many(['OLD', 'NEW'], since_days=1000)['symbol'].unique().tolist() == ['NEW']
+
+
+def test_upsert_is_idempotent_and_replaces_overlaps(tmp_path) -> None:
+    store = DuckDBStore(str(tmp_path / 'market.duckdb'))
+    first = _recent_bars(5, 10.0)
+    store.write_bars('AAPL', first)
+    store.write_bars('AAPL', first)
+    assert len(store.read_bars('AAPL')) == 5
+
+    overlap = _recent_bars(5, 10.0).iloc[2:].copy()
+    overlap['close'] = [-1.0, -2.0, -3.0]
+    long_df = pd.concat([overlap.assign(symbol='aapl'), _recent_bars(2, 5.0).assign(symbol='MSFT')])
+    assert store.upsert_bars(long_df) == 5
+    assert store.read_bars('AAPL')['close'].tolist() == [10.0, 11.0, -1.0, -2.0, -3.0]
+
+    # Duplicate keys within one batch keep the last row.
+    dup = pd.concat([_recent_bars(1, 1.0), _recent_bars(1, 2.0)])
+    store.upsert_bars({'MSFT': dup})
+    assert store.read_bars('MSFT')['close'].tolist() == [5.0, 2.0]
+
+
+def test_upsert_accepts_arrow(tmp_path) -> None:
+    pa = pytest.importorskip('pyarrow')
+    store = DuckDBStore(str(tmp_path / 'market.duckdb'))
+    table = pa.Table.from_pandas(_recent_bars(3, 1.0).assign(symbol='SPY'), preserve_index=False)
+    store.upsert_bars(table)
+    store.upsert_bars(table.to_batches())
+    store.upsert_bars({'QQQ': pa.Table.from_pandas(_recent_bars(2, 1.0), preserve_index=False)})
+    counts = store.read_bars_many(['SPY', 'QQQ']).groupby('symbol').size().to_dict()
+    assert counts == {'QQQ': 2, 'SPY': 3}
+
+
+def test_upsert_from_many_threads(tmp_path) -> None:
+    store = DuckDBStore(str(tmp_path / 'market.duckdb'))
+    bars = _recent_bars(50, 1.0)
+
+    def ingest(i: int) -> None:
+        store.upsert_bars({f'S{i % 4}': bars})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(ingest, range(32)))
+    counts = store.read_bars_many([f'S{i}' for i in range(4)]).groupby('symbol').size()
+    assert counts.tolist() == [50, 50, 50, 50]
+
+
+def test_upsert_stores_aware_timestamps_as_naive_utc(tmp_path) -> None:
+    store = DuckDBStore(str(tmp_path / 'market.duckdb'))
+    ts = pd.date_range('2024-03-01 09:30', periods=3, freq='h', tz='US/Eastern')
+    store.upsert_bars({'SPY': pd.DataFrame({
+        'ts': ts, 'open': 1.0, 'high': 1.0, 'low': 1.0, 'close': 1.0, 'volume': 1.0,
+    })})
+    stored = store.read_bars('SPY', since_days=10_000)['ts']
+    assert stored.tolist() == ts.tz_convert('UTC').tz_localize(None).tolist()
+    store.close()
@@ -0,0 +1,165 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from market_sage_pro.api import main as api
+from market_sage_pro.data.pipeline import build_feature_matrix
+from market_sage_pro.risk.manager import RiskConfig
+from market_sage_pro.risk.portfolio import PortfolioRiskManager
+from market_sage_pro.streaming.feeds import FileFeed, IterableFeed, Tick, TickBatch
+from market_sage_pro.streaming.pipeline import BarAggregator, StreamConfig, StreamPipeline
+
+
+@pytest.fixture(scope='module')
+def ticks() -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    n = 60_000
+    ts = np.sort(rng.uniform(0, 3600 * 3, n)) + 1_700_000_000
+    symbol = rng.choice(['AAA', 'BBB', 'CCC'], n)
+    price = 100 * np.exp(np.cumsum(rng.normal(0, 2e-4, n)))
+    return pd.DataFrame({'symbol': symbol, 'ts': ts, 'price': price, 'size': rng.integers(1, 100, n)})
+
+
+def _reference_bars(ticks: pd.DataFrame, sym: str) -> pd.DataFrame:
+    df = ticks[ticks['symbol'] == sym]
+    start = df['ts'] - df['ts'] % 60
+    return df.groupby(start).agg(
+        open=('price', 'first'), high=('price', 'max'), low=('price', 'min'),
+        close=('price', 'last'), volume=('size', 'sum'),
+    )
+
+
+def test_pipeline_bars_match_batch_resample(tmp_path, ticks: pd.DataFrame) -> None:
+    path = tmp_path / 'ticks.csv'
+    ticks.to_csv(path, index=False)
+    pipe = StreamPipeline(StreamConfig(bar_seconds=60))
+    sub = pipe.subscribe({'AAA'})
+
+    async def run() -> list[dict]:
+        events = []
+        async for batch in FileFeed(path, chunk=4096).batches():
+            events += pipe.process(batch)
+        events += pipe.process(TickBatch()) + pipe._events(pipe.bars.flush())
+        return events
+
+    events = [e for e in asyncio.run(run()) if e['symbol'] == 'AAA']
+    assert pipe.stats.ticks == len(ticks)
+    ref = _reference_bars(ticks, 'AAA')
+    got = pd.DataFrame(events).set_index('ts')[ref.columns]
+    pd.testing.assert_frame_equal(got, ref, check_names=False, check_dtype=False)
+
+    # Signals start once every feature has warmed up, as in the batch builder.
+    fm = build_feature_matrix(pipe.cfg.specs, ref['close'], ref['high'], ref['low'], ref['volume'])
+    warm = np.isfinite(fm.values).all(axis=1)
+    assert [e['type'] == 'signal' for e in events] == warm.tolist()
+    assert sub.conflated > 0
+
+
+def test_bar_aggregator_closes_on_watermark_and_drops_late_ticks() -> None:
+    agg = BarAggregator(60)
+    closed = agg.add(TickBatch.from_ticks([Tick('A', 10, 1.0, 1), Tick('A', 20, 3.0, 1), Tick('B', 30, 5.0, 2)]))
+    assert closed == []
+    closed = agg.add(TickBatch.from_ticks([Tick('A', 61, 2.0, 1), Tick('A', 50, 9.0, 1)]))
+    assert [(b.symbol, b.open, b.high, b.low, b.close, b.volume) for b in closed] == [('A', 1.0, 3.0, 1.0, 3.0, 2)]
+    assert agg.late == 1
+    assert [b.symbol for b in agg.close_until(61)] == ['B']
+    assert [b.start for b in agg.flush()] == [60]
+
+
+def test_slow_subscriber_gets_conflated_latest_values() -> None:
+    pipe = StreamPipeline(StreamConfig(bar_seconds=1))
+    sub = pipe.subscribe()
+    ticks = [Tick(s, float(t), 100.0 + t, 1) for t in range(50) for s in ('X', 'Y')]
+
+    async def run() -> list[dict]:
+        await pipe.run(IterableFeed(ticks, chunk=10))
+        return await sub.get()
+
+    latest = asyncio.run(run())
+    assert sorted(e['symbol'] for e in latest) == ['X', 'Y']
+    assert {e['close'] for e in latest} == {149.0}
+    assert sub.conflated == 2 * 50 - 2
+
+
+def test_ws_stream_pushes_pipeline_events(monkeypatch: pytest.MonkeyPatch) -> None:
+    pipe = StreamPipeline(StreamConfig(bar_seconds=1), server=api.model_server)
+    monkeypatch.setattr(api, 'stream', pipe)
+    with TestClient(api.app) as client, client.websocket_connect('/ws/stream?symbols=X') as ws:
+        assert ws.receive_json() == {'msg': 'stream started'}
+        batch = TickBatch.from_ticks([Tick('X', 0.5, 10.0), Tick('Y', 0.5, 20.0), Tick('X', 1.5, 11.0)])
+        client.portal.call(pipe.process, batch)
+        events = ws.receive_json()
+        assert [(e['symbol'], e['close']) for e in events] == [('X', 10.0)]
+
+
+class _LeavingSocket:
+    """Client that disconnects right after the handshake."""
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_json(self, data: object) -> None:
+        pass
+
+    async def receive(self) -> dict:
+        return {'type': 'websocket.disconnect', 'code': 1000}
+
+
+def test_ws_stream_drops_subscriber_of_quiet_client(monkeypatch: pytest.MonkeyPatch) -> None:
+    pipe = StreamPipeline(StreamConfig(bar_seconds=1))
+    monkeypatch.setattr(api, 'stream', pipe)
+    # No events ever arrive for QUIET; the handler must still notice the disconnect.
+    asyncio.run(asyncio.wait_for(api.ws_stream(_LeavingSocket(), 'QUIET'), 5))
+    assert not pipe._subscribers
+
+
+def test_run_skips_blocks_that_fail_to_score(monkeypatch: pytest.MonkeyPatch) -> None:
+    pipe = StreamPipeline(StreamConfig(bar_seconds=1))
+    predict = pipe.server.predict
+    calls = []
+
+    async def flaky(X: np.ndarray) -> np.ndarray:
+        calls.append(len(X))
+        if len(calls) == 1:
+            raise ValueError('expected rows of 7 features')
+        return await predict(X)
+
+    monkeypatch.setattr(pipe.server, 'predict', flaky)
+    ticks = [Tick('X', float(t), 100.0 + np.sin(t), 1) for t in range(80)]
+    stats = asyncio.run(pipe.run(IterableFeed(ticks, chunk=10)))
+    assert stats.errors == 1
+    assert stats.signals > 0 and len(calls) > 1
+
+
+def test_pipeline_marks_portfolio_risk(ticks: pd.DataFrame) -> None:
+    risk = PortfolioRiskManager(RiskConfig(max_daily_loss_pct=-100), start_equity=100_000)
+    risk.on_fill('BBB', 10, 100.0)
+    pipe = StreamPipeline(StreamConfig(bar_seconds=60), risk=risk)
+    pipe.process(TickBatch.from_frame(ticks.iloc[:5000]))
+    last = ticks.iloc[:5000].loc[lambda d: d['symbol'] == 'BBB', 'price'].iloc[-1]
+    assert risk.mark[risk.index['BBB']] == last
+    assert risk.equity == pytest.approx(100_000 + 10 * (last - 100.0))
+
+
+def test_pipeline_state_restores_without_replay(ticks: pd.DataFrame) -> None:
+    import json
+
+    def batch(df: pd.DataFrame) -> TickBatch:
+        return TickBatch(df['symbol'].tolist(), df['ts'].tolist(), df['price'].tolist(), df['size'].tolist())
+
+    split = ticks['ts'].iloc[0] - ticks['ts'].iloc[0] % 60 + 3600
+    head, tail = batch(ticks[ticks['ts'] < split]), batch(ticks[ticks['ts'] >= split])
+    pipe = StreamPipeline(StreamConfig(bar_seconds=60))
+    pipe.process(head)
+    pipe._events(pipe.bars.flush())
+    checkpoint = json.loads(json.dumps(pipe.state_dict()))
+    expected = pipe.process(tail)
+
+    restored = StreamPipeline(StreamConfig(bar_seconds=60))
+    restored.load_state(checkpoint)
+    events = restored.process(tail)
+    assert any(e['type'] == 'signal' for e in events)
+    assert events == expected
@@ -28,7 +28,15 @@ export const App: React.FC = () => {
         })
       })
       if (!resp.ok) throw new Error('Request failed')
-      setResults(await resp.json())
+      const job = await resp.json()
+      if (job.error) throw new Error(job.error)
+      let status = job.status
+      while (status !== 'done') {
+        if (status !== 'queued' && status !== 'running') throw new Error('Backtest failed')
+        await new Promise(r => setTimeout(r, 1000))
+        status = (await (await fetch(`http://localhost:8000/backtest/${job.job_id}`)).json()).status
+      }
+      setResults(await (await fetch(`http://localhost:8000/backtest/${job.job_id}/result`)).json())
     } catch (err: any) {
       setError(err.message)
     } finally {